@@ -0,0 +1,25 @@
+# Production serving profile for the web interface: `gunicorn -c gunicorn.conf.py web.app:app`
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# Threaded workers: each open progress stream (SSE) holds a thread for the run's duration
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 8))
+# Streams stay open for a whole run, so only time out workers that stop heartbeating
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app (config, templates, dependencies) once in the master and fork warm workers
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_worker_init(worker):
+    # Schedulers own threads, which do not survive fork, so each worker starts its own
+    # after forking; only the one holding the scheduler lock actually runs jobs
+    from web.app import start_scheduler
+    start_scheduler()
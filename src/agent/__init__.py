@@ -1,5 +1,15 @@
-from .base_agent import BaseAgent
-from .story_selector import StorySelector
-from .blog_writer import BlogWriter
+import importlib
 
-__all__ = ['BaseAgent', 'StorySelector', 'BlogWriter']
\ No newline at end of file
+# Agents are imported on first access so a run only pays for the stages it uses
+_AGENTS = {
+    'BaseAgent': '.base_agent',
+    'StorySelector': '.story_selector',
+    'BlogWriter': '.blog_writer',
+}
+
+__all__ = ['BaseAgent', 'StorySelector', 'BlogWriter']
+
+def __getattr__(name):
+    if name in _AGENTS:
+        return getattr(importlib.import_module(_AGENTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,145 @@
+import codecs
+import dataclasses
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.config import NewsConfig, get_config
+from src.utils.html_extract import extract_text
+from src.utils.output_writer import OutputWriter
+from src.utils.records import Story
+from src.utils.retry import idempotency_key
+from src.utils.run_history import cache_stats
+from src.utils.summarizer import Summarizer
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml'
+}
+# Pages larger than this are cut off; article text is always near the top
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="text/html; charset=...">
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+
+def page_encoding(content_type: str, body: bytes) -> str:
+    """
+    Encoding of an HTML page: the Content-Type charset if given, else the page's own
+    <meta> declaration, else UTF-8. (requests assumes ISO-8859-1 when the header has
+    no charset, which garbles most modern pages.)
+    """
+    candidates = []
+    header = re.search(r'charset=["\']?([\w.:-]+)', content_type or '', re.IGNORECASE)
+    if header:
+        candidates.append(header.group(1))
+    meta = META_CHARSET.search(body[:4096])
+    if meta:
+        candidates.append(meta.group(1).decode('ascii'))
+    for name in candidates:
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return 'utf-8'
+
+
+class ArticleCache:
+    """Extracted article text on disk, keyed by URL, so re-runs never refetch a page."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory or Path(__file__).parent.parent.parent / 'output' / '.article_cache')
+        self.writer = OutputWriter(fsync=False)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{idempotency_key(url)}.txt"
+
+    def get(self, url: str) -> Optional[str]:
+        try:
+            return self._path(url).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Could not read cached article for {url}: {e}")
+            return None
+
+    def put(self, url: str, text: str):
+        try:
+            self.writer.write(self._path(url), text)
+        except Exception as e:
+            self.logger.warning(f"Could not cache article for {url}: {e}")
+
+
+class ArticleFetcher:
+    """
+    Fetches the linked article for shortlisted stories and fills `Story.content` with
+    its main text, summarised to the token budget. Pages are fetched concurrently by a bounded pool with per-request
+    timeouts; a story whose page cannot be fetched keeps its feed description.
+    """
+
+    def __init__(self, config: NewsConfig = None, cache: Optional[ArticleCache] = None,
+                 summarizer: Optional[Summarizer] = None):
+        self.logger = logging.getLogger(__name__)
+        config = config or get_config().news
+        self.max_workers = max(1, config.fetch_concurrency)
+        self.timeout = config.fetch_timeout
+        self.max_tokens = config.article_max_tokens
+        self.cache = cache or ArticleCache()
+        self.summarizer = summarizer or Summarizer()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(HEADERS)
+
+    def enrich(self, stories: List[Story]) -> List[Story]:
+        """Return the stories, in order, with `content` set where extraction succeeded."""
+        if not stories:
+            return []
+        self.logger.info(f"Fetching {len(stories)} articles with {self.max_workers} workers")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stories))) as pool:
+            return list(pool.map(self._enrich_one, stories))
+
+    def _enrich_one(self, story: Story) -> Story:
+        if story.content or not story.url:
+            return story
+        text = self.fetch_text(story.url)
+        if not text:
+            return story
+        # Compress long articles locally so the writer prompt stays within budget
+        return dataclasses.replace(story, content=self.summarizer.summarize(text, self.max_tokens))
+
+    def fetch_text(self, url: str) -> str:
+        """Main text of the page at `url`, from the cache when available. Empty on failure."""
+        cached = self.cache.get(url)
+        cache_stats.record('articles', cached is not None)
+        if cached is not None:
+            return cached
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', 'text/html')
+                if 'html' not in content_type:
+                    self.logger.info(f"Skipping non-HTML article {url} ({content_type})")
+                    return ''
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=65536):
+                    body.extend(chunk)
+                    if len(body) >= MAX_PAGE_BYTES:
+                        break
+                html = body.decode(page_encoding(content_type, bytes(body[:4096])), errors='replace')
+        except Exception as e:
+            self.logger.warning(f"Failed to fetch article {url}: {str(e)}")
+            return ''
+
+        text = extract_text(html)
+        if text:
+            self.cache.put(url, text)
+        else:
+            self.logger.info(f"No article text found at {url}")
+        return text
@@ -1,52 +1,185 @@
+import asyncio
 import requests
 import logging
+import json
+from src.utils.config import get_config
+from src.utils.retry import DeadlineExceeded, OllamaError, RetryPolicy, SalvageStore, idempotency_key, is_transient
+
+CONTINUE_INSTRUCTION = ("Your previous answer was cut off. Continue it exactly where it stops, "
+                        "without repeating any of it. Previous answer so far:")
 
 class BaseAgent:
-    def __init__(self, llm_logger=None, ollama_host=None, ollama_model=None, num_ctx=4096, timeout=300):
+    def __init__(self, llm_logger=None, ollama_host=None, ollama_model=None, num_ctx=4096, timeout=300,
+                 retry_policy=None, salvage_store=None, config=None):
         self.logger = llm_logger or logging.getLogger(__name__)
         self.ollama_host = ollama_host or "http://localhost:11434"
         self.ollama_model = ollama_model or "llama2"
         self.num_ctx = num_ctx
         self.timeout = timeout
+        self.config = config or get_config()
+        self.retry_policy = retry_policy or RetryPolicy.from_config(self.config.ollama)
+        self.salvage_store = salvage_store or SalvageStore()
+
+    def _call_llm(self, prompt, system_prompt=None, deadline=None, on_token=None, json_schema=None):
+        """
+        Call the model with retries. Text streamed before a transient failure is kept
+        and the next attempt asks the model to continue it instead of starting over.
+        `on_token` is called with each streamed piece, e.g. to report progress.
+        `json_schema` constrains the output to JSON matching it (Ollama's `format`);
+        such output is returned as generated, without `_clean_response`.
+        """
+        key = idempotency_key(self.ollama_model, system_prompt or '', prompt)
+        partial = self.salvage_store.load(key)
+        if partial:
+            self.logger.info(f"Resuming salvaged generation ({len(partial)} chars)")
+
+        attempt = 0
+        while True:
+            attempt += 1
+            chunks = []
+            try:
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded("Run deadline reached before LLM call")
+                self._stream_generate(self._continuation_prompt(prompt, partial),
+                                      system_prompt, chunks, deadline, on_token, json_schema)
+                raw_response = self._merge_continuation(partial, ''.join(chunks))
+                break
+            except Exception as e:
+                partial = self._merge_continuation(partial, ''.join(chunks))
+                retry = (is_transient(e) and attempt < self.retry_policy.max_attempts
+                         and self.retry_policy.sleep(attempt, deadline))
+                if not retry:
+                    self.salvage_store.save(key, partial)
+                    self.logger.error(f"LLM call failed: {e}")
+                    self.logger.debug(f"Partial response: {partial}")
+                    return None
+                self.logger.warning(f"LLM call failed (attempt {attempt}/{self.retry_policy.max_attempts}), "
+                                    f"retrying with {len(partial)} chars salvaged: {e}")
+
+        self.salvage_store.clear(key)
+        return raw_response if json_schema is not None else self._clean_response(raw_response)
+
+    async def _acall_llm(self, prompt, system_prompt=None, deadline=None, client=None, on_token=None,
+                         json_schema=None):
+        """
+        `_call_llm` on the event loop, through an AsyncOllamaClient. Cancelling the task
+        stops the generation; the text received so far is salvaged for the next call.
+        """
+        if client is None:
+            async with self._async_client() as client:
+                return await self._acall_llm(prompt, system_prompt, deadline, client, on_token, json_schema)
+
+        key = idempotency_key(self.ollama_model, system_prompt or '', prompt)
+        partial = self.salvage_store.load(key)
+        if partial:
+            self.logger.info(f"Resuming salvaged generation ({len(partial)} chars)")
+
+        attempt = 0
+        while True:
+            attempt += 1
+            chunks = []
+            try:
+                async for piece in client.stream_generate(self._continuation_prompt(prompt, partial),
+                                                          system_prompt, deadline, json_schema=json_schema):
+                    chunks.append(piece)
+                    if on_token is not None:
+                        on_token(piece)
+                raw_response = self._merge_continuation(partial, ''.join(chunks))
+                break
+            except asyncio.CancelledError:
+                self.salvage_store.save(key, self._merge_continuation(partial, ''.join(chunks)))
+                self.logger.warning("LLM call cancelled")
+                raise
+            except Exception as e:
+                partial = self._merge_continuation(partial, ''.join(chunks))
+                retry = (is_transient(e) and attempt < self.retry_policy.max_attempts
+                         and await self.retry_policy.asleep(attempt, deadline))
+                if not retry:
+                    self.salvage_store.save(key, partial)
+                    self.logger.error(f"LLM call failed: {e}")
+                    return None
+                self.logger.warning(f"LLM call failed (attempt {attempt}/{self.retry_policy.max_attempts}), "
+                                    f"retrying with {len(partial)} chars salvaged: {e}")
+
+        self.salvage_store.clear(key)
+        return raw_response if json_schema is not None else self._clean_response(raw_response)
 
-    def _call_llm(self, prompt, system_prompt=None):
+    def _async_client(self):
+        """A short-lived client for callers that don't share one across calls."""
+        from src.utils.async_ollama import AsyncOllamaClient  # aiohttp is only needed for async runs
+
+        return AsyncOllamaClient(self.ollama_host, self.ollama_model, timeout=self.timeout,
+                                 max_concurrency=self.config.ollama.max_concurrency, num_ctx=self.num_ctx)
+
+    @staticmethod
+    def _clean_response(raw_response):
+        # Clean the response by:
+        # 1. Remove markdown code blocks
+        # 2. Remove string concatenation
+        # 3. Join multi-line strings
+        cleaned_response = (raw_response
+                          .replace('```json', '')
+                          .replace('```', '')
+                          .replace('" +', '"')
+                          .replace('+ "', '"')
+                          .strip())
+
+        # If the response contains "Here is" or similar prefixes, try to extract just the content
+        if "Here is" in cleaned_response:
+            start = cleaned_response.find('{')
+            end = cleaned_response.rfind('}') + 1
+            if start >= 0 and end > 0:
+                cleaned_response = cleaned_response[start:end]
+
+        return cleaned_response
+
+    def _stream_generate(self, prompt, system_prompt, chunks, deadline=None, on_token=None, json_schema=None):
+        """Stream a generation into `chunks` so a failure keeps everything received so far."""
         headers = {'Content-Type': 'application/json'}
         data = {
             'model': self.ollama_model,
             'prompt': prompt,
             'system': system_prompt,
-            'stream': False
+            'stream': True
         }
-        
-        try:
-            response = requests.post(f"{self.ollama_host}/api/generate", 
-                                   headers=headers,
-                                   json=data,
-                                   timeout=self.timeout)
+        if json_schema is not None:
+            data['format'] = json_schema
+        timeout = deadline.cap(self.timeout) if deadline is not None else self.timeout
+
+        with requests.post(f"{self.ollama_host}/api/generate",
+                           headers=headers,
+                           json=data,
+                           timeout=timeout,
+                           stream=True) as response:
             response.raise_for_status()
-            raw_response = response.json()['response']
-            
-            # Clean the response by:
-            # 1. Remove markdown code blocks
-            # 2. Remove string concatenation
-            # 3. Join multi-line strings
-            cleaned_response = (raw_response
-                              .replace('```json', '')
-                              .replace('```', '')
-                              .replace('" +', '"')
-                              .replace('+ "', '"')
-                              .strip())
-            
-            # If the response contains "Here is" or similar prefixes, try to extract just the content
-            if "Here is" in cleaned_response:
-                start = cleaned_response.find('{')
-                end = cleaned_response.rfind('}') + 1
-                if start >= 0 and end > 0:
-                    cleaned_response = cleaned_response[start:end]
-            
-            return cleaned_response
-            
-        except Exception as e:
-            self.logger.error(f"LLM call failed: {e}")
-            self.logger.debug(f"Raw response: {raw_response}")
-            return None
\ No newline at end of file
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    # Reported by Ollama itself, so retrying would fail the same way
+                    raise OllamaError(chunk['error'])
+                chunks.append(chunk.get('response', ''))
+                if on_token is not None:
+                    on_token(chunks[-1])
+                if chunk.get('done'):
+                    return
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded("Run deadline reached during generation")
+        raise requests.exceptions.ChunkedEncodingError("Stream ended before generation finished")
+
+    @staticmethod
+    def _continuation_prompt(prompt, partial):
+        if not partial:
+            return prompt
+        return f"{prompt}\n\n{CONTINUE_INSTRUCTION}\n\n{partial}"
+
+    @staticmethod
+    def _merge_continuation(partial, continuation, min_overlap=8, max_overlap=200):
+        """Append a continuation, dropping any text the model repeated from the end of `partial`."""
+        if not partial:
+            return continuation
+        for size in range(min(max_overlap, len(partial), len(continuation)), min_overlap - 1, -1):
+            if partial.endswith(continuation[:size]):
+                return partial + continuation[size:]
+        return partial + continuation
@@ -1,12 +1,18 @@
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+import asyncio
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
 import logging
-import os
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
 from src.utils.llm_logger import LLMLogger
+from src.utils.retry import Deadline
+from src.utils.posts_index import PostsIndex
+from src.utils.output_writer import OutputWriter, render_typescript
+from src.utils.records import Post, PostMetadata, Story
+from src.utils.post_validator import apply_regenerated, find_issues, repair_post, split_sections
 from .content_enhancer import ContentEnhancer
-import requests
+from .metadata_writer import MetadataWriter
 from .base_agent import BaseAgent
 import json
 import re
@@ -28,61 +34,271 @@ class BlogWriter(BaseAgent):
             ollama_host=self.ollama_host,
             ollama_model=self.ollama_model
         )
+        self.metadata_writer = MetadataWriter(
+            llm_logger=self.llm_logger,
+            ollama_host=self.ollama_host,
+            ollama_model=self.ollama_model,
+            num_ctx=self.num_ctx,
+            timeout=self.timeout,
+            retry_policy=self.retry_policy,
+            salvage_store=self.salvage_store,
+            config=self.config
+        )
         
-        self.local_blog = os.getenv('LOCAL_BLOG', 'false').lower() == 'true'
-        self.local_blog_path = Path(os.getenv('LOCAL_BLOG_PATH', './posts'))
+        self.local_blog = self.config.blog.local_blog
+        self.local_blog_path = Path(self.config.blog.local_blog_path)
         self.logger.info(f"BlogWriter initialized with model: {self.ollama_model}")
         self.posts_dir = Path(__file__).parent.parent.parent / 'posts'
         self.output_dir = Path(__file__).parent.parent.parent / "output" / "posts"
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.posts_index = PostsIndex(legacy_posts_dir=self.local_blog_path)
+        self.output_writer = OutputWriter()
+        self.output_formats = list(self.config.blog.output_formats)
         self.system_prompt = """You are a professional blog writer who creates engaging, 
 technical content from news articles while maintaining accuracy and readability."""
 
-    def generate_blog_post(self, story: Dict, skip_selection: bool = False) -> Optional[Dict]:
+    def generate_blog_post(self, story: Story, skip_selection: bool = False,
+                           deadline: Optional[Deadline] = None) -> Optional[Post]:
         """
         Generate a blog post from a story.
         
         Args:
-            story: Dictionary containing the story data
+            story: The story to write about
             skip_selection: If True, assumes story is already selected/enhanced
+            deadline: Optional run deadline shared with the LLM retries
         """
         try:
             if not skip_selection:
                 # self.llm_logger.warning("Story selection should be handled by ContentEnhancer")
                 pass
                 
-            prompt = self._create_blog_prompt(story)
-            response = self._call_llm(prompt, system_prompt=self.system_prompt)
+            response = self.write_draft(story, deadline=deadline)
+            if not response:
+                return None
+
+            return self.save_post(story, response, deadline)
             
+        except Exception as e:
+            self.llm_logger.error(f"Failed to generate blog post: {str(e)}")
+            return None
+
+    async def agenerate_blog_post(self, story: Story, deadline: Optional[Deadline] = None,
+                                  client=None, on_token=None, on_repair_token=None) -> Optional[Post]:
+        """
+        `generate_blog_post` as a coroutine. The draft streams through `client` (an
+        AsyncOllamaClient) and the files are written off the event loop.
+        """
+        try:
+            response = await self.awrite_draft(story, deadline=deadline, client=client, on_token=on_token,
+                                               on_repair_token=on_repair_token)
             if not response:
-                self.logger.error("Failed to generate blog content")
                 return None
+            return await asyncio.to_thread(self.save_post, story, response, deadline)
+        except asyncio.CancelledError:
+            self.logger.warning(f"Blog generation cancelled for '{story.title}'")
+            raise
+        except Exception as e:
+            self.llm_logger.error(f"Failed to generate blog post: {str(e)}")
+            return None
+
+    async def awrite_draft(self, story: Story, deadline: Optional[Deadline] = None,
+                           client=None, on_token=None, on_repair_token=None) -> Optional[str]:
+        prompt = self._create_blog_prompt(story)
+        # The metadata only needs the story, so it is generated (and cached) alongside the body
+        metadata = asyncio.ensure_future(self.metadata_writer.agenerate(story, deadline=deadline, client=client))
+        try:
+            response = await self._acall_llm(prompt, system_prompt=self.system_prompt, deadline=deadline,
+                                             client=client, on_token=on_token)
+        except BaseException:
+            metadata.cancel()
+            raise
+        finally:
+            for result in await asyncio.gather(metadata, return_exceptions=True):
+                if isinstance(result, Exception):
+                    self.logger.warning(f"Metadata generation failed for '{story.title}': {result}")
+        if not response:
+            self.logger.error("Failed to generate blog content")
+            return None
+        content, repairs = self._plan_repairs(story, response)
+        results = []
+        for index, repair_prompt in repairs:
+            results.append((index, await self._acall_llm(repair_prompt, system_prompt=self.system_prompt,
+                                                         deadline=deadline, client=client,
+                                                         on_token=on_repair_token)))
+        return self._apply_repairs(story, content, results)
+
+    def write_draft(self, story: Story, deadline: Optional[Deadline] = None, on_token=None,
+                    on_repair_token=None) -> Optional[str]:
+        """
+        Generate the post body for a story without writing anything to disk. The draft
+        goes through the quality gate: trivial problems are repaired in place and only
+        the sections that fail validation are regenerated, streaming to `on_repair_token`.
+        """
+        prompt = self._create_blog_prompt(story)
+        # The metadata only needs the story, so it is generated (and cached) alongside the body
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            metadata = pool.submit(self.metadata_writer.generate, story, deadline)
+            response = self._call_llm(prompt, system_prompt=self.system_prompt, deadline=deadline,
+                                      on_token=on_token)
+        if metadata.exception() is not None:
+            # save_post tries again; the post falls back to story-derived metadata if that fails too
+            self.logger.warning(f"Metadata generation failed for '{story.title}': {metadata.exception()}")
+        
+        if not response:
+            self.logger.error("Failed to generate blog content")
+            return None
+        content, repairs = self._plan_repairs(story, response)
+        results = [(index, self._call_llm(repair_prompt, system_prompt=self.system_prompt,
+                                          deadline=deadline, on_token=on_repair_token))
+                   for index, repair_prompt in repairs]
+        return self._apply_repairs(story, content, results)
+
+    def _plan_repairs(self, story: Story, content: str) -> Tuple[str, List[Tuple[Optional[int], str]]]:
+        """
+        Repair a draft deterministically and list the LLM calls still needed, as
+        (section index, prompt) pairs; index None asks for whole new sections.
+        """
+        content, fixes = repair_post(content, story, self.config.blog)
+        for fix in fixes:
+            self.logger.info(f"Draft repair: {fix}")
+        sections = split_sections(content)
+        outline = '\n'.join(f"- {s.heading}" for s in sections if s.level >= 2)
+        repairs = []
+        for issue in find_issues(content, self.config.blog):
+            self.logger.info(f"Draft check failed: {issue.message}")
+            if issue.section >= 0:
+                if issue.section not in [index for index, _ in repairs]:
+                    repairs.append((issue.section, self._create_section_prompt(
+                        story, outline, sections[issue.section].heading, sections[issue.section].body)))
+            elif issue.code == 'too_few_sections':
+                missing = self.config.blog.min_paragraphs - sum(
+                    1 for s in sections if s.level >= 2 and not s.is_references)
+                repairs.append((None, self._create_sections_prompt(story, outline, missing)))
+        return content, repairs
+
+    def _apply_repairs(self, story: Story, content: str, results: List[Tuple[Optional[int], Optional[str]]]) -> str:
+        """Merge regenerated sections into the draft; failed regenerations keep the original text."""
+        sections = {index: text for index, text in results if index is not None and text}
+        additions = '\n\n'.join(text for index, text in results if index is None and text)
+        if sections or additions:
+            content = apply_regenerated(content, sections, additions)
+            content, _ = repair_post(content, story, self.config.blog)
+        for issue in find_issues(content, self.config.blog):
+            self.logger.warning(f"Draft still fails check after regeneration: {issue.message}")
+        return content
+
+    def _create_section_prompt(self, story: Story, outline: str, heading: str, body: str) -> str:
+        return f"""You are revising one section of a technical blog post about this news story:
+
+Title: {story.title}
+Description: {story.description}
+{self._article_context(story)}
+The post has these sections:
+{outline}
+
+Rewrite the section "{heading}" so it has at least two substantial paragraphs of
+specific technical detail. Its current text is:
+{body or '(empty)'}
+
+Return only the new text of this section, without its heading."""
+
+    def _create_sections_prompt(self, story: Story, outline: str, count: int) -> str:
+        return f"""You are extending a technical blog post about this news story:
+
+Title: {story.title}
+Description: {story.description}
+{self._article_context(story)}
+The post already has these sections:
+{outline or '(none)'}
+
+Write {count} more section{'s' if count != 1 else ''} that cover different aspects than the existing ones.
+Start each with a "## " heading followed by at least two paragraphs.
+Return only the new sections."""
+
+    def save_post(self, story: Story, content: str, deadline: Optional[Deadline] = None) -> Optional[Post]:
+        """
+        Write a generated post in every configured format. All formats are rendered
+        from the same in-memory post, which is returned with the primary `file_path`.
+        `deadline` bounds the metadata call if it was not generated with the draft.
+        """
+        try:
+            # Resumed and hand-edited drafts get the same deterministic repairs as fresh ones
+            content, _ = repair_post(content, story, self.config.blog)
+            post_id = self.posts_index.reserve(story.url, story.title)
+            # Normally a cache hit: write_draft generated it alongside the body
+            try:
+                metadata = self.metadata_writer.generate(story, deadline)
+            except Exception as e:
+                self.logger.warning(f"Metadata generation failed for '{story.title}': {e}")
+                metadata = None
+            post = self._build_post(post_id, story, content, metadata)
 
             # Create filename from title and date
-            safe_title = re.sub(r'[^\w\s-]', '', story['title'])
-            safe_title = re.sub(r'[-\s]+', '-', safe_title).strip('-')
-            date_str = datetime.now().strftime('%Y-%m-%d')
-            filename = f"{date_str}-{safe_title[:50]}.md"
-            
-            filepath = self.output_dir / filename
-            
-            # Save content to file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(response)
+            base_name = f"{post.date}-{post.slug}"
+            targets = {fmt: self.output_dir / f"{base_name}.{fmt}" for fmt in self.output_formats}
+            if self.local_blog:
+                targets['ts'] = self.local_blog_path / f'post{post_id}.ts'
+
+            written = self.output_writer.write_post(post, targets)
+            filepath = next(iter(written.values()))
                 
-            return str(filepath)
+            self.posts_index.complete(post_id, filepath, post)
+            return dataclasses.replace(post, file_path=filepath)
             
         except Exception as e:
-            self.llm_logger.error(f"Failed to generate blog post: {str(e)}")
+            self.llm_logger.error(f"Failed to save blog post: {str(e)}")
             return None
 
-    def _create_blog_prompt(self, story):
-        return f"""Create a technical blog post based on this news story:
+    def _build_post(self, post_id: int, story: Story, content: str,
+                    metadata: Optional[PostMetadata] = None) -> Post:
+        """
+        Assemble the in-memory post that every output format is rendered from. Generated
+        metadata fills the frontmatter; without it the story title, first paragraph and
+        matched keywords are used.
+        """
+        title = metadata.title if metadata else story.title
+        safe_title = re.sub(r'[^\w\s-]', '', title)
+        safe_title = re.sub(r'[-\s]+', '-', safe_title).strip('-')
+        return Post(
+            id=post_id,
+            title=title,
+            slug=safe_title[:50],
+            date=self._get_current_date(),
+            excerpt=(metadata and metadata.description) or self._extract_excerpt(content),
+            category=(metadata and metadata.category) or self._determine_category(title, content),
+            read_time=self._estimate_read_time(content),
+            source=story.source,
+            source_link=story.url,
+            content=content,
+            keywords=(metadata and metadata.keywords) or story.keywords
+        )
+
+    def _extract_excerpt(self, content: str, max_length: int = 160) -> str:
+        """First prose paragraph of the post, shortened to a meta-description length."""
+        for paragraph in content.split('\n\n'):
+            paragraph = paragraph.strip()
+            if paragraph and not paragraph.startswith(('#', '-', '*', '>', '|')):
+                if len(paragraph) <= max_length:
+                    return paragraph
+                return paragraph[:max_length - 3].rsplit(' ', 1)[0] + '...'
+        return ''
+
+    def _article_context(self, story: Story) -> str:
+        if not story.content:
+            return ''
+        return f"""
+Article text (use it as the source of facts; do not invent details it does not support):
+{story.content}
+"""
 
-Title: {story['title']}
-Description: {story['description']}
-URL: {story['url']}
+    def _create_blog_prompt(self, story: Story):
+        article = self._article_context(story)
+        return f"""Create a technical blog post based on this news story:
 
+Title: {story.title}
+Description: {story.description}
+URL: {story.url}
+{article}
 Requirements:
 1. Write in a professional, technical tone
 2. Include specific technical details and explanations
@@ -91,13 +307,15 @@ Requirements:
 5. Include relevant examples or use cases
 6. Maintain accuracy of information
 7. End with a References section that includes:
-   - The original source URL as: "[Title]({story['url']})"
+   - The original source URL as: "[Title]({story.url})"
    - Any additional relevant technical sources
 
 Generate the complete blog post content:"""
 
     def _get_llm_response(self, prompt: str) -> Optional[str]:
         """Get response from Ollama API with increased context size"""
+        import requests
+
         try:
             api_url = f"{self.ollama_host.rstrip('/')}/api/generate"
             
@@ -129,39 +347,32 @@ Generate the complete blog post content:"""
             'source': ''
         }
 
-    def _save_as_typescript(self, post: Dict) -> Dict:
+    def _save_as_typescript(self, post: Post) -> Post:
         try:
-            post_id = self._get_next_post_id()
+            post_id = self._get_next_post_id(post)
             file_path = self.local_blog_path / f'post{post_id}.ts'
+            post = dataclasses.replace(post, id=post_id)
             
             try:
-                self.local_blog_path.mkdir(parents=True, exist_ok=True)
-            except PermissionError as e:
-                self.logger.error(f"Permission error: {e}")
-                raise
-                
-            try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self._generate_typescript_content(post))
-            except IOError as e:
+                self.output_writer.write(file_path, self._generate_typescript_content(post))
+            except (IOError, PermissionError) as e:
                 self.logger.error(f"File write error: {e}")
                 raise
                 
-            return {**post, 'file_path': str(file_path)}
+            self.posts_index.complete(post_id, file_path, post)
+            return dataclasses.replace(post, file_path=str(file_path))
             
         except Exception as e:
             self.logger.error(f"Post save failed: {e}")
             return post
 
-    def _get_next_post_id(self) -> int:
-        """Get the next available post ID."""
-        existing_posts = list(self.posts_dir.glob('post*.ts'))
-        if not existing_posts:
-            return 1
-        
-        # Extract numbers from filenames and find max
-        post_nums = [int(p.stem.replace('post', '')) for p in existing_posts]
-        return max(post_nums) + 1
+    def _generate_typescript_content(self, post: Post) -> str:
+        """Render a post as a TypeScript module exporting the post object."""
+        return render_typescript(post)
+
+    def _get_next_post_id(self, post: Post) -> int:
+        """Allocate the post ID for a post from the posts index."""
+        return self.posts_index.reserve(post.source_link, post.title)
 
     def _get_current_date(self) -> str:
         """Get current date in YYYY-MM-DD format."""
@@ -177,8 +388,12 @@ Generate the complete blog post content:"""
         return minutes
 
     def _determine_category(self, title: str, content: str) -> str:
-        categories = os.getenv('BLOG_CATEGORIES', '').split(',')
-        return categories[0]  # Default to first category for now
+        """Fallback when no metadata was generated: the category named most often, title first."""
+        categories = self.config.blog.categories
+        title, content = title.lower(), content.lower()
+        scores = [(category.lower() in title, content.count(category.lower())) for category in categories]
+        best = max(range(len(categories)), key=lambda i: scores[i])
+        return categories[best] if any(scores[best]) else categories[0]
 
     def write_blog(self, story):
         prompt = self._create_writing_prompt(story)
@@ -1,12 +1,4 @@
 # src/agent/content_enhancer.py
-from datetime import datetime
-from typing import Dict, List, Optional
-import json
-import requests
-from src.utils.llm_logger import LLMLogger
-from src.utils.prompt_wrapper import wrap_prompt
-from src.agent.story_selector import StorySelector  # Changed to absolute import
-from src.agent.blog_generator import BlogGenerator  # Changed to absolute import
 from .base_agent import BaseAgent
 
 class ContentEnhancer(BaseAgent):
@@ -0,0 +1,138 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.utils.output_writer import OutputWriter
+from src.utils.records import PostMetadata, Story
+from src.utils.retry import Deadline, idempotency_key
+from src.utils.run_history import cache_stats
+from .base_agent import BaseAgent
+
+DESCRIPTION_LENGTH = 160
+
+
+class MetadataCache:
+    """Generated post metadata on disk, keyed by story URL, so a resumed run never asks twice."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory or Path(__file__).parent.parent.parent / 'output' / '.metadata_cache')
+        self.writer = OutputWriter(fsync=False)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{idempotency_key(url)}.json"
+
+    def get(self, url: str) -> Optional[PostMetadata]:
+        try:
+            return PostMetadata.from_json(self._path(url).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Could not read cached metadata for {url}: {e}")
+            return None
+
+    def put(self, url: str, metadata: PostMetadata):
+        try:
+            self.writer.write(self._path(url), metadata.to_json())
+        except Exception as e:
+            self.logger.warning(f"Could not cache metadata for {url}: {e}")
+
+
+def _shorten(text: str, max_length: int) -> str:
+    text = ' '.join(text.split())
+    if len(text) <= max_length:
+        return text
+    return text[:max_length - 3].rsplit(' ', 1)[0] + '...'
+
+
+class MetadataWriter(BaseAgent):
+    """
+    Generates a post's title, meta description, keywords and category in one call,
+    with the output constrained to a JSON schema (Ollama's structured outputs). It only
+    needs the story, so BlogWriter runs it alongside the body generation.
+    """
+
+    def __init__(self, cache: Optional[MetadataCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.logger = logging.getLogger(__name__)
+        self.cache = cache or MetadataCache()
+        self.system_prompt = "You write concise, accurate metadata for technical blog posts."
+
+    def schema(self) -> Dict:
+        blog = self.config.blog
+        return {
+            'type': 'object',
+            'properties': {
+                'title': {'type': 'string', 'maxLength': blog.title_length},
+                'description': {'type': 'string', 'maxLength': DESCRIPTION_LENGTH},
+                'keywords': {'type': 'array', 'items': {'type': 'string'}, 'maxItems': blog.keywords_per_post},
+                'category': {'type': 'string', 'enum': list(blog.categories)},
+            },
+            'required': ['title', 'description', 'keywords', 'category'],
+        }
+
+    def _create_prompt(self, story: Story) -> str:
+        blog = self.config.blog
+        article = f"\nArticle text:\n{story.content[:4000]}\n" if story.content else ''
+        return f"""Write the metadata for a technical blog post about this news story:
+
+Title: {story.title}
+Description: {story.description}
+{article}
+Respond with JSON containing:
+- title: an engaging post title of at most {blog.title_length} characters
+- description: a meta description of at most {DESCRIPTION_LENGTH} characters
+- keywords: up to {blog.keywords_per_post} SEO keywords
+- category: one of {', '.join(blog.categories)}"""
+
+    def generate(self, story: Story, deadline: Optional[Deadline] = None) -> Optional[PostMetadata]:
+        """The metadata for `story`, from the cache or the model; None if generation fails."""
+        cached = self.cache.get(story.url) if story.url else None
+        cache_stats.record('metadata', cached is not None)
+        if cached is not None:
+            return cached
+        response = self._call_llm(self._create_prompt(story), system_prompt=self.system_prompt,
+                                  deadline=deadline, json_schema=self.schema())
+        return self._store(story, response)
+
+    async def agenerate(self, story: Story, deadline: Optional[Deadline] = None, client=None) -> Optional[PostMetadata]:
+        cached = self.cache.get(story.url) if story.url else None
+        cache_stats.record('metadata', cached is not None)
+        if cached is not None:
+            return cached
+        response = await self._acall_llm(self._create_prompt(story), system_prompt=self.system_prompt,
+                                         deadline=deadline, client=client, json_schema=self.schema())
+        return self._store(story, response)
+
+    def _store(self, story: Story, response: Optional[str]) -> Optional[PostMetadata]:
+        if not response:
+            return None
+        try:
+            metadata = self._parse(json.loads(response))
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            self.logger.warning(f"Invalid metadata for '{story.title}': {e}")
+            return None
+        if story.url:
+            self.cache.put(story.url, metadata)
+        return metadata
+
+    def _parse(self, data: Dict) -> PostMetadata:
+        """Enforce the limits the model may not have kept to."""
+        blog = self.config.blog
+        title = _shorten(str(data['title']), blog.title_length)
+        if not title:
+            raise ValueError("empty title")
+        keywords = []
+        for keyword in data.get('keywords') or []:
+            keyword = ' '.join(str(keyword).split())
+            if keyword and keyword.lower() not in (k.lower() for k in keywords):
+                keywords.append(keyword)
+        # Small models sometimes ignore the enum; map case-insensitively, else leave it to the caller
+        categories = {c.lower(): c for c in blog.categories}
+        return PostMetadata(
+            title=title,
+            description=_shorten(str(data.get('description') or ''), DESCRIPTION_LENGTH),
+            keywords=tuple(keywords[:blog.keywords_per_post]),
+            category=categories.get(str(data.get('category') or '').strip().lower(), ''),
+        )
@@ -1,32 +1,58 @@
+import dataclasses
 import logging
-import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import requests
-import feedparser
-from typing import List, Dict
+from typing import List, Optional, Tuple
+from src.sources.news_sources import NewsSource, source_from_spec
+from src.utils.config import NewsConfig, get_config
+from src.utils.coverage_planner import CoveragePlanner, parse_keyword
+from src.utils.records import Story
 
 class NewsScraper:
-    def __init__(self):
+    def __init__(self, config: NewsConfig = None):
         self.logger = logging.getLogger(__name__)
         self._load_keywords()
-        self.news_source = os.getenv('NEWS_SOURCE', 'https://news.google.com')
-        self.language = os.getenv('NEWS_LANGUAGE', 'en')
-        self.period = os.getenv('NEWS_PERIOD', '7d')
-        self.num_stories = int(os.getenv('NEWS_NUM_STORIES', '10'))
+        config = config or get_config().news
+        self.news_source = config.source
+        self.language = config.language
+        self.period = config.period
+        self.num_stories = config.num_stories
+        self.sources = self._build_sources(config)
+
+    def _build_sources(self, config: NewsConfig) -> List[NewsSource]:
+        """Instantiate the configured sources, skipping (and logging) invalid specs"""
+        sources = []
+        for spec in config.sources:
+            try:
+                sources.append(source_from_spec(spec, config))
+            except ValueError as e:
+                self.logger.error(f"Skipping news source '{spec}': {str(e)}")
+        return sources
 
     def _load_keywords(self):
         """Load keywords from config file"""
         try:
             keywords_path = Path(__file__).parent.parent.parent / 'config' / 'keywords.txt'
             self.logger.info(f"Loading keywords from: {keywords_path}")
+            self.keyword_weights = {}
             with open(keywords_path, 'r') as f:
-                self.keywords = [line.strip() for line in f if line.strip()]
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        keyword, weight = parse_keyword(line)
+                    except ValueError as e:
+                        self.logger.error(f"Skipping keyword line '{line.strip()}': {str(e)}")
+                        continue
+                    self.keyword_weights[keyword] = weight
+            self.keywords = list(self.keyword_weights)
             self.logger.info(f"Loaded {len(self.keywords)} keywords")
         except Exception as e:
             self.logger.error(f"Failed to load keywords: {str(e)}")
             self.keywords = ['technology', 'AI', 'software']
+            self.keyword_weights = {}
 
-    def get_news(self, use_custom_keywords: bool = True) -> List[Dict]:
+    def get_news(self, use_custom_keywords: bool = True) -> List[Story]:
         """
         Fetch news articles using either custom keywords or predefined search terms.
         
@@ -35,7 +61,7 @@ class NewsScraper:
                                       If False, uses predefined tech search terms.
         
         Returns:
-            List[Dict]: List of news articles
+            List[Story]: List of news articles
         """
         self.logger.info(f"Fetching news articles (limit: {self.num_stories})...")
         
@@ -45,64 +71,77 @@ class NewsScraper:
         )
         
         try:
-            articles = []
-            seen_titles = set()
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            
-            for term in search_terms:
-                if len(articles) >= self.num_stories:
-                    break
-                    
-                try:
-                    response = requests.get(
-                        f"{self.news_source}/news/rss/search?q={term}&hl={self.language}",
-                        headers=headers
-                    )
-                    response.raise_for_status()
-                    feed = feedparser.parse(response.content)
-                    
-                    for entry in feed.entries:
-                        title = entry.get('title', '')
-                        if title in seen_titles:
-                            continue
-                            
-                        desc = entry.get('summary', '')
-                        if use_custom_keywords and not (self._contains_keywords(title) or 
-                                                      self._contains_keywords(desc)):
-                            continue
-                            
-                        seen_titles.add(title)
-                        articles.append({
-                            'title': title or 'No Title',
-                            'description': desc or 'No Description',
-                            'url': entry.get('link', ''),
-                            'published_at': entry.get('published', ''),
-                            'source': entry.get('source', {}).get('title', 'Unknown')
-                        })
-                        
-                        if len(articles) >= self.num_stories:
-                            break
-                
-                except Exception as e:
-                    self.logger.error(f"Failed to fetch news for term '{term}': {str(e)}")
-                    continue
-            
+            articles = self._collect(search_terms, self.num_stories, require_match=use_custom_keywords)
             self.logger.info(f"Fetched {len(articles)} unique articles")
-            return articles[:self.num_stories]
+            return articles
             
         except Exception as e:
             self.logger.error(f"Failed to fetch news: {str(e)}")
             return []
 
+    def locations(self, use_custom_keywords: bool = True) -> List[str]:
+        """Every URL or file `get_news` reads, so callers can check for changes without scraping."""
+        terms = self.keywords if use_custom_keywords else ['technology', 'tech', 'AI', 'software', 'digital']
+        return [source.location(query) for source in self.sources for query in source.queries(terms)]
+
+    def _collect(self, terms: List[str], limit: int, require_match: bool) -> List[Story]:
+        """
+        Run every (source, query) fetch, each source in its own pool sized to its
+        concurrency limit. When stories must match keywords, the batch is spread across
+        them by a CoveragePlanner: a fetch for a keyword stops reading once that keyword
+        has its share, and fetches for keywords already covered (by stories matching
+        several keywords) are skipped. Other fetches stop once the whole batch is covered.
+        """
+        planner = CoveragePlanner(self.keywords if require_match else [], limit, self.keyword_weights)
+
+        def covered(query: Optional[str]) -> bool:
+            return planner.done() or planner.filled(query)
+
+        def run(index: int, source: NewsSource, query: Optional[str]):
+            if covered(query):
+                return
+            source.rate_limiter.acquire()
+            try:
+                for position, story in enumerate(source.fetch(query)):
+                    matched = self._matching_keywords(story.title, story.description)
+                    if require_match and not matched:
+                        continue
+                    planner.add(dataclasses.replace(story, keywords=matched), (index, position))
+                    if covered(query):
+                        break
+            except Exception as e:
+                label = f"{source.name} ({query})" if query else source.name
+                self.logger.error(f"Failed to fetch news from {label}: {str(e)}")
+
+        pools = [ThreadPoolExecutor(max_workers=source.concurrency) for source in self.sources]
+        try:
+            fetches = [(source, pool, query) for source, pool in zip(self.sources, pools)
+                       for query in source.queries(terms)]
+            futures = [pool.submit(run, index, source, query)
+                       for index, (source, pool, query) in enumerate(fetches)]
+            for future in futures:
+                future.result()
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+        stories = planner.select()
+        if require_match:
+            covered_keywords = {keyword for story in stories for keyword in story.keywords}
+            self.logger.info(f"Selected stories cover {len(covered_keywords)} of {len(self.keywords)} keywords")
+        return stories
+
     def _contains_keywords(self, text: str) -> bool:
         """Check if text contains any of our target keywords"""
         if not text:  # Handle None or empty string
             return False
         return any(keyword.lower() in text.lower() for keyword in self.keywords)
 
-    def get_top_stories(self, num_stories: int = None) -> List[Dict]:
+    def _matching_keywords(self, *texts: str) -> Tuple[str, ...]:
+        """Keywords found in any of the given texts, in keyword-file order"""
+        haystack = ' '.join(t for t in texts if t).lower()
+        return tuple(keyword for keyword in self.keywords if keyword.lower() in haystack)
+
+    def get_top_stories(self, num_stories: int = None) -> List[Story]:
         """
         Alternative method to get top stories using direct RSS feeds.
         This is a simplified version of get_news that uses predefined search terms.
@@ -111,7 +150,7 @@ class NewsScraper:
             num_stories (int, optional): Number of stories to return. Defaults to class value.
             
         Returns:
-            List[Dict]: List of news stories
+            List[Story]: List of news stories
         """
         if num_stories is None:
             num_stories = self.num_stories
@@ -119,59 +158,13 @@ class NewsScraper:
         self.logger.info(f"Fetching top stories (limit: {num_stories})...")
         
         try:
-            stories = []
-            seen_titles = set()
-            
             # Try different search terms to get more relevant stories
             search_terms = ['technology', 'tech', 'AI', 'software', 'digital']
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
-            
-            for term in search_terms:
-                if len(stories) >= num_stories:
-                    break
-                
-                try:
-                    url = f"{self.news_source}/news/rss/search?q={term}&hl={self.language}"
-                    response = requests.get(url, headers=headers)
-                    response.raise_for_status()
-                    
-                    feed = feedparser.parse(response.content)
-                    
-                    self.logger.info(f"Retrieved {len(feed.entries)} stories for term '{term}'")
-                    
-                    for entry in feed.entries:
-                        title = entry.get('title', '')
-                        
-                        # Skip if we've seen this title before
-                        if title in seen_titles:
-                            continue
-                            
-                        desc = entry.get('summary', '')
-                        
-                        if self._contains_keywords(title) or self._contains_keywords(desc):
-                            seen_titles.add(title)
-                            
-                            stories.append({
-                                'title': title or 'No Title',
-                                'description': desc or 'No Description',
-                                'url': entry.get('link', ''),
-                                'published_at': entry.get('published', ''),
-                                'source': entry.get('source', {}).get('title', 'Unknown')
-                            })
-                            
-                            if len(stories) >= num_stories:
-                                break
-                
-                except Exception as e:
-                    self.logger.error(f"Failed to fetch news for term '{term}': {str(e)}")
-                    continue
+            stories = self._collect(search_terms, num_stories, require_match=True)
 
             self.logger.info(f"Found {len(stories)} relevant stories after filtering")
-            return stories[:num_stories]  # Ensure we don't exceed the limit
+            return stories
 
         except Exception as e:
             self.logger.error(f"Error fetching top stories: {str(e)}")
-            return []
\ No newline at end of file
+            return []
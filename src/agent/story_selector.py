@@ -4,8 +4,8 @@ import logging
 import requests
 import json
 import re
-from src.prompts.selection_prompt import build_selection_prompt
 from src.utils.llm_logger import LLMLogger
+from src.utils.records import Selection, Story
 from .base_agent import BaseAgent
 
 class StorySelector(BaseAgent):
@@ -18,12 +18,12 @@ Respond with ONLY a JSON object in this exact format, with no additional text or
     "reason": "<explanation string>"
 }"""
 
-    def _create_selection_prompt(self, stories):
+    def _create_selection_prompt(self, stories: List[Story]):
         stories_list = []
         for i, story in enumerate(stories):
-            stories_list.append(f"""[{i}] Title: {story['title']}
-Description: {story['description']}
-URL: {story['url']}""")
+            stories_list.append(f"""[{i}] Title: {story.title}
+Description: {story.description}
+URL: {story.url}""")
             
         stories_text = "\n\n".join(stories_list)
         
@@ -81,11 +81,21 @@ Respond with a JSON object containing:
             self.logger.debug(f"JSON extraction failed: {e}")
             return None
 
-    def select_story(self, stories):
+    def select_story(self, stories: List[Story], deadline=None, on_token=None) -> Optional[Selection]:
         """Select the most interesting story from the provided list."""
         prompt = self._create_selection_prompt(stories)
-        response = self._call_llm(prompt, system_prompt=self.system_prompt)
-        
+        response = self._call_llm(prompt, system_prompt=self.system_prompt, deadline=deadline,
+                                  on_token=on_token)
+        return self._to_selection(stories, response)
+
+    async def aselect_story(self, stories: List[Story], deadline=None, client=None) -> Optional[Selection]:
+        """`select_story` as a coroutine; pass a shared AsyncOllamaClient to reuse its connections."""
+        prompt = self._create_selection_prompt(stories)
+        response = await self._acall_llm(prompt, system_prompt=self.system_prompt, deadline=deadline,
+                                         client=client)
+        return self._to_selection(stories, response)
+
+    def _to_selection(self, stories: List[Story], response: Optional[str]) -> Optional[Selection]:
         if not response:
             self.logger.error("No response from LLM")
             return None
@@ -98,9 +108,8 @@ Respond with a JSON object containing:
             
         try:
             selected_index = selection['selected_index']
-            selected_story = stories[selected_index]
-            selected_story['selection_reason'] = selection['reason']
-            return selected_story
+            return Selection(story=stories[selected_index], reason=selection['reason'],
+                             index=selected_index)
             
         except IndexError as e:
             self.logger.error(f"Invalid story index: {e}")
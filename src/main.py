@@ -1,70 +1,117 @@
-import os
+import argparse
+import contextlib
+import dataclasses
+import random
 import sys
+import time
 from pathlib import Path
 import json
 import logging
-from dotenv import load_dotenv, find_dotenv
-import yaml
 
 # Add project root to Python path
 project_root = str(Path(__file__).parent.parent)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-# Import local modules
+# Import local modules. Agents, publishing and their third-party dependencies are
+# imported inside the stages that use them, so resumed runs and quick exits start fast.
+from src.utils.config import ConfigError, get_config
 from src.utils.llm_logger import LLMLogger
-from src.agent.story_selector import StorySelector
-from src.agent.news_scraper import NewsScraper
-from src.agent.content_enhancer import ContentEnhancer
-from src.agent.blog_writer import BlogWriter
-from src.publish.web_publisher import WebPublisher
-
-# Clear existing env vars
-os.environ.clear()
-# Reload .env file
-load_dotenv(find_dotenv(), override=True)
+from src.utils.progress import ProgressReporter
+from src.utils.records import Post, Selection, Story
+from src.utils.retry import Deadline
+from src.utils.run_store import RunStore
 
 def load_config():
+    """Load and validate the shared configuration once for this run."""
     logger = logging.getLogger(__name__)
-    
-    # Helper function to safely convert string to boolean
-    def str_to_bool(value, default=False):
-        if value is None:
-            return default
-        return value.lower() == 'true'
-    
-    config = {
-        'news_scraper': {
-            'language': os.getenv('NEWS_LANGUAGE', 'en'),
-            'period': os.getenv('NEWS_PERIOD', '7d'),
-            'num_stories': int(os.getenv('NEWS_NUM_STORIES', '10')),
-            'source': os.getenv('NEWS_SOURCE', 'newsapi')
-        },
-        'ollama': {
-            'host': os.getenv('OLLAMA_HOST', 'http://localhost:11434'),
-            'model': os.getenv('OLLAMA_MODEL', 'llama2'),
-            'timeout': int(os.getenv('OLLAMA_TIMEOUT', '300')),
-            'num_ctx': int(os.getenv('OLLAMA_NUM_CTX', '4096'))  # Add default if not set
-        },
-        'blog': {
-            'url': os.getenv('BLOG_URL', 'http://localhost'),
-            'title_length': int(os.getenv('BLOG_TITLE_LENGTH', '60')),
-            'content_length': int(os.getenv('BLOG_CONTENT_LENGTH', '800')),
-            'categories': os.getenv('BLOG_CATEGORIES', 'Technology').split(','),
-            'min_paragraphs': int(os.getenv('BLOG_MIN_PARAGRAPHS', '3')),
-            'max_paragraphs': int(os.getenv('BLOG_MAX_PARAGRAPHS', '10')),
-            'keywords_per_post': int(os.getenv('BLOG_KEYWORDS_PER_POST', '5')),
-            'include_references': str_to_bool(os.getenv('BLOG_INCLUDE_REFERENCES'), True),
-            'enable_markdown': str_to_bool(os.getenv('BLOG_ENABLE_MARKDOWN'), True),
-            'code_highlighting': str_to_bool(os.getenv('BLOG_CODE_HIGHLIGHTING'), True)
-        }
-    }
+    config = get_config()
     
     # Single debug log with complete config
-    logger.debug(f"Loaded configuration:\n{json.dumps(config, indent=2)}")
+    logger.debug(f"Loaded configuration:\n{json.dumps(config.to_dict(), indent=2)}")
     return config
 
-def main():
+def run_stage(store, name, fn, record=None, progress=None, history=None, profiler=None):
+    """
+    Run a pipeline stage, or reuse its checkpoint if this run already completed it.
+    `record` is the record type (or list of them) the stage returns, for (de)serialisation.
+    The stage's duration is recorded in `history`, and its profile in `profiler`, when given.
+    """
+    logger = logging.getLogger(__name__)
+    progress = progress or ProgressReporter(enabled=False)
+    if store.has(name):
+        logger.info(f"Stage '{name}' already completed in run {store.run_id}, reusing checkpoint")
+        progress.emit('stage', name=name, status='reused')
+        data = store.load(name)
+        if record is None:
+            return data
+        return [record.from_dict(d) for d in data] if isinstance(data, list) else record.from_dict(data)
+    progress.emit('stage', name=name, status='started')
+    started = time.monotonic()
+    with profiler.stage(name) if profiler is not None else contextlib.nullcontext():
+        result = fn()
+    status = 'completed' if result else 'failed'
+    if history is not None:
+        history.record_stage(store.run_id, name, status, time.monotonic() - started)
+    progress.emit('stage', name=name, status=status)
+    if result:
+        if record is None:
+            store.save(name, result)
+        else:
+            store.save(name, [r.to_dict() for r in result] if isinstance(result, list) else result.to_dict())
+    return result
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a blog post from today's news")
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help='Resume a previous run, skipping stages that already completed')
+    parser.add_argument('--import-profile', action='store_true',
+                        help='Report import time of the startup path and each stage, then exit')
+    parser.add_argument('--progress', action='store_true',
+                        help='Write progress events as JSON lines to stdout (logs stay on stderr)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Sample the run and write profile.folded/profile.json to its run directory')
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='CASSETTE',
+                          help='Record all HTTP traffic (feeds, articles, Ollama) to a .jsonl.gz cassette')
+    cassette.add_argument('--replay', metavar='CASSETTE',
+                          help='Serve all HTTP traffic from a recorded cassette instead of the network')
+    parser.add_argument('--replay-speed', type=float, default=1.0, metavar='FACTOR',
+                        help='Replay at FACTOR times the recorded pace (0 = no delays)')
+    return parser.parse_args(argv)
+
+def print_import_profile():
+    from src.utils.startup_profile import format_report, profile_imports
+
+    # Startup path first, then each stage on top of it as a run would load them
+    for modules in (['src.main'],
+                    ['src.main', 'src.agent.news_scraper', 'feedparser'],
+                    ['src.main', 'src.agent.story_selector'],
+                    ['src.main', 'src.agent.blog_writer'],
+                    ['src.main', 'src.publish.web_publisher']):
+        print(format_report(profile_imports(modules)))
+        print()
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.import_profile:
+        print_import_profile()
+        return 0
+
+    if args.record or args.replay:
+        from src.utils.cassette import Cassette
+        try:
+            cassette = Cassette(args.record or args.replay, mode='record' if args.record else 'replay',
+                                speed=args.replay_speed)
+        except (OSError, ValueError) as e:
+            logging.getLogger(__name__).error(f"Cannot open cassette: {e}")
+            return 1
+        with cassette.active():
+            return run(args)
+    return run(args)
+
+def run(args):
+    """One generator run: scrape, select, draft, save and publish."""
     # Configure root logger first
     logging.basicConfig(
         level=logging.INFO,  # This ensures warnings won't show
@@ -75,44 +122,149 @@ def main():
     # Then create our specialized logger
     logger = logging.getLogger(__name__)
     llm_logger = LLMLogger()
+    progress = ProgressReporter(enabled=args.progress)
+    
+    try:
+        store = RunStore.resume(args.resume) if args.resume else RunStore()
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        progress.emit('error', message=str(e))
+        return 1
+    logger.info(f"Run ID: {store.run_id}")
+    progress.emit('run', run_id=store.run_id, resumed=bool(args.resume))
+
+    from src.utils.run_history import RunHistory, cache_stats
+    history = RunHistory()
+    history.start(store.run_id)
+    metrics = {}
+    profilers = []
+
+    def finish(status, **extra):
+        store.finish(status)
+        if profilers:
+            profilers[0].stop()
+            logger.info(f"Profile written to {profilers[0].write(store.run_dir)}")
+        history.finish(store.run_id, status, **metrics, **progress.token_totals(),
+                       **cache_stats.totals(), **extra)
+
+    def fail(message):
+        logger.error(message)
+        progress.emit('error', message=message, run_id=store.run_id)
+        finish('failed', error=message)
+        return 1
     
     try:
         config = load_config()
-        news_scraper = NewsScraper()
-        stories = news_scraper.get_news()
-        
-        if not stories:
-            logger.error("No stories found")
-            return
-            
-        story_selector = StorySelector(
+        metrics['model'] = config.ollama.model
+        if args.profile or random.random() < config.profile.sample_rate:
+            from src.utils.sampling_profiler import SamplingProfiler
+            profilers.append(SamplingProfiler(config.profile.interval_ms / 1000))
+            profilers[0].start()
+        stage_kwargs = dict(progress=progress, history=history, profiler=profilers[0] if profilers else None)
+        deadline = Deadline(config.ollama.run_deadline)
+        agent_kwargs = dict(
             llm_logger=llm_logger,
-            ollama_host=config['ollama']['host'],
-            ollama_model=config['ollama']['model'],
-            num_ctx=config['ollama']['num_ctx']
+            ollama_host=config.ollama.host,
+            ollama_model=config.ollama.model,
+            num_ctx=config.ollama.num_ctx,
+            timeout=config.ollama.timeout,
+            config=config
         )
+
+        dedups = []
+        def semantic_dedup():
+            if not dedups:
+                from src.utils.vector_index import SemanticDedup
+                dedups.append(SemanticDedup.from_config(config))
+            return dedups[0]
+
+        def scrape():
+            from src.agent.news_scraper import NewsScraper
+            from src.utils.posts_index import PostsIndex
+            # Skip stories we already wrote about before spending any LLM time on them
+            stories = PostsIndex().filter_new(NewsScraper(config.news).get_news())
+            if config.news.semantic_dedup:
+                stories = semantic_dedup().filter_new(stories)
+            return stories
+
+        def select():
+            from src.agent.story_selector import StorySelector
+            return StorySelector(**agent_kwargs).select_story(
+                stories, deadline=deadline, on_token=progress.token_counter('selection'))
+
+        def draft_post():
+            on_token = progress.token_counter('draft')
+            # Section regenerations are counted apart so they don't inflate the draft's count;
+            # the counter starts with the first repair token, not with the draft
+            repairs = []
+            def on_repair_token(piece):
+                if not repairs:
+                    repairs.append(progress.token_counter('repair'))
+                repairs[0](piece)
+            draft = blog_writer().write_draft(selection.story, deadline=deadline, on_token=on_token,
+                                              on_repair_token=on_repair_token)
+            on_token.finish()
+            for counter in repairs:
+                counter.finish()
+            return draft
+
+        def fetch_article():
+            from src.agent.article_fetcher import ArticleFetcher
+            return ArticleFetcher(config.news).enrich([selection.story])[0]
+
+        writers = []
+        def blog_writer():
+            # Shared by the draft and final stages, created only if one of them runs
+            if not writers:
+                from src.agent.blog_writer import BlogWriter
+                writers.append(BlogWriter(**agent_kwargs))
+            return writers[0]
+
+        stories = run_stage(store, 'scraped', scrape, record=Story, **stage_kwargs)
         
-        selected_story = story_selector.select_story(stories)
-        if not selected_story:
-            logger.error("Story selection failed")
-            return
+        if not stories:
+            return fail("No stories found")
+        metrics['stories'] = len(stories)
+        progress.emit('scraped', count=len(stories))
             
-        blog_writer = BlogWriter(
-            llm_logger=llm_logger,
-            ollama_host=config['ollama']['host'],
-            ollama_model=config['ollama']['model'],
-            num_ctx=config['ollama']['num_ctx']
-        )
-        result = blog_writer.generate_blog_post(selected_story)
+        selection = run_stage(store, 'selection', select, record=Selection, **stage_kwargs)
+        if not selection:
+            return fail("Story selection failed")
+        progress.emit('selected', title=selection.story.title, url=selection.story.url,
+                      reason=selection.reason)
+
+        if config.news.fetch_articles:
+            # Only the chosen story is fetched, so this costs a single round-trip
+            story = run_stage(store, 'article', fetch_article, record=Story, **stage_kwargs)
+            selection = dataclasses.replace(selection, story=story)
+            
+        draft = run_stage(store, 'draft', draft_post, **stage_kwargs)
+        post = draft and run_stage(store, 'final',
+                                   lambda: blog_writer().save_post(selection.story, draft, deadline), record=Post,
+                                   **stage_kwargs)
         
-        if not result:
-            logger.error("Blog generation failed")
-            return
+        if not post:
+            return fail("Blog generation failed")
             
-        logger.info(f"Blog post created successfully at: {result}")
+        logger.info(f"Blog post created successfully at: {post.file_path}")
+        if config.news.semantic_dedup:
+            semantic_dedup().record(post)
+
+        if config.publish.targets:
+            from src.publish.web_publisher import WebPublisher
+            progress.emit('stage', name='publish', status='started')
+            if not all(WebPublisher.from_config(config.publish).publish_batch([post]).values()):
+                return fail("Publishing failed; re-run with --resume to retry")
+            progress.emit('stage', name='publish', status='completed')
+        finish('completed', post_id=post.id)
+        progress.emit('done', run_id=store.run_id, file_path=str(post.file_path), title=post.title)
+        return 0
         
+    except ConfigError as e:
+        return fail(str(e))
     except Exception as e:
-        logger.error(f"Process failed: {e}")
+        logger.info(f"Resume this run with: --resume {store.run_id}")
+        return fail(f"Process failed: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
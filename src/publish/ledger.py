@@ -0,0 +1,44 @@
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+LEDGER_PATH = Path(__file__).parent.parent.parent / 'output' / 'publish_ledger.db'
+
+
+class PublishLedger:
+    """Records which post was published to which target so re-runs never publish twice."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or LEDGER_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS publications (
+                    post_key TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    location TEXT,
+                    published_at TEXT NOT NULL,
+                    PRIMARY KEY (post_key, target)
+                )""")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def is_published(self, post_key: str, target: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM publications WHERE post_key = ? AND target = ?",
+                               (post_key, target)).fetchone()
+            return row is not None
+
+    def record(self, post_key: str, target: str, location: str):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO publications (post_key, target, location, published_at) "
+                         "VALUES (?, ?, ?, ?)",
+                         (post_key, target, location, datetime.now().isoformat()))
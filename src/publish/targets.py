@@ -0,0 +1,93 @@
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.output_writer import OutputWriter, frontmatter
+from src.utils.records import Post
+from src.utils.retry import idempotency_key
+
+
+class PublishTarget:
+    """A place posts can be published to. `publish` returns the published location."""
+
+    name = 'target'
+    # Whether `publish_many` is cheaper than one `publish` per post
+    batched = False
+
+    def publish(self, post: Post) -> str:
+        raise NotImplementedError
+
+    def publish_many(self, posts: List[Post]) -> List[str]:
+        """Publish several posts, returning their locations in order."""
+        return [self.publish(post) for post in posts]
+
+
+class StaticSiteTarget(PublishTarget):
+    """Copies posts into a static site's content directory as Markdown plus JSON frontmatter."""
+
+    batched = True
+
+    def __init__(self, directory: str, formats=('md', 'json')):
+        self.directory = Path(directory)
+        self.formats = formats
+        self.name = f"static:{self.directory}"
+        self.writer = OutputWriter()
+
+    def publish(self, post: Post) -> str:
+        base_name = f"{post.date}-{post.slug}"
+        targets = {fmt: self.directory / f"{base_name}.{fmt}" for fmt in self.formats}
+        written = self.writer.write_post(post, targets)
+        return next(iter(written.values()))
+
+    def publish_many(self, posts: List[Post]) -> List[str]:
+        """Write every post inside one batch, so they share a single fsync round."""
+        with self.writer.batch():
+            return [self.publish(post) for post in posts]
+
+
+class HttpTarget(PublishTarget):
+    """
+    POSTs posts as JSON to a CMS endpoint. One pooled session is shared by all worker
+    threads so concurrent uploads reuse connections.
+    """
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 30, pool_size: int = 8):
+        self.logger = logging.getLogger(__name__)
+        self.url = url
+        self.name = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+        if token:
+            self.session.headers['Authorization'] = f"Bearer {token}"
+
+    def publish(self, post: Post) -> str:
+        payload = {**frontmatter(post), 'content': post.content}
+        response = self.session.post(
+            self.url,
+            json=payload,
+            # Lets the CMS drop a duplicate if our retry races a slow success
+            headers={'Idempotency-Key': idempotency_key(str(post.id), self.url)},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        try:
+            return response.json().get('url') or response.headers.get('Location') or self.url
+        except ValueError:
+            return response.headers.get('Location') or self.url
+
+
+def target_from_spec(spec: str, token: Optional[str] = None, pool_size: int = 8) -> PublishTarget:
+    """Build a target from a PUBLISH_TARGETS entry: `static:<dir>` or an http(s) URL."""
+    spec = spec.strip()
+    if spec.startswith('static:'):
+        return StaticSiteTarget(spec[len('static:'):])
+    if spec.startswith(('http://', 'https://')):
+        return HttpTarget(spec, token=token, pool_size=pool_size)
+    raise ValueError(f"Unknown publish target: {spec}")
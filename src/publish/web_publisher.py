@@ -1,26 +1,88 @@
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 import logging
 
+from src.publish.ledger import PublishLedger
+from src.publish.targets import PublishTarget, target_from_spec
+from src.utils.config import PublishConfig, get_config
+from src.utils.rate_limit import RateLimiter
+from src.utils.records import Post
+from src.utils.retry import RetryPolicy, is_transient
+
 class WebPublisher:
-    def __init__(self):
+    def __init__(self, targets: Optional[List[PublishTarget]] = None, ledger: Optional[PublishLedger] = None,
+                 max_workers: int = 4, rate_limit: float = 0, retry_policy: Optional[RetryPolicy] = None):
         self.logger = logging.getLogger(__name__)
+        self.targets = targets or []
+        self.ledger = ledger or PublishLedger()
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = RateLimiter(rate_limit, burst=self.max_workers)
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    @classmethod
+    def from_config(cls, config: Optional[PublishConfig] = None) -> 'WebPublisher':
+        """Build a publisher from the configured targets (`static:<dir>` or URLs)."""
+        config = config or get_config().publish
+        targets = [target_from_spec(s, token=config.http_token or None, pool_size=config.concurrency)
+                   for s in config.targets]
+        return cls(targets=targets, max_workers=config.concurrency, rate_limit=config.rate_limit)
 
-    def publish_post(self, post: Dict) -> bool:
-        if not isinstance(post, dict):
+    def publish_post(self, post: Post) -> bool:
+        if not isinstance(post, Post):
             self.logger.error(f"Invalid post format: {type(post)}")
             return False
+        return self.publish_batch([post])[self._post_key(post)]
+
+    def publish_batch(self, posts: List[Post]) -> Dict[str, bool]:
+        """
+        Publish every post to every target in one round of parallel uploads.
+        Returns post key -> True if the post reached all targets.
+        """
+        results = {self._post_key(post): True for post in posts}
+        jobs = []
+        for target in self.targets:
+            pending = [post for post in posts
+                       if not self.ledger.is_published(self._post_key(post), target.name)]
+            if not pending:
+                continue
+            if target.batched:
+                # Local writes gain nothing from threads but a lot from one shared fsync round
+                jobs.append((pending, target))
+            else:
+                jobs.extend(([post], target) for post in pending)
+        if not jobs:
+            self.logger.info("Nothing to publish")
+            return results
+
+        self.logger.info(f"Publishing {len(jobs)} uploads with {self.max_workers} workers")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            outcomes = pool.map(lambda job: self._publish_one(*job), jobs)
+            for (job_posts, _), ok in zip(jobs, outcomes):
+                for post in job_posts:
+                    results[self._post_key(post)] &= ok
+        return results
+
+    def _publish_one(self, posts: List[Post], target: PublishTarget) -> bool:
+        """Publish one job: a single post, or every pending post for a batched target."""
+        attempt = 0
+        while True:
+            attempt += 1
+            self.rate_limiter.acquire()
+            try:
+                locations = target.publish_many(posts) if len(posts) > 1 else [target.publish(posts[0])]
+                # Recorded only after the whole job is written, so a failed batch leaves no ledger rows
+                for post, location in zip(posts, locations):
+                    self.ledger.record(self._post_key(post), target.name, location)
+                    self.logger.info(f"Published '{post.title}' to {location}")
+                return True
+            except Exception as e:
+                if is_transient(e) and attempt < self.retry_policy.max_attempts:
+                    self.logger.warning(f"Publishing to {target.name} failed (attempt {attempt}), retrying: {e}")
+                    self.retry_policy.sleep(attempt)
+                    continue
+                self.logger.error(f"Error publishing post to {target.name}: {str(e)}")
+                return False
 
-        try:
-            # Log the post details
-            self.logger.info("Publishing post:")
-            self.logger.info(f"Title: {post.get('title', 'No title')}")
-            self.logger.info(f"Content preview: {post.get('content', 'No content')[:100]}...")
-            self.logger.info(f"Source: {post.get('source', 'Unknown source')}")
-            self.logger.info(f"Source Link: {post.get('source_link', 'No link')}")
-            
-            # TODO: Implement actual website publishing logic here
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error publishing post: {str(e)}")
-            return False
\ No newline at end of file
+    @staticmethod
+    def _post_key(post: Post) -> str:
+        return str(post.id or post.source_link or post.title)
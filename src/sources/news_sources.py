@@ -0,0 +1,237 @@
+import json
+import logging
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from src.utils.config import NewsConfig
+from src.utils.feed_stream import iter_feed_entries
+from src.utils.rate_limit import RateLimiter
+from src.utils.records import Story
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
+
+FEED_SUFFIXES = ('.xml', '.rss', '.atom')
+FILE_SUFFIXES = ('.json', '.jsonl') + FEED_SUFFIXES
+
+
+def normalize_story(data: Dict) -> Story:
+    """
+    Map a feed entry or a JSON record onto a Story. Accepts feedparser-style keys
+    (summary, link, published, source.title) as well as Story/NewsAPI-style ones.
+    """
+    source = data.get('source') or 'Unknown'
+    if isinstance(source, dict):
+        source = source.get('title') or source.get('name') or 'Unknown'
+    return Story(
+        title=data.get('title') or 'No Title',
+        description=data.get('description') or data.get('summary') or 'No Description',
+        url=data.get('url') or data.get('link') or '',
+        published_at=data.get('published_at') or data.get('publishedAt') or data.get('published') or '',
+        source=str(source),
+        keywords=tuple(data.get('keywords') or ())
+    )
+
+
+def iter_feed_url(url: str, timeout: float = 30, streaming: bool = True) -> Iterator[Dict]:
+    """
+    Yield entries from a remote RSS/Atom feed. In streaming mode entries are parsed while
+    the body downloads and the connection closes as soon as the caller stops iterating.
+    Falls back to feedparser for feeds that are not well-formed XML; entries already
+    yielded before the parse error are not yielded again, and the body is not re-downloaded.
+    """
+    if not streaming:
+        import feedparser  # Heavy import, only needed when the streaming parse is not used
+
+        response = requests.get(url, headers=HEADERS, timeout=timeout)
+        response.raise_for_status()
+        yield from feedparser.parse(response.content).entries
+        return
+
+    with requests.get(url, headers=HEADERS, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(chunk_size=16384)
+        received = []
+
+        def recorded():
+            for chunk in chunks:
+                received.append(chunk)
+                yield chunk
+
+        yielded = 0
+        try:
+            for entry in iter_feed_entries(recorded()):
+                yield entry
+                yielded += 1
+            return
+        except ET.ParseError as e:
+            logging.getLogger(__name__).warning(
+                f"Streaming parse failed for {url}, retrying with feedparser: {e}")
+        # Finish reading the body we already have open and reparse it leniently
+        body = b''.join(received) + b''.join(chunks)
+
+    import feedparser
+
+    yield from feedparser.parse(body).entries[yielded:]
+
+
+class NewsSource:
+    """
+    A place stories come from. `queries` splits the work into independent fetches
+    (one per search term for search engines, a single fetch otherwise); `fetch` yields
+    normalised stories for one query. Each source owns its concurrency and rate limits.
+    """
+
+    name = 'source'
+
+    def __init__(self, concurrency: int = 1, rate_limit: float = 0):
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = RateLimiter(rate_limit, burst=self.concurrency)
+
+    def queries(self, terms: List[str]) -> List[Optional[str]]:
+        return [None]
+
+    def location(self, query: Optional[str] = None) -> str:
+        """The URL or file a fetch of `query` reads, for cheap change checks."""
+        raise NotImplementedError
+
+    def fetch(self, query: Optional[str] = None) -> Iterator[Story]:
+        raise NotImplementedError
+
+
+class GoogleNewsSource(NewsSource):
+    """Google News RSS search, one request per search term."""
+
+    def __init__(self, base_url: str = 'https://news.google.com', language: str = 'en',
+                 timeout: float = 30, streaming: bool = True, **limits):
+        super().__init__(**limits)
+        self.base_url = base_url.rstrip('/')
+        self.language = language
+        self.timeout = timeout
+        self.streaming = streaming
+        self.name = f"google:{self.base_url}"
+
+    def queries(self, terms: List[str]) -> List[Optional[str]]:
+        return list(terms)
+
+    def location(self, query: Optional[str] = None) -> str:
+        return f"{self.base_url}/news/rss/search?q={query}&hl={self.language}"
+
+    def fetch(self, query: Optional[str] = None) -> Iterator[Story]:
+        for entry in iter_feed_url(self.location(query), self.timeout, self.streaming):
+            yield normalize_story(entry)
+
+
+class FeedSource(NewsSource):
+    """Any RSS or Atom feed URL; keyword filtering happens downstream."""
+
+    def __init__(self, url: str, timeout: float = 30, streaming: bool = True, **limits):
+        super().__init__(**limits)
+        self.url = url
+        self.timeout = timeout
+        self.streaming = streaming
+        self.name = f"rss:{url}"
+
+    def location(self, query: Optional[str] = None) -> str:
+        return self.url
+
+    def fetch(self, query: Optional[str] = None) -> Iterator[Story]:
+        for entry in iter_feed_url(self.url, self.timeout, self.streaming):
+            yield normalize_story(entry)
+
+
+class FileSource(NewsSource):
+    """
+    A local dump for offline runs: a JSON list (or an object with a `stories` or
+    `articles` list), JSON Lines, or a saved RSS/Atom document.
+    """
+
+    def __init__(self, path: str, **limits):
+        super().__init__(**limits)
+        self.path = Path(path)
+        self.name = f"file:{self.path}"
+
+    def location(self, query: Optional[str] = None) -> str:
+        return str(self.path)
+
+    def fetch(self, query: Optional[str] = None) -> Iterator[Story]:
+        suffix = self.path.suffix.lower()
+        if suffix in FEED_SUFFIXES:
+            with open(self.path, 'rb') as f:
+                for entry in iter_feed_entries(iter(lambda: f.read(16384), b'')):
+                    yield normalize_story(entry)
+        elif suffix == '.jsonl':
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield normalize_story(json.loads(line))
+        else:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get('stories') or data.get('articles') or []
+            for item in data:
+                yield normalize_story(item)
+
+
+class DirectorySource(NewsSource):
+    """Every JSON, JSONL and feed file in a directory, in name order."""
+
+    def __init__(self, path: str, **limits):
+        super().__init__(**limits)
+        self.path = Path(path)
+        self.name = f"dir:{self.path}"
+
+    def queries(self, terms: List[str]) -> List[Optional[str]]:
+        return [str(p) for p in sorted(self.path.iterdir()) if p.suffix.lower() in FILE_SUFFIXES]
+
+    def location(self, query: Optional[str] = None) -> str:
+        return query
+
+    def fetch(self, query: Optional[str] = None) -> Iterator[Story]:
+        yield from FileSource(query).fetch()
+
+
+def _parse_options(spec: str):
+    """Split `spec|rate=0.5|concurrency=2` into the spec and its limit overrides."""
+    spec, *options = spec.strip().split('|')
+    limits = {}
+    for option in options:
+        key, _, value = option.partition('=')
+        key = key.strip()
+        if key == 'rate':
+            limits['rate_limit'] = float(value)
+        elif key == 'concurrency':
+            limits['concurrency'] = int(value)
+        else:
+            raise ValueError(f"Unknown source option: {key}")
+    return spec.strip(), limits
+
+
+def source_from_spec(spec: str, config: Optional[NewsConfig] = None) -> NewsSource:
+    """
+    Build a source from a NEWS_SOURCES entry: `google`, `rss:<url>` (or a bare feed URL),
+    `file:<path>` or `dir:<path>`. Append `|rate=<per second>|concurrency=<n>` to
+    override the configured per-source limits.
+    """
+    config = config or NewsConfig()
+    spec, overrides = _parse_options(spec)
+    limits = {'concurrency': config.source_concurrency, 'rate_limit': config.source_rate_limit}
+    limits.update(overrides)
+    remote = {'timeout': config.timeout, 'streaming': config.streaming}
+
+    if spec == 'google':
+        return GoogleNewsSource(config.source, config.language, **remote, **limits)
+    if spec.startswith('rss:'):
+        return FeedSource(spec[len('rss:'):], **remote, **limits)
+    if spec.startswith(('http://', 'https://')):
+        return FeedSource(spec, **remote, **limits)
+    if spec.startswith('file:'):
+        return FileSource(spec[len('file:'):], **limits)
+    if spec.startswith('dir:'):
+        return DirectorySource(spec[len('dir:'):], **limits)
+    raise ValueError(f"Unknown news source: {spec}")
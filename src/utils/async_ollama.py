@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import aiohttp
+
+from src.utils.config import OllamaConfig, get_config
+from src.utils.retry import Deadline, DeadlineExceeded, OllamaError
+
+
+class OllamaStreamError(aiohttp.ClientPayloadError):
+    """The stream ended before `done`. Errors Ollama reports itself raise OllamaError."""
+
+
+class AsyncOllamaClient:
+    """
+    asyncio client for Ollama's generate, chat and embed endpoints.
+
+    At most `max_concurrency` requests run at once; the rest wait on a semaphore.
+    Every call takes an optional Deadline that caps its timeout, and cancelling the
+    calling task closes the connection, which makes Ollama stop generating.
+    Retries are left to the caller, which knows what partial output to keep.
+    """
+
+    def __init__(self, host: str = 'http://localhost:11434', model: str = 'llama2', timeout: float = 300,
+                 max_concurrency: int = 2, num_ctx: Optional[int] = None,
+                 embed_model: str = 'nomic-embed-text'):
+        self.logger = logging.getLogger(__name__)
+        self.host = host.rstrip('/')
+        self.model = model
+        self.timeout = timeout
+        self.num_ctx = num_ctx
+        self.embed_model = embed_model
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[OllamaConfig] = None) -> 'AsyncOllamaClient':
+        config = config or get_config().ollama
+        return cls(config.host, config.model, timeout=config.timeout,
+                   max_concurrency=config.max_concurrency, num_ctx=config.num_ctx,
+                   embed_model=config.embed_model)
+
+    async def __aenter__(self) -> 'AsyncOllamaClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session belongs to the loop that first uses it
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(headers={'Content-Type': 'application/json'})
+        return self._session
+
+    @asynccontextmanager
+    async def _limits(self, deadline: Optional[Deadline]):
+        """Hold a concurrency slot and enforce the timeout, reporting deadline overruns as such."""
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("Run deadline reached before LLM call")
+        timeout = deadline.cap(self.timeout) if deadline is not None else self.timeout
+        async with self.semaphore:
+            try:
+                async with asyncio.timeout(timeout):
+                    yield
+            except TimeoutError:
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded("Run deadline reached during LLM call")
+                raise
+
+    def _options(self, options: Optional[Dict]) -> Dict:
+        merged = {'num_ctx': self.num_ctx} if self.num_ctx else {}
+        merged.update(options or {})
+        return merged
+
+    async def _stream(self, path: str, payload: Dict, field: Callable[[Dict], str],
+                      deadline: Optional[Deadline]) -> AsyncIterator[str]:
+        async with self._limits(deadline):
+            async with self.session.post(f"{self.host}{path}", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('error'):
+                        raise OllamaError(chunk['error'])
+                    text = field(chunk)
+                    if text:
+                        yield text
+                    if chunk.get('done'):
+                        return
+        raise OllamaStreamError("Stream ended before generation finished")
+
+    def stream_generate(self, prompt: str, system: Optional[str] = None, deadline: Optional[Deadline] = None,
+                        options: Optional[Dict] = None, json_schema: Optional[Dict] = None) -> AsyncIterator[str]:
+        """
+        Yield the generated text piece by piece as Ollama produces it. Iterate it directly
+        (the timeout is enforced on the consuming task) and don't await other work in between.
+        `json_schema` constrains the output to matching JSON.
+        """
+        payload = {'model': self.model, 'prompt': prompt, 'stream': True, 'options': self._options(options)}
+        if system:
+            payload['system'] = system
+        if json_schema is not None:
+            payload['format'] = json_schema
+        return self._stream('/api/generate', payload, lambda c: c.get('response', ''), deadline)
+
+    def stream_chat(self, messages: List[Dict], deadline: Optional[Deadline] = None,
+                    options: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Yield the assistant reply to `messages` ({'role', 'content'} dicts) as it streams."""
+        payload = {'model': self.model, 'messages': messages, 'stream': True, 'options': self._options(options)}
+        return self._stream('/api/chat', payload, lambda c: (c.get('message') or {}).get('content', ''), deadline)
+
+    async def generate(self, prompt: str, system: Optional[str] = None, deadline: Optional[Deadline] = None,
+                       options: Optional[Dict] = None, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Complete generation. `on_token` is called with each streamed piece."""
+        return await self._collect(self.stream_generate(prompt, system, deadline, options), on_token)
+
+    async def chat(self, messages: List[Dict], deadline: Optional[Deadline] = None,
+                   options: Optional[Dict] = None, on_token: Optional[Callable[[str], None]] = None) -> str:
+        return await self._collect(self.stream_chat(messages, deadline, options), on_token)
+
+    @staticmethod
+    async def _collect(stream: AsyncIterator[str], on_token: Optional[Callable[[str], None]]) -> str:
+        pieces = []
+        async for piece in stream:
+            pieces.append(piece)
+            if on_token is not None:
+                on_token(piece)
+        return ''.join(pieces)
+
+    async def embed(self, texts: List[str], model: Optional[str] = None,
+                    deadline: Optional[Deadline] = None) -> List[List[float]]:
+        """Embeddings for `texts` in one batched `/api/embed` request."""
+        payload = {'model': model or self.embed_model, 'input': texts}
+        async with self._limits(deadline):
+            async with self.session.post(f"{self.host}/api/embed", json=payload) as response:
+                response.raise_for_status()
+                return (await response.json())['embeddings']
@@ -0,0 +1,214 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers that describe the wire encoding; recorded bodies are stored decoded
+DROPPED_HEADERS = ('content-encoding', 'transfer-encoding', 'content-length')
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    """Identity of a request for replay: method, URL and a hash of the body."""
+    body = request.body or b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return f"{request.method} {request.url} {hashlib.sha256(body).hexdigest()[:16]}"
+
+
+class _RecordingRaw:
+    """
+    Wraps a live urllib3 response. Chunks are handed to the caller as they arrive
+    (so streaming and early exits behave as without recording) and stamped with the
+    time since the request was sent; the exchange is saved once the body ends or the
+    response is closed.
+    """
+
+    def __init__(self, raw, on_done, sent_at: float):
+        self._raw = raw
+        self._on_done = on_done
+        self._sent_at = sent_at
+        self._chunks: List[Tuple[float, bytes]] = []
+        self._done = False
+
+    def stream(self, amt: int = 65536, decode_content: bool = True) -> Iterator[bytes]:
+        try:
+            for chunk in self._raw.stream(amt, decode_content=True):
+                self._chunks.append((time.monotonic() - self._sent_at, chunk))
+                yield chunk
+        finally:
+            self._finish()
+
+    def read(self, amt: Optional[int] = None, decode_content: bool = True, **kwargs) -> bytes:
+        data = self._raw.read(amt, decode_content=True, **kwargs)
+        if data:
+            self._chunks.append((time.monotonic() - self._sent_at, data))
+        if not data or amt is None:
+            self._finish()
+        return data
+
+    def close(self):
+        self._finish()
+        self._raw.close()
+
+    def _finish(self):
+        if not self._done:
+            self._done = True
+            self._on_done(self._chunks)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class _ReplayRaw:
+    """Serves recorded chunks, sleeping so they arrive at (scaled) original times."""
+
+    def __init__(self, chunks: List[Tuple[float, bytes]], speed: float):
+        self._chunks = deque(chunks)
+        self._speed = speed
+        self._started = time.monotonic()
+        self._buffer = b''
+        self.closed = False
+
+    def _next(self) -> Optional[bytes]:
+        if not self._chunks:
+            return None
+        at, data = self._chunks.popleft()
+        if self._speed > 0:
+            delay = at / self._speed - (time.monotonic() - self._started)
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def stream(self, amt: int = 65536, decode_content: bool = True) -> Iterator[bytes]:
+        if self._buffer:
+            data, self._buffer = self._buffer, b''
+            yield data
+        while True:
+            data = self._next()
+            if data is None:
+                return
+            yield data
+
+    def read(self, amt: Optional[int] = None, decode_content: bool = True, **kwargs) -> bytes:
+        while amt is None or len(self._buffer) < amt:
+            data = self._next()
+            if data is None:
+                break
+            self._buffer += data
+        if amt is None:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        pass
+
+
+class Cassette:
+    """
+    Records every HTTP exchange made through `requests` (feeds, articles, Ollama,
+    publishing) to a gzipped JSON Lines file, or replays a recording without touching
+    the network. Streamed responses keep their chunk boundaries and timing; replay runs
+    at `speed` times the original pace (0 for no delays at all). Identical requests
+    are replayed in the order they were recorded.
+    """
+
+    def __init__(self, path: Path, mode: str = 'replay', speed: float = 1.0):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = max(0.0, speed)
+        self.lock = threading.Lock()
+        self.recorded = 0
+        self.exchanges: Dict[str, Deque[Dict]] = defaultdict(deque)
+        if mode == 'replay':
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Start a fresh recording
+            with gzip.open(self.path, 'wt', encoding='utf-8'):
+                pass
+
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    exchange = json.loads(line)
+                    self.exchanges[exchange['key']].append(exchange)
+        self.logger.info(f"Loaded {sum(map(len, self.exchanges.values()))} recorded exchanges from {self.path}")
+
+    def _save(self, exchange: Dict):
+        with self.lock:
+            # Each append is a complete gzip member, so a crash never corrupts earlier ones
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(json.dumps(exchange, separators=(',', ':')) + '\n')
+            self.recorded += 1
+
+    def send(self, adapter: HTTPAdapter, original, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.mode == 'replay':
+            return self._replay(adapter, request)
+        sent_at = time.monotonic()
+        response = original(adapter, request, **kwargs)
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS}
+        exchange = {'key': request_key(request), 'url': response.url, 'status': response.status_code,
+                    'reason': response.reason, 'headers': headers}
+
+        def done(chunks: List[Tuple[float, bytes]]):
+            exchange['chunks'] = [[round(at, 4), base64.b64encode(data).decode('ascii')] for at, data in chunks]
+            self._save(exchange)
+
+        response.raw = _RecordingRaw(response.raw, done, sent_at)
+        return response
+
+    def _replay(self, adapter: HTTPAdapter, request: requests.PreparedRequest) -> requests.Response:
+        key = request_key(request)
+        with self.lock:
+            queue = self.exchanges.get(key)
+            exchange = queue.popleft() if queue else None
+        if exchange is None:
+            raise requests.exceptions.ConnectionError(f"No recorded response for {key}", request=request)
+        response = requests.Response()
+        response.status_code = exchange['status']
+        response.reason = exchange.get('reason', '')
+        response.headers = CaseInsensitiveDict(exchange['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = exchange['url']
+        response.request = request
+        response.connection = adapter
+        response.raw = _ReplayRaw([(at, base64.b64decode(data)) for at, data in exchange['chunks']], self.speed)
+        return response
+
+    @contextmanager
+    def active(self):
+        """Route all `requests` traffic through this cassette while the block runs."""
+        original = HTTPAdapter.send
+        cassette = self
+
+        def send(adapter, request, **kwargs):
+            return cassette.send(adapter, original, request, **kwargs)
+
+        HTTPAdapter.send = send
+        try:
+            yield self
+        finally:
+            HTTPAdapter.send = original
+            if self.mode == 'record':
+                self.logger.info(f"Recorded {self.recorded} exchanges to {self.path}")
@@ -0,0 +1,322 @@
+import dataclasses
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+ENV_FILE = PROJECT_ROOT / '.env'
+YAML_FILE = PROJECT_ROOT / 'config' / 'config.yml'
+
+OUTPUT_FORMATS = ('md', 'json', 'ts')
+
+
+class ConfigError(ValueError):
+    """Raised when the configuration is missing or has invalid values."""
+
+
+@dataclass(frozen=True, slots=True)
+class OllamaConfig:
+    host: str = 'http://localhost:11434'
+    model: str = 'llama2'
+    timeout: int = 300
+    num_ctx: int = 4096
+    max_retries: int = 3
+    retry_base_delay: float = 2.0
+    retry_max_delay: float = 60.0
+    run_deadline: int = 0  # 0 disables the deadline
+    embed_model: str = 'nomic-embed-text'
+    embed_batch_size: int = 64
+    max_concurrency: int = 2
+
+
+@dataclass(frozen=True, slots=True)
+class NewsConfig:
+    source: str = 'https://news.google.com'
+    language: str = 'en'
+    period: str = '7d'
+    num_stories: int = 10
+    streaming: bool = True
+    timeout: int = 30
+    sources: Tuple[str, ...] = ('google',)
+    source_concurrency: int = 2
+    source_rate_limit: float = 0.0
+    fetch_articles: bool = False
+    fetch_concurrency: int = 4
+    fetch_timeout: int = 10
+    article_max_tokens: int = 1500
+    semantic_dedup: bool = False
+    dedup_threshold: float = 0.85
+    dedup_mode: str = 'filter'  # 'filter' drops similar stories, 'downrank' moves them last
+
+
+@dataclass(frozen=True, slots=True)
+class BlogConfig:
+    url: str = 'http://localhost'
+    title_length: int = 60
+    content_length: int = 800
+    categories: Tuple[str, ...] = ('Technology',)
+    min_paragraphs: int = 3
+    max_paragraphs: int = 10
+    keywords_per_post: int = 5
+    include_references: bool = True
+    enable_markdown: bool = True
+    code_highlighting: bool = True
+    local_blog: bool = False
+    local_blog_path: str = './posts'
+    output_formats: Tuple[str, ...] = ('md',)
+
+
+@dataclass(frozen=True, slots=True)
+class PublishConfig:
+    targets: Tuple[str, ...] = ()
+    http_token: str = ''
+    concurrency: int = 4
+    rate_limit: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class ProfileConfig:
+    sample_rate: float = 0.0  # Fraction of runs profiled without --profile (0 = none, 1 = all)
+    interval_ms: int = 10
+
+
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    ollama: OllamaConfig = field(default_factory=OllamaConfig)
+    news: NewsConfig = field(default_factory=NewsConfig)
+    blog: BlogConfig = field(default_factory=BlogConfig)
+    publish: PublishConfig = field(default_factory=PublishConfig)
+    profile: ProfileConfig = field(default_factory=ProfileConfig)
+
+    def to_dict(self, include_secrets: bool = False) -> Dict:
+        data = dataclasses.asdict(self)
+        if not include_secrets and data['publish']['http_token']:
+            data['publish']['http_token'] = '***'
+        return data
+
+
+# Environment variable for each (section, field)
+ENV_VARS = {
+    ('ollama', 'host'): 'OLLAMA_HOST',
+    ('ollama', 'model'): 'OLLAMA_MODEL',
+    ('ollama', 'timeout'): 'OLLAMA_TIMEOUT',
+    ('ollama', 'num_ctx'): 'OLLAMA_NUM_CTX',
+    ('ollama', 'max_retries'): 'OLLAMA_MAX_RETRIES',
+    ('ollama', 'retry_base_delay'): 'OLLAMA_RETRY_BASE_DELAY',
+    ('ollama', 'retry_max_delay'): 'OLLAMA_RETRY_MAX_DELAY',
+    ('ollama', 'run_deadline'): 'RUN_DEADLINE_SECONDS',
+    ('ollama', 'embed_model'): 'OLLAMA_EMBED_MODEL',
+    ('ollama', 'embed_batch_size'): 'OLLAMA_EMBED_BATCH_SIZE',
+    ('ollama', 'max_concurrency'): 'OLLAMA_MAX_CONCURRENCY',
+    ('news', 'source'): 'NEWS_SOURCE',
+    ('news', 'language'): 'NEWS_LANGUAGE',
+    ('news', 'period'): 'NEWS_PERIOD',
+    ('news', 'num_stories'): 'NEWS_NUM_STORIES',
+    ('news', 'streaming'): 'NEWS_STREAMING',
+    ('news', 'timeout'): 'NEWS_TIMEOUT',
+    ('news', 'sources'): 'NEWS_SOURCES',
+    ('news', 'source_concurrency'): 'NEWS_SOURCE_CONCURRENCY',
+    ('news', 'source_rate_limit'): 'NEWS_SOURCE_RATE_LIMIT',
+    ('news', 'fetch_articles'): 'NEWS_FETCH_ARTICLES',
+    ('news', 'fetch_concurrency'): 'NEWS_FETCH_CONCURRENCY',
+    ('news', 'fetch_timeout'): 'NEWS_FETCH_TIMEOUT',
+    ('news', 'article_max_tokens'): 'NEWS_ARTICLE_MAX_TOKENS',
+    ('news', 'semantic_dedup'): 'NEWS_SEMANTIC_DEDUP',
+    ('news', 'dedup_threshold'): 'NEWS_DEDUP_THRESHOLD',
+    ('news', 'dedup_mode'): 'NEWS_DEDUP_MODE',
+    ('blog', 'url'): 'BLOG_URL',
+    ('blog', 'title_length'): 'BLOG_TITLE_LENGTH',
+    ('blog', 'content_length'): 'BLOG_CONTENT_LENGTH',
+    ('blog', 'categories'): 'BLOG_CATEGORIES',
+    ('blog', 'min_paragraphs'): 'BLOG_MIN_PARAGRAPHS',
+    ('blog', 'max_paragraphs'): 'BLOG_MAX_PARAGRAPHS',
+    ('blog', 'keywords_per_post'): 'BLOG_KEYWORDS_PER_POST',
+    ('blog', 'include_references'): 'BLOG_INCLUDE_REFERENCES',
+    ('blog', 'enable_markdown'): 'BLOG_ENABLE_MARKDOWN',
+    ('blog', 'code_highlighting'): 'BLOG_CODE_HIGHLIGHTING',
+    ('blog', 'local_blog'): 'LOCAL_BLOG',
+    ('blog', 'local_blog_path'): 'LOCAL_BLOG_PATH',
+    ('blog', 'output_formats'): 'BLOG_OUTPUT_FORMATS',
+    ('publish', 'targets'): 'PUBLISH_TARGETS',
+    ('publish', 'http_token'): 'PUBLISH_HTTP_TOKEN',
+    ('publish', 'concurrency'): 'PUBLISH_CONCURRENCY',
+    ('publish', 'rate_limit'): 'PUBLISH_RATE_LIMIT',
+    ('profile', 'sample_rate'): 'PROFILE_SAMPLE_RATE',
+    ('profile', 'interval_ms'): 'PROFILE_INTERVAL_MS',
+}
+
+SECTIONS = {
+    'ollama': OllamaConfig,
+    'news': NewsConfig,
+    'blog': BlogConfig,
+    'publish': PublishConfig,
+    'profile': ProfileConfig,
+}
+
+
+def _convert(value, default, name: str):
+    """Convert a raw env/YAML value to the type of the field's default."""
+    try:
+        if isinstance(default, bool):
+            return value if isinstance(value, bool) else str(value).strip().lower() == 'true'
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+        if isinstance(default, tuple):
+            items = value if isinstance(value, (list, tuple)) else str(value).split(',')
+            return tuple(str(item).strip() for item in items if str(item).strip())
+        return str(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f"{name}: expected {type(default).__name__}, got {value!r}")
+
+
+def _read_yaml(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    import yaml  # Only needed when a YAML file is present
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+    if not isinstance(data, dict):
+        raise ConfigError(f"{path}: expected a mapping at the top level")
+    return data
+
+
+def _read_env_file(path: Path) -> Dict[str, str]:
+    if not path.exists():
+        return {}
+    from dotenv import dotenv_values
+    return {key: value for key, value in dotenv_values(path).items() if value is not None}
+
+
+def _validate(config: AppConfig):
+    errors = []
+    if not config.ollama.host.startswith(('http://', 'https://')):
+        errors.append(f"ollama.host must be an http(s) URL, got {config.ollama.host!r}")
+    for name in ('timeout', 'num_ctx', 'max_retries', 'embed_batch_size', 'max_concurrency'):
+        if getattr(config.ollama, name) <= 0:
+            errors.append(f"ollama.{name} must be positive")
+    if config.ollama.run_deadline < 0:
+        errors.append("ollama.run_deadline must be 0 (disabled) or positive")
+    if config.news.num_stories <= 0:
+        errors.append("news.num_stories must be positive")
+    if config.news.timeout <= 0:
+        errors.append("news.timeout must be positive")
+    if not config.news.sources:
+        errors.append("news.sources must list at least one source")
+    if config.news.source_concurrency <= 0:
+        errors.append("news.source_concurrency must be positive")
+    for name in ('fetch_concurrency', 'fetch_timeout', 'article_max_tokens'):
+        if getattr(config.news, name) <= 0:
+            errors.append(f"news.{name} must be positive")
+    if not 0 < config.news.dedup_threshold <= 1:
+        errors.append("news.dedup_threshold must be between 0 and 1")
+    if config.news.dedup_mode not in ('filter', 'downrank'):
+        errors.append(f"news.dedup_mode must be 'filter' or 'downrank', got {config.news.dedup_mode!r}")
+    if config.blog.min_paragraphs > config.blog.max_paragraphs:
+        errors.append("blog.min_paragraphs cannot exceed blog.max_paragraphs")
+    if not config.blog.categories:
+        errors.append("blog.categories must list at least one category")
+    unknown = set(config.blog.output_formats) - set(OUTPUT_FORMATS)
+    if unknown:
+        errors.append(f"blog.output_formats has unknown formats: {', '.join(sorted(unknown))}")
+    if not config.blog.output_formats:
+        errors.append("blog.output_formats must list at least one format")
+    if config.publish.concurrency <= 0:
+        errors.append("publish.concurrency must be positive")
+    if not 0 <= config.profile.sample_rate <= 1:
+        errors.append("profile.sample_rate must be between 0 and 1")
+    if config.profile.interval_ms <= 0:
+        errors.append("profile.interval_ms must be positive")
+    if errors:
+        raise ConfigError("Invalid configuration:\n  " + "\n  ".join(errors))
+
+
+def load_config(env_file: Optional[Path] = None, yaml_file: Optional[Path] = None,
+                environ: Optional[Mapping[str, str]] = None) -> AppConfig:
+    """
+    Build and validate the configuration. Later sources win:
+    defaults < config/config.yml < process environment < .env file.
+    The process environment is never modified.
+    """
+    yaml_data = _read_yaml(Path(yaml_file or YAML_FILE))
+    env = dict(os.environ if environ is None else environ)
+    env.update(_read_env_file(Path(env_file or ENV_FILE)))
+
+    sections = {}
+    for section, cls in SECTIONS.items():
+        values = {}
+        section_yaml = yaml_data.get(section) or {}
+        for f in dataclasses.fields(cls):
+            default = getattr(cls(), f.name)
+            raw = section_yaml.get(f.name)
+            env_name = ENV_VARS.get((section, f.name))
+            if env_name and env.get(env_name, '') != '':
+                raw = env[env_name]
+            if raw is not None:
+                values[f.name] = _convert(raw, default, f"{section}.{f.name}")
+        sections[section] = cls(**values)
+
+    config = AppConfig(**sections)
+    _validate(config)
+    return config
+
+
+_config: Optional[AppConfig] = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> AppConfig:
+    """The shared configuration, loaded on first use."""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = load_config()
+    return _config
+
+
+def set_config(config: AppConfig):
+    global _config
+    with _config_lock:
+        _config = config
+
+
+class ConfigWatcher:
+    """
+    Reloads the shared configuration when .env or config.yml change on disk, for the
+    long-running web process. Checks at most every `interval` seconds; a broken file
+    is logged and the previous configuration stays in use.
+    """
+
+    def __init__(self, interval: float = 5.0, files=(ENV_FILE, YAML_FILE)):
+        self.logger = logging.getLogger(__name__)
+        self.interval = interval
+        self.files = [Path(f) for f in files]
+        self.mtimes = self._mtimes()
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def _mtimes(self):
+        return tuple(f.stat().st_mtime if f.exists() else None for f in self.files)
+
+    def current(self) -> AppConfig:
+        now = time.monotonic()
+        if now - self.checked_at >= self.interval and self.lock.acquire(blocking=False):
+            try:
+                self.checked_at = now
+                mtimes = self._mtimes()
+                if mtimes != self.mtimes:
+                    self.mtimes = mtimes
+                    try:
+                        set_config(load_config())
+                        self.logger.info("Configuration reloaded")
+                    except Exception as e:
+                        self.logger.error(f"Configuration reload failed, keeping previous: {e}")
+            finally:
+                self.lock.release()
+        return get_config()
@@ -0,0 +1,127 @@
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.records import Story
+
+
+def parse_keyword(line: str) -> Tuple[str, float]:
+    """Split a keywords.txt line, `keyword` or `keyword|weight=2`, into the keyword and its weight."""
+    keyword, _, options = line.partition('|')
+    weight = 1.0
+    for option in filter(None, (o.strip() for o in options.split('|'))):
+        key, _, value = option.partition('=')
+        if key.strip() != 'weight':
+            raise ValueError(f"Unknown keyword option '{key.strip()}'")
+        weight = float(value)
+        if weight < 0:
+            raise ValueError(f"Keyword weight must not be negative: {value}")
+    return keyword.strip(), weight
+
+
+def allocate(weights: Dict[str, float], limit: int) -> Dict[str, int]:
+    """
+    Split `limit` slots across keywords (in order) so the quotas sum to exactly `limit`.
+    Every keyword gets one slot and the rest are shared in proportion to weight by
+    largest remainder. With more keywords than slots, the highest-weight keywords get
+    one each (earlier keywords win ties).
+    """
+    keywords = list(weights)
+    if len(keywords) >= limit:
+        top = sorted(keywords, key=lambda k: -weights[k])[:max(0, limit)]
+        return {k: int(k in top) for k in keywords}
+    extra = limit - len(keywords)
+    total = sum(weights.values())
+    shares = {k: extra * weights[k] / total for k in keywords}
+    quotas = {k: 1 + math.floor(shares[k]) for k in keywords}
+    left = limit - sum(quotas.values())
+    for k in sorted(keywords, key=lambda k: -(shares[k] - math.floor(shares[k])))[:left]:
+        quotas[k] += 1
+    return quotas
+
+
+class CoveragePlanner:
+    """
+    Spreads a batch of `limit` stories across keywords instead of taking the first
+    matches in keyword-file order. Keyword quotas come from `allocate`. Stories are
+    assigned as they arrive to the matched keyword furthest below its quota, so the
+    scraper can stop a keyword's fetch, or skip it, once that keyword is covered.
+    Keywords that never match cannot hold a fetch up for long: once `limit` stories are
+    in, reading continues for at most `lookahead` more (default `limit`) in the hope of
+    filling them. `select` interleaves the keywords round-robin, so a short run still
+    covers as many of them as possible. Without keywords it simply keeps the first
+    `limit` stories.
+    """
+
+    def __init__(self, keywords: List[str], limit: int, weights: Optional[Dict[str, float]] = None,
+                 lookahead: Optional[int] = None):
+        weights = weights or {}
+        self.limit = limit
+        self.lookahead = limit if lookahead is None else lookahead
+        self.keywords = [k for k in keywords if weights.get(k, 1.0) > 0]
+        self.quotas = allocate({k: weights.get(k, 1.0) for k in self.keywords}, limit)
+        self.lock = threading.Lock()
+        self.counts = {k: 0 for k in self.keywords}
+        self.collected = 0
+        # title -> (order, story); the earliest order wins for duplicates
+        self.candidates: Dict[str, Tuple[Tuple, Story]] = {}
+
+    def _pick(self, story: Story, counts: Dict[str, int]) -> Optional[str]:
+        """The matched keyword with the most unfilled quota (relative to its size), if any."""
+        open_keywords = [k for k in story.keywords if k in self.quotas and counts[k] < self.quotas[k]]
+        if not open_keywords:
+            return None
+        return min(open_keywords, key=lambda k: (counts[k] / self.quotas[k], self.keywords.index(k)))
+
+    def add(self, story: Story, order: Tuple) -> bool:
+        """Offer a story; `order` ranks it for the final selection. False for duplicates."""
+        with self.lock:
+            seen = self.candidates.get(story.title)
+            if seen is not None:
+                if order < seen[0]:
+                    self.candidates[story.title] = (order, story)
+                return False
+            self.candidates[story.title] = (order, story)
+            self.collected += 1
+            keyword = self._pick(story, self.counts)
+            if keyword:
+                self.counts[keyword] += 1
+            return True
+
+    def filled(self, keyword: str) -> bool:
+        """Whether `keyword` has reached its quota; False for terms that are not keywords."""
+        with self.lock:
+            return keyword in self.quotas and self.counts[keyword] >= self.quotas[keyword]
+
+    def done(self) -> bool:
+        with self.lock:
+            if self.collected < self.limit:
+                return False
+            return (self.collected >= self.limit + self.lookahead
+                    or all(self.counts[k] >= self.quotas[k] for k in self.keywords))
+
+    def select(self) -> List[Story]:
+        """
+        The batch: stories re-assigned in `order` (so the result does not depend on
+        which fetch finished first), taken round-robin across keywords, then topped up
+        with unassigned stories if some keywords had nothing to offer.
+        """
+        with self.lock:
+            ranked = [story for _, story in sorted(self.candidates.values(), key=lambda c: c[0])]
+        counts = {k: 0 for k in self.keywords}
+        assigned: Dict[str, List[Story]] = {k: [] for k in self.keywords}
+        spare = []
+        for story in ranked:
+            keyword = self._pick(story, counts)
+            if keyword:
+                counts[keyword] += 1
+                assigned[keyword].append(story)
+            else:
+                spare.append(story)
+
+        selected = []
+        for depth in range(max(self.quotas.values(), default=0)):
+            for keyword in self.keywords:
+                if depth < len(assigned[keyword]):
+                    selected.append(assigned[keyword][depth])
+        return (selected + spare)[:self.limit]
@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import re
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from src.utils.config import OllamaConfig, get_config
+from src.utils.retry import RetryPolicy, is_transient
+from src.utils.run_history import cache_stats
+
+CACHE_DIR = Path(__file__).parent.parent.parent / 'output' / '.embedding_cache'
+# File header: magic + vector dimension
+MAGIC = b'EMB1'
+HEADER = struct.Struct('<4sI')
+KEY_BYTES = 16
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """
+    Embeddings on disk, one append-only binary file per model. Each record is a 16-byte
+    hash of the text followed by the float32 vector, so a cache of 100k headlines at 768
+    dimensions is ~300 MB and loads with a single read.
+    """
+
+    def __init__(self, model: str, directory: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        safe_model = re.sub(r'[^\w.-]+', '_', model)
+        self.path = Path(directory or CACHE_DIR) / f"{safe_model}.emb"
+        self.lock = threading.Lock()
+        self.dim: Optional[int] = None
+        self.rows: Dict[bytes, np.ndarray] = {}
+        self._load()
+
+    def _record_dtype(self, dim: int) -> np.dtype:
+        return np.dtype([('key', f'S{KEY_BYTES}'), ('vector', '<f4', (dim,))])
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                magic, dim = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC:
+                    raise ValueError("not an embedding cache file")
+                data = f.read()
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable embedding cache {self.path}: {e}")
+            return
+        dtype = self._record_dtype(dim)
+        # A partially written last record (interrupted append) is ignored and later overwritten
+        complete = len(data) // dtype.itemsize
+        if complete * dtype.itemsize != len(data):
+            os.truncate(self.path, HEADER.size + complete * dtype.itemsize)
+        records = np.frombuffer(data, dtype=dtype, count=complete)
+        self.dim = dim
+        self.rows = {bytes(key): vector for key, vector in zip(records['key'], records['vector'])}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        return self.rows.get(key)
+
+    def put_many(self, items: List[Tuple[bytes, np.ndarray]]):
+        if not items:
+            return
+        with self.lock:
+            items = [(k, v) for k, v in items if k not in self.rows]
+            if not items:
+                return
+            dim = len(items[0][1])
+            if self.dim is not None and dim != self.dim:
+                self.logger.warning(f"Not caching {dim}-dimension embeddings in a {self.dim}-dimension cache")
+                return
+            records = np.zeros(len(items), dtype=self._record_dtype(dim))
+            records['key'] = [k for k, _ in items]
+            records['vector'] = [v for _, v in items]
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'ab') as f:
+                    if f.tell() == 0:
+                        f.write(HEADER.pack(MAGIC, dim))
+                    f.write(records.tobytes())
+            except Exception as e:
+                self.logger.warning(f"Could not write embedding cache: {e}")
+                return
+            self.dim = dim
+            for record in records:
+                self.rows[bytes(record['key'])] = record['vector']
+
+
+class OllamaEmbedder:
+    """
+    Text embeddings from Ollama, returned as float32 rows. Cached texts are served from
+    disk; the rest are deduplicated and sent in batches to `/api/embed`, falling back
+    to one `/api/embeddings` request per text on Ollama versions without it.
+    """
+
+    def __init__(self, host: str = 'http://localhost:11434', model: str = 'nomic-embed-text',
+                 timeout: float = 60, batch_size: int = 64, retry_policy: Optional[RetryPolicy] = None,
+                 cache: Optional[EmbeddingCache] = None):
+        self.logger = logging.getLogger(__name__)
+        self.host = host.rstrip('/')
+        self.model = model
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache if cache is not None else EmbeddingCache(model)
+        self.session = requests.Session()
+        self.batch_supported = True
+
+    @classmethod
+    def from_config(cls, config: Optional[OllamaConfig] = None) -> 'OllamaEmbedder':
+        """The shared embedder for the configured host and model, so agents reuse one cache."""
+        config = config or get_config().ollama
+        key = (config.host, config.embed_model)
+        with _shared_lock:
+            if key not in _shared:
+                _shared[key] = cls(config.host, config.embed_model, timeout=config.timeout,
+                                   batch_size=config.embed_batch_size,
+                                   retry_policy=RetryPolicy.from_config(config))
+            return _shared[key]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """One row per text. Raises on failure once retries are exhausted."""
+        keys = [text_key(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            hit = self.cache.get(key) is not None
+            cache_stats.record('embeddings', hit)
+            if not hit:
+                missing.setdefault(key, text)
+
+        fetched = {}
+        if missing:
+            self.logger.info(f"Embedding {len(missing)} texts ({len(texts) - len(missing)} cached)")
+            pending = list(missing.items())
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                vectors = self._request_batch([text for _, text in batch])
+                fetched.update((key, np.asarray(v, dtype=np.float32)) for (key, _), v in zip(batch, vectors))
+            self.cache.put_many(list(fetched.items()))
+
+        return np.array([fetched[k] if k in fetched else self.cache.get(k) for k in keys], dtype=np.float32)
+
+    def _request_batch(self, texts: List[str]) -> List[List[float]]:
+        if self.batch_supported:
+            try:
+                return self._post('/api/embed', {'model': self.model, 'input': texts})['embeddings']
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code != 404 or self._is_model_error(e.response):
+                    raise
+                self.logger.info("Ollama has no /api/embed, falling back to /api/embeddings")
+                self.batch_supported = False
+        return [self._post('/api/embeddings', {'model': self.model, 'prompt': text})['embedding']
+                for text in texts]
+
+    @staticmethod
+    def _is_model_error(response: requests.Response) -> bool:
+        """
+        Ollama also answers 404 for an unknown model (with a JSON error naming it); only a
+        404 for the route itself means the server predates /api/embed.
+        """
+        try:
+            error = response.json().get('error', '')
+        except ValueError:
+            return False
+        return 'model' in str(error).lower()
+
+    def _post(self, path: str, payload: Dict) -> Dict:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.post(f"{self.host}{path}", json=payload, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+            except Exception as e:
+                if is_transient(e) and attempt < self.retry_policy.max_attempts:
+                    self.logger.warning(f"Embedding request failed (attempt {attempt}), retrying: {e}")
+                    self.retry_policy.sleep(attempt)
+                    continue
+                raise
+
+
+_shared: Dict[Tuple[str, str], OllamaEmbedder] = {}
+_shared_lock = threading.Lock()
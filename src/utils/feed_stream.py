@@ -0,0 +1,59 @@
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator
+
+# Element names (namespace stripped) that start a feed entry
+ENTRY_TAGS = {'item', 'entry'}
+
+
+def _local(tag: str) -> str:
+    """Tag name without its XML namespace."""
+    return tag.rsplit('}', 1)[-1] if '}' in tag else tag
+
+
+def _entry_to_dict(elem: ET.Element) -> Dict:
+    """Map an RSS <item> or Atom <entry> onto the keys feedparser entries expose."""
+    entry = {}
+    for child in elem:
+        name = _local(child.tag)
+        text = (child.text or '').strip()
+        if name == 'title':
+            entry['title'] = text
+        elif name == 'link':
+            # Atom links carry the URL in href; prefer rel="alternate" (or no rel)
+            href = child.get('href')
+            if href and child.get('rel', 'alternate') == 'alternate':
+                entry['link'] = href
+            elif text and 'link' not in entry:
+                entry['link'] = text
+        elif name in ('description', 'summary') or (name == 'content' and 'summary' not in entry):
+            entry['summary'] = text
+        elif name in ('pubDate', 'published') or (name == 'updated' and 'published' not in entry):
+            entry['published'] = text
+        elif name == 'source':
+            entry['source'] = {'title': text or child.findtext('{*}title', '').strip(),
+                               'href': child.get('url', '')}
+    return entry
+
+
+def iter_feed_entries(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    """
+    Incrementally parse an RSS or Atom document and yield entries as soon as each one
+    is complete. Parsed entries are detached from the tree, so memory stays flat no
+    matter how large the feed is, and the caller can stop reading at any point.
+    Raises xml.etree.ElementTree.ParseError on malformed XML.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
+            stack.pop()
+            if _local(elem.tag) in ENTRY_TAGS:
+                yield _entry_to_dict(elem)
+                if stack:
+                    stack[-1].remove(elem)
+                elem.clear()
+    parser.close()
@@ -0,0 +1,152 @@
+import re
+from html.parser import HTMLParser
+from typing import List
+
+# Elements whose content is never article text
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'nav', 'header', 'footer',
+             'aside', 'form', 'button', 'select', 'iframe', 'figure'}
+# Elements that start a new block of text
+BLOCK_TAGS = {'p', 'div', 'section', 'article', 'main', 'li', 'blockquote', 'pre', 'td',
+              'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'br', 'tr', 'dd', 'dt'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+# Class/id fragments that mark page chrome rather than content
+BOILERPLATE = re.compile(r'comment|cookie|banner|share|social|related|promo|subscribe|newsletter|'
+                         r'sidebar|menu|breadcrumb|footer|header|advert|\bads?\b', re.I)
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+             'param', 'source', 'track', 'wbr'}
+
+MIN_WORDS = 8
+MAX_LINK_DENSITY = 0.5
+
+
+class _Block:
+    __slots__ = ('parts', 'link_chars', 'in_article', 'heading')
+
+    def __init__(self, in_article: bool, heading: bool):
+        self.parts = []
+        self.link_chars = 0
+        self.in_article = in_article
+        self.heading = heading
+
+    @property
+    def text(self) -> str:
+        return ' '.join(' '.join(self.parts).split())
+
+
+class _TextCollector(HTMLParser):
+    """Splits a page into text blocks, tracking link text and whether a block sits in <article>/<main>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[_Block] = []
+        self.skip_depth = 0
+        self.article_depth = 0
+        self.link_depth = 0
+        self.heading_depth = 0
+        self.stack = []
+        self.title = ''
+        self.in_title = False
+        self._new_block()
+
+    def _new_block(self):
+        self.current = _Block(self.article_depth > 0, self.heading_depth > 0)
+        self.blocks.append(self.current)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self.in_title = True
+        if tag in VOID_TAGS:
+            if tag == 'br' and not self.skip_depth:
+                self._new_block()
+            return
+        attrs = dict(attrs)
+        marker = f"{attrs.get('class') or ''} {attrs.get('id') or ''}"
+        skip = tag in SKIP_TAGS or (tag not in ('article', 'main', 'body') and BOILERPLATE.search(marker))
+        self.stack.append((tag, bool(skip)))
+        if skip:
+            self.skip_depth += 1
+            return
+        if tag in ('article', 'main'):
+            self.article_depth += 1
+        if tag == 'a':
+            self.link_depth += 1
+        if tag in HEADING_TAGS:
+            self.heading_depth += 1
+        if tag in BLOCK_TAGS:
+            self._new_block()
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self.in_title = False
+        if tag in VOID_TAGS or not any(open_tag == tag for open_tag, _ in self.stack):
+            return
+        # Close everything up to the matching tag, tolerating unclosed children
+        while self.stack:
+            open_tag, skipped = self.stack.pop()
+            if skipped:
+                self.skip_depth -= 1
+            elif open_tag in ('article', 'main'):
+                self.article_depth -= 1
+            elif open_tag == 'a':
+                self.link_depth -= 1
+            elif open_tag in HEADING_TAGS:
+                self.heading_depth -= 1
+            if not skipped and open_tag in BLOCK_TAGS:
+                self._new_block()
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+            return
+        if self.skip_depth or not data.strip():
+            return
+        self.current.parts.append(data)
+        if self.link_depth:
+            self.current.link_chars += len(data.strip())
+
+
+def _is_content(block: _Block) -> bool:
+    text = block.text
+    if not text:
+        return False
+    if block.link_chars / len(text) > MAX_LINK_DENSITY:
+        return False
+    return block.heading or len(text.split()) >= MIN_WORDS
+
+
+def extract_text(html: str) -> str:
+    """
+    Main text of an HTML page as paragraphs separated by blank lines. Drops scripts,
+    navigation and other page chrome, then keeps blocks that read like prose (enough
+    words, few links). When the page marks up an <article> or <main>, only blocks
+    inside it are considered.
+    """
+    collector = _TextCollector()
+    collector.feed(html)
+    collector.close()
+
+    blocks = [b for b in collector.blocks if _is_content(b)]
+    if any(b.in_article and not b.heading for b in blocks):
+        blocks = [b for b in blocks if b.in_article]
+    # Headings only help when they introduce text, so drop trailing ones
+    while blocks and blocks[-1].heading:
+        blocks.pop()
+    return '\n\n'.join(b.text for b in blocks)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, chars_per_token: int = 4) -> str:
+    """
+    Shorten text to roughly `max_tokens` tokens (about four characters each for English),
+    cutting at the last paragraph or sentence boundary that fits.
+    """
+    limit = max_tokens * chars_per_token
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    for boundary in ('\n\n', '. ', '\n'):
+        index = cut.rfind(boundary)
+        if index > limit // 2:
+            return cut[:index + (1 if boundary == '. ' else 0)].rstrip()
+    return cut.rsplit(' ', 1)[0]
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from src.utils.records import Post
+
+
+def frontmatter(post: Post) -> Dict:
+    """Metadata of a post without its body."""
+    return {
+        'id': post.id,
+        'title': post.title,
+        'slug': post.slug,
+        'date': post.date,
+        'excerpt': post.excerpt,
+        'category': post.category,
+        'keywords': list(post.keywords),
+        'readTime': post.read_time,
+        'source': post.source,
+        'sourceLink': post.source_link
+    }
+
+
+def render_markdown(post: Post) -> str:
+    return post.content.rstrip() + '\n'
+
+
+def render_json(post: Post) -> str:
+    return json.dumps(frontmatter(post), indent=2, ensure_ascii=False) + '\n'
+
+
+def render_typescript(post: Post) -> str:
+    # JSON string literals are valid TypeScript, so json.dumps handles all escaping
+    lines = ['const post = {']
+    for key, value in frontmatter(post).items():
+        lines.append(f"  {key}: {json.dumps(value, ensure_ascii=False)},")
+    lines.append(f"  content: {json.dumps(post.content, ensure_ascii=False)},")
+    lines.append('};')
+    lines.append('')
+    lines.append('export default post;')
+    return '\n'.join(lines) + '\n'
+
+
+RENDERERS = {
+    'md': render_markdown,
+    'json': render_json,
+    'ts': render_typescript
+}
+
+
+class OutputWriter:
+    """
+    Writes files via temp-file-and-rename so readers never see a half-written post.
+    Inside `batch()`, fsyncs and renames are deferred and done together when the
+    batch closes, so a multi-post run pays for one sync round instead of one per file.
+    A batch covers the writes of the thread that opened it; one writer can be shared
+    by a thread pool.
+    """
+
+    def __init__(self, fsync: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.fsync = fsync
+        # Batches are per thread, so worker threads sharing a writer never commit or
+        # discard each other's files
+        self._local = threading.local()
+
+    @property
+    def _pending(self) -> List[Tuple[str, Path]]:
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = []
+        return self._local.pending
+
+    @_pending.setter
+    def _pending(self, value: List[Tuple[str, Path]]):
+        self._local.pending = value
+
+    @property
+    def _batch_depth(self) -> int:
+        return getattr(self._local, 'depth', 0)
+
+    @_batch_depth.setter
+    def _batch_depth(self, value: int):
+        self._local.depth = value
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._discard()
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._commit()
+
+    def write(self, path: Path, text: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            # mkstemp creates 0600 files; posts should stay readable by the web server
+            os.chmod(tmp_path, 0o644)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        self._pending.append((tmp_path, path))
+        if self._batch_depth == 0:
+            self._commit()
+
+    def write_post(self, post: Post, targets: Dict[str, Path]) -> Dict[str, str]:
+        """Render one in-memory post into every requested format. Returns format -> path."""
+        written = {}
+        with self.batch():
+            for fmt, path in targets.items():
+                renderer = RENDERERS.get(fmt)
+                if renderer is None:
+                    raise ValueError(f"Unknown output format: {fmt}")
+                self.write(path, renderer(post))
+                written[fmt] = str(path)
+        return written
+
+    def _commit(self):
+        pending, self._pending = self._pending, []
+        if self.fsync:
+            for tmp_path, _ in pending:
+                fd = os.open(tmp_path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        for tmp_path, path in pending:
+            os.replace(tmp_path, path)
+        if self.fsync:
+            # Persist the renames themselves, once per directory
+            for directory in {path.parent for _, path in pending}:
+                self._fsync_dir(directory)
+
+    def _discard(self):
+        pending, self._pending = self._pending, []
+        for tmp_path, _ in pending:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+
+    def _fsync_dir(self, directory: Path):
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return  # Directories cannot be opened on some platforms (e.g. Windows)
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            self.logger.debug(f"Directory fsync failed for {directory}: {e}")
+        finally:
+            os.close(fd)
+
+
+def atomic_write(path: Path, text: str):
+    """Write a single file atomically."""
+    OutputWriter().write(path, text)
@@ -0,0 +1,176 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from src.utils.config import BlogConfig
+from src.utils.records import Story
+
+# A section needs at least this many words of body text to count as written
+MIN_SECTION_WORDS = 40
+# Posts shorter than this fraction of BLOG_CONTENT_LENGTH words get their thinnest sections expanded
+MIN_LENGTH_RATIO = 0.5
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+# Chatty lead-ins and sign-offs models add around the post itself
+PREAMBLE = re.compile(
+    r"^(here('s| is| are)\b|sure\b|certainly\b|of course\b|okay\b|absolutely\b|below is\b|"
+    r"i('ve| have) (written|created|drafted)\b).*", re.IGNORECASE)
+POSTAMBLE = re.compile(
+    r"^(let me know\b|i hope (this|you)\b|feel free to\b|if you('d| would) like\b|"
+    r"would you like\b).*", re.IGNORECASE)
+FENCE = re.compile(r'^```(?:markdown|md)?\s*\n(.*?)\n```\s*$', re.DOTALL | re.IGNORECASE)
+REFERENCES = re.compile(r'^(references|sources|further reading)$', re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    """A heading and the text under it. The text before the first heading has level 0."""
+    heading: str
+    level: int
+    body: str
+
+    @property
+    def is_references(self) -> bool:
+        return bool(REFERENCES.match(self.heading.strip(' :*')))
+
+    def words(self) -> int:
+        return len(self.body.split())
+
+    def render(self) -> str:
+        if self.level == 0:
+            return self.body.strip()
+        return f"{'#' * self.level} {self.heading}\n\n{self.body.strip()}".rstrip()
+
+
+@dataclass(frozen=True, slots=True)
+class Issue:
+    """A problem `repair_post` cannot fix on its own. `section` indexes split_sections()."""
+    code: str
+    message: str
+    section: int = -1
+
+
+def split_sections(content: str) -> List[Section]:
+    sections = []
+    heading, level, lines = '', 0, []
+    in_code = False
+    for line in content.split('\n'):
+        if line.lstrip().startswith('```'):
+            in_code = not in_code
+        match = None if in_code else HEADING.match(line)
+        if match:
+            if level or '\n'.join(lines).strip():
+                sections.append(Section(heading, level, '\n'.join(lines).strip('\n')))
+            heading, level, lines = match.group(2), len(match.group(1)), []
+        else:
+            lines.append(line)
+    sections.append(Section(heading, level, '\n'.join(lines).strip('\n')))
+    return sections
+
+
+def join_sections(sections: List[Section]) -> str:
+    return '\n\n'.join(s.render() for s in sections if s.render()) + '\n'
+
+
+def body_sections(sections: List[Section]) -> List[int]:
+    """Indexes of the post's content sections: not the title, intro or references."""
+    return [i for i, s in enumerate(sections) if s.level >= 2 and not s.is_references]
+
+
+def _strip_chatter(content: str) -> Tuple[str, List[str]]:
+    fixes = []
+    paragraphs = content.strip().split('\n\n')
+    while paragraphs and PREAMBLE.match(paragraphs[0].strip()) and not paragraphs[0].lstrip().startswith('#'):
+        fixes.append(f"removed preamble '{paragraphs.pop(0).strip()[:40]}'")
+    while paragraphs and POSTAMBLE.match(paragraphs[-1].strip()):
+        fixes.append(f"removed sign-off '{paragraphs.pop().strip()[:40]}'")
+    content = '\n\n'.join(paragraphs)
+    fenced = FENCE.match(content)
+    if fenced:
+        content, more = _strip_chatter(fenced.group(1))
+        fixes += ['removed code fence around the post'] + more
+    return content, fixes
+
+
+def repair_post(content: str, story: Story, config: BlogConfig) -> Tuple[str, List[str]]:
+    """
+    Fix what can be fixed without the model, returning the content and a description of
+    each fix. Idempotent: removes preambles, sign-offs and wrapping code fences, merges
+    sections beyond BLOG_MAX_PARAGRAPHS into their predecessors, and makes sure the post
+    ends with a References section linking the source story.
+    """
+    content, fixes = _strip_chatter(content)
+    sections = split_sections(content)
+
+    body = body_sections(sections)
+    while len(body) > config.max_paragraphs:
+        # Fold the shortest section (never the first) into the one before it
+        index = min(body[1:], key=lambda i: sections[i].words())
+        previous = sections[index - 1]
+        merged = f"{previous.body.rstrip()}\n\n{sections[index].body.strip()}".strip()
+        sections[index - 1] = Section(previous.heading, previous.level, merged)
+        fixes.append(f"merged section '{sections[index].heading}' into '{previous.heading}'")
+        del sections[index]
+        body = body_sections(sections)
+
+    if config.include_references and story.url:
+        references = [i for i, s in enumerate(sections) if s.is_references and s.level]
+        link = f"- [{story.title}]({story.url})"
+        if not references:
+            level = max(2, min((s.level for s in sections if s.level), default=2))
+            sections.append(Section('References', level, link))
+            fixes.append('added References section')
+        elif story.url not in sections[references[-1]].body:
+            ref = sections[references[-1]]
+            sections[references[-1]] = Section(ref.heading, ref.level, f"{link}\n{ref.body}".strip())
+            fixes.append('added source link to References')
+        # References belong at the end
+        last = [i for i, s in enumerate(sections) if s.is_references and s.level][-1]
+        if last != len(sections) - 1:
+            sections.append(sections.pop(last))
+            fixes.append('moved References to the end')
+
+    return join_sections(sections), fixes
+
+
+def apply_regenerated(content: str, sections: Dict[int, str], additions: str = '') -> str:
+    """
+    Put regenerated text into a post: `sections` maps split_sections() indexes to new
+    body text, and `additions` holds whole new sections, inserted before References.
+    """
+    parts = split_sections(content)
+    for index, text in sections.items():
+        text, _ = _strip_chatter(text)
+        # Models often repeat the heading they were asked to write under
+        lines = text.split('\n')
+        while lines and (not lines[0].strip() or HEADING.match(lines[0])):
+            lines.pop(0)
+        if '\n'.join(lines).strip():
+            parts[index] = Section(parts[index].heading, parts[index].level, '\n'.join(lines).strip())
+    if additions:
+        additions, _ = _strip_chatter(additions)
+        new = [s for s in split_sections(additions) if s.level >= 2 and not s.is_references and s.body.strip()]
+        end = next((i for i, s in enumerate(parts) if s.is_references and s.level), len(parts))
+        parts[end:end] = new
+    return join_sections(parts)
+
+
+def find_issues(content: str, config: BlogConfig) -> List[Issue]:
+    """Problems only the model can fix: too few sections, empty or thin sections, a short post."""
+    sections = split_sections(content)
+    body = body_sections(sections)
+    issues = []
+    if len(body) < config.min_paragraphs:
+        issues.append(Issue('too_few_sections',
+                            f"{len(body)} sections, at least {config.min_paragraphs} required"))
+    for i in body:
+        if sections[i].words() < MIN_SECTION_WORDS:
+            issues.append(Issue('thin_section', f"Section '{sections[i].heading}' has only "
+                                                f"{sections[i].words()} words", i))
+    words = sum(s.words() for s in sections if not s.is_references)
+    if words < config.content_length * MIN_LENGTH_RATIO:
+        thin = {issue.section for issue in issues}
+        # Expand the two thinnest sections not already flagged
+        for i in sorted((i for i in body if i not in thin), key=lambda i: sections[i].words())[:2]:
+            issues.append(Issue('short_post', f"Post has {words} words, target is {config.content_length}", i))
+    return issues
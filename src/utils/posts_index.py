@@ -0,0 +1,192 @@
+import base64
+import hashlib
+import logging
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.records import Post, Story
+
+INDEX_PATH = Path(__file__).parent.parent.parent / 'output' / 'posts_index.db'
+
+# Post metadata stored at write time so listings never have to open the post files
+METADATA_COLUMNS = {
+    'slug': 'TEXT',
+    'date': 'TEXT',
+    'excerpt': 'TEXT',
+    'category': 'TEXT',
+    'read_time': 'INTEGER',
+    'source': 'TEXT',
+}
+LISTING_FIELDS = ('id', 'title', 'slug', 'date', 'excerpt', 'category', 'read_time', 'source',
+                  'source_url', 'path', 'updated_at')
+
+
+def title_hash(title: str) -> str:
+    """Hash of a title with case, punctuation and spacing normalised away."""
+    normalized = re.sub(r'[^\w]+', ' ', (title or '').lower()).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class PostsIndex:
+    """
+    SQLite index of generated posts. Allocates post IDs atomically (safe across
+    concurrent writers) and records which source URLs and titles were already covered.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, legacy_posts_dir: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(db_path or INDEX_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db(legacy_posts_dir)
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit mode so each method controls its own transaction
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self, legacy_posts_dir: Optional[Path]):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS posts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source_url TEXT UNIQUE,
+                    title TEXT,
+                    title_hash TEXT,
+                    path TEXT,
+                    status TEXT NOT NULL DEFAULT 'reserved',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_title_hash ON posts(title_hash)")
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(posts)")}
+            for column, kind in METADATA_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE posts ADD COLUMN {column} {kind}")
+            if legacy_posts_dir is not None:
+                self._seed_from_legacy(conn, Path(legacy_posts_dir))
+
+    def _seed_from_legacy(self, conn: sqlite3.Connection, posts_dir: Path):
+        """Continue numbering after post<N>.ts files written before the index existed."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0] == 0:
+                post_nums = [int(p.stem[4:]) for p in posts_dir.glob('post*.ts') if p.stem[4:].isdigit()]
+                if post_nums:
+                    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'posts'")
+                    conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('posts', ?)",
+                                 (max(post_nums),))
+                    self.logger.info(f"Seeded posts index after existing post{max(post_nums)}.ts")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def reserve(self, source_url: str, title: str) -> int:
+        """
+        Allocate a post ID for a story. Reserving the same source URL (or, for stories
+        without one, the same title) twice returns the same ID, so a resumed run reuses its slot.
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if source_url:
+                    row = conn.execute("SELECT id FROM posts WHERE source_url = ?", (source_url,)).fetchone()
+                else:
+                    # Without a URL the title is the story's identity (NULL never matches `=`)
+                    row = conn.execute("SELECT id FROM posts WHERE source_url IS NULL AND title_hash = ?",
+                                       (title_hash(title),)).fetchone()
+                if row:
+                    post_id = row['id']
+                else:
+                    cursor = conn.execute(
+                        "INSERT INTO posts (source_url, title, title_hash, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (source_url or None, title, title_hash(title), now, now))
+                    post_id = cursor.lastrowid
+                conn.execute("COMMIT")
+                return post_id
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def complete(self, post_id: int, path: str, post: Optional[Post] = None):
+        """Mark a reserved post as written to `path`, storing its listing metadata if given."""
+        metadata = {}
+        if post is not None:
+            metadata = {'title': post.title, 'slug': post.slug, 'date': post.date, 'excerpt': post.excerpt,
+                        'category': post.category, 'read_time': post.read_time, 'source': post.source}
+        assignments = ''.join(f", {column} = ?" for column in metadata)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE posts SET path = ?, status = 'written', updated_at = ?{assignments} WHERE id = ?",
+                         (str(path), datetime.now().isoformat(), *metadata.values(), post_id))
+
+    def list_posts(self, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of written posts, newest first, and the cursor for the next page (None
+        on the last page). Cursors are keyset positions, so a page costs the same no
+        matter how deep it is and stays stable while new posts are added.
+        """
+        before = self._decode_cursor(cursor) if cursor else None
+        query = f"SELECT {', '.join(LISTING_FIELDS)} FROM posts WHERE status = 'written'"
+        params = []
+        if before is not None:
+            query += " AND id < ?"
+            params.append(before)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+        with self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(query, params)]
+        next_cursor = self._encode_cursor(rows[limit - 1]['id']) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def get_post(self, post_id: int) -> Optional[Dict]:
+        """Metadata of a written post, or None."""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(LISTING_FIELDS)} FROM posts "
+                               "WHERE id = ? AND status = 'written'", (post_id,)).fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def _encode_cursor(post_id: int) -> str:
+        return base64.urlsafe_b64encode(str(post_id).encode()).decode().rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> int:
+        """Raises ValueError for cursors this index did not produce."""
+        try:
+            return int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+
+    def is_covered(self, source_url: str, title: str) -> bool:
+        """Check whether a story was already written, by source URL or normalised title."""
+        with self._connect() as conn:
+            return self._is_covered(conn, source_url, title)
+
+    @staticmethod
+    def _is_covered(conn: sqlite3.Connection, source_url: str, title: str) -> bool:
+        row = conn.execute(
+            "SELECT 1 FROM posts WHERE status = 'written' AND (source_url = ? OR title_hash = ?) LIMIT 1",
+            (source_url, title_hash(title))).fetchone()
+        return row is not None
+
+    def filter_new(self, stories: List[Story]) -> List[Story]:
+        """Drop stories that already have a published post."""
+        if not stories:
+            return stories
+        with self._connect() as conn:
+            fresh = [s for s in stories if not self._is_covered(conn, s.url, s.title)]
+        if len(fresh) < len(stories):
+            self.logger.info(f"Skipped {len(stories) - len(fresh)} stories already covered by earlier posts")
+        return fresh
@@ -0,0 +1,60 @@
+import json
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, TextIO
+
+
+class ProgressReporter:
+    """
+    Writes run progress as JSON lines (one event per line) for a parent process to
+    follow, e.g. the web app's live run view. Disabled reporters accept every call
+    and write nothing, so callers never need to check.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, enabled: bool = True, token_interval: float = 0.5):
+        self.stream = stream or sys.stdout
+        self.enabled = enabled
+        self.token_interval = token_interval
+        self.lock = threading.Lock()
+        # stage -> (tokens, seconds), kept even when disabled so the run history can use it
+        self.tokens = {}
+
+    def emit(self, event: str, **data):
+        if not self.enabled:
+            return
+        line = json.dumps({'event': event, 'time': round(time.time(), 3), **data}, ensure_ascii=False)
+        with self.lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def token_counter(self, stage: str) -> Callable[[str], None]:
+        """
+        An `on_token` callback for streamed generations. Ollama streams about one token
+        per chunk, so chunks are counted as tokens; a `tokens` event with the running
+        count and rate is emitted at most every `token_interval` seconds.
+        """
+        started = time.monotonic()
+        state = {'count': 0, 'seconds': 0.0, 'reported_at': started}
+
+        def on_token(piece: str):
+            state['count'] += 1
+            now = time.monotonic()
+            state['seconds'] = now - started
+            self.tokens[stage] = (state['count'], state['seconds'])
+            if now - state['reported_at'] >= self.token_interval:
+                state['reported_at'] = now
+                self.emit('tokens', stage=stage, count=state['count'],
+                          tokens_per_sec=round(state['count'] / max(now - started, 1e-6), 1))
+
+        # The rate up to the last token, so work done after the stream (e.g. repairs) doesn't dilute it
+        on_token.finish = lambda: self.emit(
+            'tokens', stage=stage, count=state['count'], done=True,
+            tokens_per_sec=round(state['count'] / max(state['seconds'], 1e-6), 1))
+        return on_token
+
+    def token_totals(self) -> Dict[str, float]:
+        """Tokens generated across all stages and the overall generation rate."""
+        count = sum(c for c, _ in self.tokens.values())
+        seconds = sum(s for _, s in self.tokens.values())
+        return {'tokens': count, 'tokens_per_sec': round(count / seconds, 1) if seconds else None}
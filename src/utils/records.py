@@ -0,0 +1,113 @@
+import dataclasses
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple, Type, TypeVar
+
+T = TypeVar('T')
+
+
+class RecordMixin:
+    """JSON (Lines) serialisation shared by the pipeline records."""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls: Type[T], data: Dict) -> T:
+        # Ignore unknown keys so older checkpoints and caches stay readable
+        names = {f.name for f in dataclasses.fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls: Type[T], line: str) -> T:
+        return cls.from_dict(json.loads(line))
+
+
+@dataclass(frozen=True, slots=True)
+class Story(RecordMixin):
+    """A news item as normalised by the scraper."""
+    title: str
+    description: str = ''
+    url: str = ''
+    published_at: str = ''
+    source: str = 'Unknown'
+    keywords: Tuple[str, ...] = ()
+    content: str = ''  # Full article text, filled in by the article fetcher
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Story':
+        story = super(Story, cls).from_dict(data)
+        return dataclasses.replace(story, keywords=tuple(story.keywords))
+
+
+@dataclass(frozen=True, slots=True)
+class Selection(RecordMixin):
+    """The story picked by the selector and why. The story itself is never modified."""
+    story: Story
+    reason: str = ''
+    index: int = -1
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Selection':
+        return cls(story=Story.from_dict(data['story']), reason=data.get('reason', ''),
+                   index=data.get('index', -1))
+
+
+@dataclass(frozen=True, slots=True)
+class Post(RecordMixin):
+    """A generated post; every output format and publish target renders from this."""
+    id: int
+    title: str
+    slug: str
+    date: str
+    content: str
+    excerpt: str = ''
+    category: str = ''
+    read_time: int = 1
+    source: str = ''
+    source_link: str = ''
+    file_path: str = ''
+    keywords: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Post':
+        post = super(Post, cls).from_dict(data)
+        return dataclasses.replace(post, keywords=tuple(post.keywords))
+
+
+@dataclass(frozen=True, slots=True)
+class PostMetadata(RecordMixin):
+    """Title, meta description, keywords and category generated for a story's post."""
+    title: str
+    description: str = ''
+    keywords: Tuple[str, ...] = ()
+    category: str = ''
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PostMetadata':
+        metadata = super(PostMetadata, cls).from_dict(data)
+        return dataclasses.replace(metadata, keywords=tuple(metadata.keywords))
+
+
+def dump_jsonl(records: Iterable[RecordMixin], path: Path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(record.to_json())
+            f.write('\n')
+
+
+def iter_jsonl(cls: Type[T], path: Path) -> Iterator[T]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield cls.from_json(line)
+
+
+def load_jsonl(cls: Type[T], path: Path) -> List[T]:
+    return list(iter_jsonl(cls, path))
@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call runs past the deadline handed down by its caller."""
+
+
+class OllamaError(RuntimeError):
+    """An error Ollama reported in its response stream (unknown model, context too long, ...). Not retried."""
+
+
+class Deadline:
+    """Absolute point in time shared by every call made on behalf of one run."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cap(self, timeout: float) -> float:
+        """Shrink a per-call timeout so it never outlives the deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return max(0.1, min(timeout, remaining))
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for transient LLM and HTTP failures."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 2.0,
+                 max_delay: float = 60.0, jitter: float = 0.5):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = min(max(jitter, 0.0), 1.0)
+
+    @classmethod
+    def from_config(cls, ollama_config) -> 'RetryPolicy':
+        return cls(
+            max_attempts=ollama_config.max_retries,
+            base_delay=ollama_config.retry_base_delay,
+            max_delay=ollama_config.retry_max_delay
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        # Randomise the top part of the delay so parallel callers spread out
+        return delay * (1 - self.jitter) + delay * self.jitter * random.random()
+
+    def _delay(self, attempt: int, deadline: Optional[Deadline]) -> Optional[float]:
+        delay = self.backoff(attempt)
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining is not None and remaining <= delay:
+                return None
+        return delay
+
+    def sleep(self, attempt: int, deadline: Optional[Deadline] = None) -> bool:
+        """Wait before the next attempt. Returns False if the deadline leaves no room."""
+        delay = self._delay(attempt, deadline)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+
+    async def asleep(self, attempt: int, deadline: Optional[Deadline] = None) -> bool:
+        """`sleep` for coroutines; cancelling the task interrupts the wait."""
+        delay = self._delay(attempt, deadline)
+        if delay is None:
+            return False
+        import asyncio  # Deferred: only the async client needs it
+        await asyncio.sleep(delay)
+        return True
+
+
+def is_transient(error: Exception) -> bool:
+    """Check whether an error is worth retrying."""
+    import requests  # Deferred so importing this module stays cheap at startup
+
+    if isinstance(error, (requests.exceptions.ConnectionError,
+                          requests.exceptions.Timeout,
+                          requests.exceptions.ChunkedEncodingError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    # Only check asyncio/aiohttp errors when the async client has loaded them
+    asyncio = sys.modules.get('asyncio')
+    if asyncio is not None and isinstance(error, asyncio.TimeoutError):
+        return True
+    aiohttp = sys.modules.get('aiohttp')
+    if aiohttp is not None:
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status == 429 or error.status >= 500
+        if isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+            return True
+    return False
+
+
+def idempotency_key(*parts: str) -> str:
+    """Stable key identifying a request regardless of which run issues it."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or '').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class SalvageStore:
+    """Keeps partially generated text on disk so an interrupted call can continue it."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory or Path(__file__).parent.parent.parent / 'output' / '.salvage')
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.txt"
+
+    def load(self, key: str) -> str:
+        try:
+            return self._path(key).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return ''
+        except Exception as e:
+            self.logger.warning(f"Could not read salvaged output {key}: {e}")
+            return ''
+
+    def save(self, key: str, text: str):
+        if not text:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._path(key).write_text(text, encoding='utf-8')
+        except Exception as e:
+            self.logger.warning(f"Could not save partial output {key}: {e}")
+
+    def clear(self, key: str):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
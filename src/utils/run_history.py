@@ -0,0 +1,174 @@
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+HISTORY_PATH = Path(__file__).parent.parent.parent / 'output' / 'run_history.db'
+
+# Per-run metrics, beyond run_id/status/timestamps, that `finish` accepts
+METRIC_COLUMNS = {
+    'model': 'TEXT',
+    'stories': 'INTEGER',
+    'tokens': 'INTEGER',
+    'tokens_per_sec': 'REAL',
+    'cache_hits': 'INTEGER',
+    'cache_misses': 'INTEGER',
+    'post_id': 'INTEGER',
+    'error': 'TEXT',
+}
+
+
+class CacheStats:
+    """Hit/miss counts of the on-disk caches (embeddings, articles, summaries) in this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def record(self, cache: str, hit: bool):
+        with self.lock:
+            (self.hits if hit else self.misses)[cache] += 1
+
+    def totals(self) -> Dict[str, int]:
+        with self.lock:
+            return {'cache_hits': sum(self.hits.values()), 'cache_misses': sum(self.misses.values())}
+
+
+# Shared by every cache so a run can report one hit rate
+cache_stats = CacheStats()
+
+
+class RunHistory:
+    """
+    SQLite history of generator runs: when each ran, how long every stage took, which
+    model it used, token throughput, cache hit counts and the outcome. Recording never
+    raises, so a broken history database cannot fail a run.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(db_path or HISTORY_PATH)
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._init_db()
+        except Exception as e:
+            self.logger.warning(f"Run history unavailable at {self.db_path}: {e}")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = ''.join(f",\n                    {name} {kind}" for name, kind in METRIC_COLUMNS.items())
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    started_at TEXT NOT NULL,
+                    attempt_started_at TEXT,
+                    finished_at TEXT,
+                    duration REAL{columns}
+                )""")
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(runs)")}
+            if 'attempt_started_at' not in existing:
+                conn.execute("ALTER TABLE runs ADD COLUMN attempt_started_at TEXT")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS run_stages (
+                    run_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    duration REAL NOT NULL,
+                    recorded_at TEXT NOT NULL,
+                    PRIMARY KEY (run_id, stage)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_model_started_at ON runs(model, started_at)")
+
+    def start(self, run_id: str):
+        """
+        Record that a run started, or was resumed. A resumed run keeps its original
+        start time but its duration only counts the time spent in each attempt.
+        """
+        now = datetime.now().isoformat()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO runs (run_id, started_at, attempt_started_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(run_id) DO UPDATE SET status = 'running', "
+                    "attempt_started_at = excluded.attempt_started_at",
+                    (run_id, now, now))
+        except Exception as e:
+            self.logger.warning(f"Could not record start of run {run_id}: {e}")
+
+    def record_stage(self, run_id: str, stage: str, status: str, duration: float):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO run_stages (run_id, stage, status, duration, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (run_id, stage, status, round(duration, 3), datetime.now().isoformat()))
+        except Exception as e:
+            self.logger.warning(f"Could not record stage {stage} of run {run_id}: {e}")
+
+    def finish(self, run_id: str, status: str, **metrics):
+        """
+        Record the outcome of a run along with any of the METRIC_COLUMNS. The duration
+        is the sum of all attempts, so time between a failure and `--resume` is not counted.
+        """
+        metrics = {k: v for k, v in metrics.items() if k in METRIC_COLUMNS and v is not None}
+        assignments = ''.join(f", {name} = ?" for name in metrics)
+        now = datetime.now()
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT started_at, attempt_started_at, duration FROM runs WHERE run_id = ?",
+                                   (run_id,)).fetchone()
+                if row is None:
+                    return
+                duration = row['duration'] or 0.0
+                # Rows written before attempts were tracked only have started_at
+                attempt_start = row['attempt_started_at'] or (row['started_at'] if row['duration'] is None else None)
+                if attempt_start:
+                    duration += (now - datetime.fromisoformat(attempt_start)).total_seconds()
+                conn.execute(
+                    f"UPDATE runs SET status = ?, finished_at = ?, duration = ?, attempt_started_at = NULL"
+                    f"{assignments} WHERE run_id = ?",
+                    (status, now.isoformat(), round(duration, 3), *metrics.values(), run_id))
+        except Exception as e:
+            self.logger.warning(f"Could not record end of run {run_id}: {e}")
+
+    def list_runs(self, limit: int = 50, model: Optional[str] = None) -> List[Dict]:
+        """Most recent runs first, each with its stage durations under `stages`."""
+        query = "SELECT * FROM runs"
+        params = []
+        if model:
+            query += " WHERE model = ?"
+            params.append(model)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            runs = [dict(row) for row in conn.execute(query, params)]
+            if not runs:
+                return []
+            placeholders = ','.join('?' * len(runs))
+            stages = {}
+            for row in conn.execute(
+                    f"SELECT run_id, stage, status, duration FROM run_stages "
+                    f"WHERE run_id IN ({placeholders}) ORDER BY recorded_at",
+                    [run['run_id'] for run in runs]):
+                stages.setdefault(row['run_id'], {})[row['stage']] = {
+                    'status': row['status'], 'duration': row['duration']}
+        for run in runs:
+            run['stages'] = stages.get(run['run_id'], {})
+        return runs
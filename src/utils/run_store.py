@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional
+
+RUNS_DIR = Path(__file__).parent.parent.parent / 'output' / 'runs'
+
+
+class RunStore:
+    """
+    Persists the output of each pipeline stage under output/runs/<run_id>/ so an
+    interrupted run can be resumed without repeating finished stages.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, base_dir: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.base_dir = Path(base_dir or RUNS_DIR)
+        self.run_id = run_id or self._new_run_id()
+        self.run_dir = self.base_dir / self.run_id
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    @classmethod
+    def resume(cls, run_id: str, base_dir: Optional[Path] = None) -> 'RunStore':
+        """Open an existing run. Raises FileNotFoundError if it was never started."""
+        run_dir = Path(base_dir or RUNS_DIR) / run_id
+        if not (run_dir / 'manifest.json').exists():
+            raise FileNotFoundError(f"No run found with ID {run_id} in {run_dir.parent}")
+        return cls(run_id=run_id, base_dir=base_dir)
+
+    @staticmethod
+    def _new_run_id() -> str:
+        return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.run_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            manifest = {
+                'run_id': self.run_id,
+                'created_at': datetime.now().isoformat(),
+                'completed': [],
+                'status': 'running'
+            }
+            self._write_json(self.run_dir / 'manifest.json', manifest)
+            return manifest
+
+    def _write_json(self, path: Path, data: Any):
+        # Write to a temp file first so a crash never leaves a truncated checkpoint
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def has(self, stage: str) -> bool:
+        return stage in self.manifest['completed']
+
+    def load(self, stage: str) -> Any:
+        with open(self.run_dir / f'{stage}.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, stage: str, data: Any):
+        self._write_json(self.run_dir / f'{stage}.json', data)
+        if stage not in self.manifest['completed']:
+            self.manifest['completed'].append(stage)
+        self.manifest['updated_at'] = datetime.now().isoformat()
+        self._write_json(self.run_dir / 'manifest.json', self.manifest)
+
+    def finish(self, status: str):
+        self.manifest['status'] = status
+        self.manifest['finished_at'] = datetime.now().isoformat()
+        self._write_json(self.run_dir / 'manifest.json', self.manifest)
+
+    @staticmethod
+    def list_runs(base_dir: Optional[Path] = None) -> List[str]:
+        base_dir = Path(base_dir or RUNS_DIR)
+        if not base_dir.exists():
+            return []
+        return sorted(p.name for p in base_dir.iterdir() if (p / 'manifest.json').exists())
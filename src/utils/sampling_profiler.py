@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler for a whole run. A background thread snapshots
+    every thread's stack each `interval` seconds (sys._current_frames, no tracing hooks)
+    and counts them as folded stacks, the input format of flamegraph.pl, speedscope and
+    similar tools. Stacks are rooted at the current pipeline stage and thread name.
+    `stage()` also records each stage's wall time and process CPU time, so time spent
+    waiting on the network or Ollama shows up as wall minus CPU.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = Counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.current_stage = 'run'  # Outside any stage
+        self.sample_count = 0
+        self.sampling_seconds = 0.0
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            began = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stage = self.current_stage
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                stack.append(stage)
+                self.samples[';'.join(reversed(stack))] += 1
+            self.sample_count += 1
+            self.sampling_seconds += time.perf_counter() - began
+
+    @contextmanager
+    def stage(self, name: str):
+        """Attribute samples to `name` and record its wall and CPU time."""
+        previous, self.current_stage = self.current_stage, name
+        wall, cpu = time.monotonic(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.monotonic() - wall, time.process_time() - cpu
+            self.stages[name] = {'wall': round(wall, 4), 'cpu': round(cpu, 4),
+                                 'waiting': round(max(0.0, wall - cpu), 4)}
+            self.current_stage = previous
+
+    def write(self, directory: Path) -> Path:
+        """Write profile.folded (one `stack count` per line) and profile.json. Returns the folded path."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        folded = directory / 'profile.folded'
+        with open(folded, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        summary = {
+            'interval': self.interval,
+            'samples': self.sample_count,
+            'duration': round(time.monotonic() - self.started_at, 4) if self.started_at else 0,
+            # The profiler's own cost, to check it is cheap enough to leave on
+            'sampling_seconds': round(self.sampling_seconds, 4),
+            'stages': self.stages,
+        }
+        with open(directory / 'profile.json', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        return folded
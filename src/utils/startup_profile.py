@@ -0,0 +1,49 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def profile_imports(modules: List[str]) -> Dict:
+    """
+    Import `modules` in a fresh interpreter under `-X importtime` and parse the report.
+    Returns the wall time of the whole import plus per-module self/cumulative microseconds.
+    """
+    code = "; ".join(["import sys", f"sys.path.insert(0, {str(PROJECT_ROOT)!r})"] +
+                     [f"import {module}" for module in modules])
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, cwd=PROJECT_ROOT)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+            'self_us': int(self_us),
+            'cumulative_us': int(cumulative_us)
+        })
+    return {'modules': modules, 'wall_ms': wall_ms, 'returncode': result.returncode, 'imports': rows}
+
+
+def format_report(profile: Dict, top: int = 15) -> str:
+    """Human-readable summary: total time and the most expensive imports."""
+    imports = profile['imports']
+    top_level = [row for row in imports if row['depth'] == 0]
+    total_us = sum(row['cumulative_us'] for row in top_level)
+    lines = [
+        f"Import profile for: {', '.join(profile['modules'])}",
+        f"  interpreter wall time: {profile['wall_ms']:.1f} ms",
+        f"  total import time:     {total_us / 1000:.1f} ms across {len(imports)} modules",
+        f"  {'cumulative ms':>14} {'self ms':>9}  module"
+    ]
+    for row in sorted(imports, key=lambda r: r['cumulative_us'], reverse=True)[:top]:
+        lines.append(f"  {row['cumulative_us'] / 1000:>14.1f} {row['self_us'] / 1000:>9.1f}  {row['module']}")
+    return "\n".join(lines)
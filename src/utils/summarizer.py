@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from src.utils.html_extract import truncate_to_tokens
+from src.utils.output_writer import OutputWriter
+from src.utils.run_history import cache_stats
+
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=[A-Z0-9"\'(\[])|\n{2,}')
+WORD = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+STOP_WORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have he her his
+how i if in into is it its just more most no not of on or our out over said she so than that
+the their them then there these they this to up was we were what when which who will with
+would you your also about after all any because before between both during each few only
+other own same some such through too under until very while
+""".split())
+
+CHARS_PER_TOKEN = 4
+DAMPING = 0.85
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_END.split(text) if s and s.strip()]
+
+
+def _tfidf(sentences: List[str]) -> np.ndarray:
+    """Row-normalised TF-IDF matrix, one row per sentence."""
+    tokens = [[w for w in WORD.findall(s.lower()) if w not in STOP_WORDS] for s in sentences]
+    vocab = {}
+    for words in tokens:
+        for word in words:
+            vocab.setdefault(word, len(vocab))
+    counts = np.zeros((len(sentences), max(1, len(vocab))), dtype=np.float32)
+    for row, words in enumerate(tokens):
+        for word in words:
+            counts[row, vocab[word]] += 1
+    doc_freq = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + doc_freq)) + 1
+    weights = np.log1p(counts) * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights / np.where(norms == 0, 1, norms)
+
+
+def rank_sentences(sentences: List[str], iterations: int = 50, tolerance: float = 1e-6) -> np.ndarray:
+    """
+    TextRank scores: PageRank over the cosine-similarity graph of the sentences, with a
+    mild bias toward the start of the text, where news articles put the key facts.
+    """
+    n = len(sentences)
+    vectors = _tfidf(sentences)
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences sharing no words with the rest link uniformly instead of leaking rank
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight == 0, 1, out_weight), 1 / n)
+
+    prior = 1 / np.sqrt(np.arange(1, n + 1, dtype=np.float32))
+    prior /= prior.sum()
+    scores = np.full(n, 1 / n, dtype=np.float32)
+    for _ in range(iterations):
+        updated = (1 - DAMPING) * prior + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(text: str, max_tokens: int) -> str:
+    """
+    Extractive summary of `text` that fits in about `max_tokens` tokens: the highest
+    ranked sentences, kept in their original order. Text already within budget is
+    returned unchanged.
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= budget:
+        return text
+    sentences = split_sentences(text)
+    if len(sentences) < 2:
+        return truncate_to_tokens(text, max_tokens)
+
+    chosen, used = [], 0
+    for index in np.argsort(-rank_sentences(sentences), kind='stable'):
+        length = len(sentences[index]) + 1
+        if used + length > budget:
+            # Stop rather than pad the budget with lower-ranked filler, unless
+            # nothing has fit yet because the top sentences are very long
+            if chosen:
+                break
+            continue
+        chosen.append(index)
+        used += length
+    if not chosen:
+        return truncate_to_tokens(text, max_tokens)
+    return ' '.join(sentences[i] for i in sorted(chosen))
+
+
+class Summarizer:
+    """`summarize` with an on-disk cache keyed by a hash of the text and the budget."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir or Path(__file__).parent.parent.parent / 'output' / '.summary_cache')
+        self.writer = OutputWriter(fsync=False)
+
+    def summarize(self, text: str, max_tokens: int) -> str:
+        if len(text) <= max_tokens * CHARS_PER_TOKEN:
+            return text
+        key = hashlib.sha256(f"{max_tokens}\0{text}".encode('utf-8')).hexdigest()
+        path = self.cache_dir / f"{key}.txt"
+        try:
+            summary = path.read_text(encoding='utf-8')
+            cache_stats.record('summaries', True)
+            return summary
+        except FileNotFoundError:
+            cache_stats.record('summaries', False)
+
+        summary = summarize(text, max_tokens)
+        self.logger.info(f"Summarised source text from {len(text)} to {len(summary)} characters")
+        try:
+            self.writer.write(path, summary)
+        except Exception as e:
+            self.logger.warning(f"Could not cache summary: {e}")
+        return summary
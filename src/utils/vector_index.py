@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.config import AppConfig, get_config
+from src.utils.records import Post, Story
+
+INDEX_DIR = Path(__file__).parent.parent.parent / 'output' / 'vector_index'
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class VectorIndex:
+    """
+    Append-only store of unit-length float32 vectors for brute-force cosine search.
+    Vectors live in one contiguous file that is memory-mapped for queries; metadata
+    is kept one JSON line per row alongside it. Keys are unique, so re-adding is a no-op.
+    """
+
+    def __init__(self, directory: Path):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.vectors_path = self.directory / 'vectors.f32'
+        self.meta_path = self.directory / 'meta.jsonl'
+        self.lock = threading.Lock()
+        self.meta: List[Dict] = []
+        self.keys = set()
+        self.dim: Optional[int] = None
+        self._matrix = None
+        self._load()
+
+    def _load(self):
+        if not self.meta_path.exists():
+            return
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            self.meta = [json.loads(line) for line in f if line.strip()]
+        self.keys = {m['key'] for m in self.meta}
+        if self.meta:
+            self.dim = self.meta[0]['dim']
+            # Drop vector rows written after the last complete metadata line (interrupted append)
+            expected = len(self.meta) * self.dim * 4
+            if self.vectors_path.stat().st_size > expected:
+                os.truncate(self.vectors_path, expected)
+
+    def __len__(self) -> int:
+        return len(self.meta)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def matrix(self) -> np.ndarray:
+        """All vectors as a read-only (rows, dim) memory map; empty when nothing is indexed."""
+        if not self.meta:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        if self._matrix is None or self._matrix.shape[0] != len(self.meta):
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                     shape=(len(self.meta), self.dim))
+        return self._matrix
+
+    def add(self, key: str, vector, **meta) -> bool:
+        """Append a vector with its metadata. Returns False if the key is already indexed."""
+        row = normalize_rows(vector)[0]
+        with self.lock:
+            if key in self.keys:
+                return False
+            if self.dim is not None and row.shape[0] != self.dim:
+                raise ValueError(f"Vector has {row.shape[0]} dimensions, index uses {self.dim}")
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Vector first: a crash before the metadata line leaves a row that _load trims
+            with open(self.vectors_path, 'ab') as f:
+                f.write(row.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            entry = {'key': key, 'dim': int(row.shape[0]), **meta}
+            with open(self.meta_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.dim = int(row.shape[0])
+            self.meta.append(entry)
+            self.keys.add(key)
+            return True
+
+    def best_matches(self, queries) -> List[Tuple[float, Optional[Dict]]]:
+        """For each query vector, the highest cosine similarity in the index and its metadata."""
+        queries = normalize_rows(queries)
+        matrix = self.matrix()
+        if matrix.shape[0] == 0:
+            return [(0.0, None)] * len(queries)
+        if queries.shape[1] != matrix.shape[1]:
+            raise ValueError(f"Query has {queries.shape[1]} dimensions, index uses {matrix.shape[1]}")
+        scores = queries @ matrix.T
+        best = scores.argmax(axis=1)
+        return [(float(scores[i, j]), self.meta[j]) for i, j in enumerate(best)]
+
+
+def story_text(story: Story) -> str:
+    return f"{story.title}\n{story.description}"
+
+
+def post_text(post: Post) -> str:
+    return f"{post.title}\n{post.excerpt}"
+
+
+class SemanticDedup:
+    """
+    Keeps the pipeline from writing about a topic it already covered: candidate stories
+    are compared against embeddings of every earlier post, and those above the
+    similarity threshold are dropped (or moved to the back of the list).
+    """
+
+    def __init__(self, embedder, index: VectorIndex, threshold: float = 0.85, mode: str = 'filter'):
+        self.logger = logging.getLogger(__name__)
+        self.embedder = embedder
+        self.index = index
+        self.threshold = threshold
+        self.mode = mode
+
+    @classmethod
+    def from_config(cls, config: Optional[AppConfig] = None) -> 'SemanticDedup':
+        from src.utils.embeddings import OllamaEmbedder
+
+        config = config or get_config()
+        # One index per embedding model, since vectors from different models don't compare
+        model_dir = re.sub(r'[^\w.-]+', '_', config.ollama.embed_model)
+        return cls(OllamaEmbedder.from_config(config.ollama), VectorIndex(INDEX_DIR / model_dir),
+                   threshold=config.news.dedup_threshold, mode=config.news.dedup_mode)
+
+    def filter_new(self, stories: List[Story]) -> List[Story]:
+        """Drop or down-rank stories too similar to an earlier post. Unchanged on embedding errors."""
+        if not stories or not len(self.index):
+            return stories
+        try:
+            matches = self.index.best_matches(self.embedder.embed([story_text(s) for s in stories]))
+        except Exception as e:
+            self.logger.warning(f"Semantic dedup skipped, embedding failed: {e}")
+            return stories
+
+        fresh, repeats = [], []
+        for story, (score, meta) in zip(stories, matches):
+            if score >= self.threshold:
+                self.logger.info(f"'{story.title}' is {score:.2f} similar to earlier post '{meta.get('title')}'")
+                repeats.append(story)
+            else:
+                fresh.append(story)
+        if repeats:
+            action = 'Skipped' if self.mode == 'filter' else 'Down-ranked'
+            self.logger.info(f"{action} {len(repeats)} stories similar to earlier posts")
+        return fresh if self.mode == 'filter' else fresh + repeats
+
+    def record(self, post: Post):
+        """Add a written post to the index so later runs avoid its topic."""
+        key = str(post.id)
+        if key in self.index:
+            return
+        try:
+            vector = self.embedder.embed([post_text(post)])[0]
+            self.index.add(key, vector, title=post.title, url=post.source_link, date=post.date)
+        except Exception as e:
+            self.logger.warning(f"Could not index post '{post.title}' for semantic dedup: {e}")
@@ -0,0 +1,155 @@
+import sys
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from apscheduler.schedulers.background import BackgroundScheduler
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.records import Story
+from web.adaptive import AdaptivePlanner, SourceProbe, ollama_busy
+from web.scheduler import JOB_ID, apply_schedule
+
+
+def stories(*titles):
+    return [Story(title=title) for title in titles]
+
+
+def test_skips_batches_and_defers(tmp_path):
+    feed = {'stories': stories('A', 'B')}
+    load = {'busy': None}
+    planner = AdaptivePlanner(str(tmp_path / 'state.json'),
+                              {'batch_threshold': 2, 'max_batch': 3, 'max_hours': 24, 'max_defer_minutes': 60},
+                              lambda: feed['stories'], lambda: load['busy'])
+
+    # First check: never run before, so anything new runs
+    assert planner.check(now=1000) == ('run', 1, '2 new stories')
+    planner.record_run()
+    assert planner.check(now=2000)[0] == 'skip'
+
+    # One new story is below the batch threshold and the last run is recent
+    feed['stories'] = stories('A', 'B', 'C')
+    assert planner.check(now=3000)[:2] == ('skip', 0)
+
+    # Five new stories make two runs of the batch
+    feed['stories'] = stories('A', 'B', 'C', 'D', 'E', 'F', 'G')
+    load['busy'] = 'Ollama has other models loaded: other'
+    assert planner.check(now=4000) == ('defer', 0, load['busy'])
+    # ... until deferring has gone on too long
+    assert planner.check(now=4000 + 3601) == ('run', 2, '5 new stories')
+
+
+def test_failed_run_leaves_stories_new(tmp_path):
+    planner = AdaptivePlanner(str(tmp_path / 'state.json'), {'batch_threshold': 1},
+                              lambda: stories('A', 'B'), lambda: None)
+    assert planner.check(now=1000)[0] == 'run'
+    # The run failed, so record_run was never called: the next check tries again
+    assert planner.check(now=1060) == ('run', 2, '2 new stories')
+    planner.record_run()
+    assert planner.check(now=1120)[0] == 'skip'
+
+
+def test_unchanged_sources_are_not_scraped(tmp_path):
+    feed = tmp_path / 'feed.jsonl'
+    feed.write_text('{"title": "A"}\n')
+    scrapes = []
+
+    def fetch():
+        scrapes.append(1)
+        return stories(*(json.loads(line)['title'] for line in feed.read_text().splitlines()))
+
+    planner = AdaptivePlanner(str(tmp_path / 'state.json'), {'batch_threshold': 5, 'max_hours': 24},
+                              fetch, lambda: None,
+                              probe=lambda validators: SourceProbe(validators).changed([str(feed)]))
+    assert planner.check(now=1000)[0] == 'run'
+    planner.record_run()
+    assert planner.check(now=2000)[0] == 'skip'
+    assert planner.check(now=3000)[0] == 'skip'
+    assert len(scrapes) == 1
+
+    feed.write_text('{"title": "A"}\n{"title": "B"}\n')
+    assert planner.check(now=4000)[:2] == ('skip', 0)
+    assert len(scrapes) == 2
+
+
+class StubFeed(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        self.wfile.write(b'<rss></rss>')
+
+    def log_message(self, *args):
+        pass
+
+
+def test_probe_uses_conditional_requests():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubFeed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/feed"
+        validators = {}
+        assert SourceProbe(validators).changed([url]) is True
+        assert SourceProbe(validators).changed([url]) is False
+        assert StubFeed.requests == [None, '"v1"']
+    finally:
+        server.shutdown()
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    loaded = []  # (name, seconds until expires_at)
+
+    def do_GET(self):
+        now = datetime.now(timezone.utc)
+        models = [{'name': name, 'expires_at': (now + timedelta(seconds=expires)).isoformat()}
+                  for name, expires in self.loaded]
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps({'models': models}).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_ollama_busy_only_counts_recent_use_of_other_models(ollama_url):
+    # Just used: the pipeline's own model and its embedding model are not load
+    StubOllama.loaded = [('llama3:latest', 299), ('nomic-embed-text:latest', 299)]
+    assert ollama_busy(ollama_url, 'llama3', ignore=('nomic-embed-text',)) is None
+    # Another model merely resident (used minutes ago) or pinned is not load either
+    StubOllama.loaded = [('mistral:7b', 120), ('phi3:mini', 10 ** 9)]
+    assert ollama_busy(ollama_url, 'llama3') is None
+    # ... but one used in the last minute is
+    StubOllama.loaded = [('llama3:latest', 100), ('mistral:7b', 290)]
+    assert 'mistral:7b' in ollama_busy(ollama_url, 'llama3')
+    assert ollama_busy('http://127.0.0.1:9', 'llama3', timeout=1).startswith('Ollama load check failed')
+
+
+def test_adaptive_schedule_polls_with_settings():
+    scheduler = BackgroundScheduler()
+    calls = []
+    apply_schedule(scheduler, {'enabled': True, 'schedule': {'type': 'adaptive', 'check_minutes': 15}},
+                   lambda: None, adaptive_job=lambda settings: calls.append(settings))
+    job = scheduler.get_job(JOB_ID)
+    assert job.trigger.interval.total_seconds() == 15 * 60
+    assert job.kwargs['settings']['check_minutes'] == 15 and job.kwargs['settings']['batch_threshold'] == 10
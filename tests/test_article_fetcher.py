@@ -0,0 +1,98 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agent.article_fetcher import ArticleCache, ArticleFetcher, page_encoding
+from src.utils.config import NewsConfig
+from src.utils.html_extract import extract_text, truncate_to_tokens
+from src.utils.records import Story
+from src.utils.summarizer import Summarizer
+
+PARAGRAPH = "The new accelerator doubles inference throughput while cutting power draw in half."
+
+PAGE = f"""<html><head><title>Chips</title><script>var tracking = "nothing to see here at all";</script></head>
+<body>
+<nav><a href="/">Home</a> <a href="/tech">Tech</a> <a href="/ai">AI news and more links here</a></nav>
+<div class="cookie-banner">We use cookies to improve your experience on this website, accept them.</div>
+<article>
+  <h1>AI chips ship</h1>
+  <p>{PARAGRAPH}</p>
+  <p>Vendors expect the parts in <a href="/servers">data center servers</a> by the end of next quarter.</p>
+  <div class="share">Share this story on every social network you can think of today.</div>
+</article>
+<footer><p>Copyright 2025 Example News. All rights reserved across every region.</p></footer>
+</body></html>"""
+
+
+class ArticleSite(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        if self.path == '/missing':
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        self.wfile.write(PAGE.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site_url():
+    ArticleSite.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ArticleSite)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_extract_text_keeps_article_body_only():
+    text = extract_text(PAGE)
+    assert text.split('\n\n') == [
+        'AI chips ship',
+        PARAGRAPH,
+        'Vendors expect the parts in data center servers by the end of next quarter.',
+    ]
+
+
+def test_truncate_cuts_at_sentence_boundary():
+    text = ' '.join(f"Sentence number {i} is here." for i in range(50))
+    short = truncate_to_tokens(text, 30)
+    assert len(short) <= 120 and short.endswith('.')
+    assert truncate_to_tokens('short', 30) == 'short'
+
+
+def test_enrich_fetches_concurrently_and_caches_by_url(tmp_path, site_url):
+    fetcher = ArticleFetcher(NewsConfig(fetch_concurrency=2, article_max_tokens=20),
+                             cache=ArticleCache(tmp_path / 'cache'),
+                             summarizer=Summarizer(tmp_path / 'summaries'))
+    stories = [Story(title='A', url=f'{site_url}/a'), Story(title='B', url=f'{site_url}/missing'),
+               Story(title='C')]
+
+    enriched = fetcher.enrich(stories)
+    assert [s.title for s in enriched] == ['A', 'B', 'C']
+    assert enriched[0].content.startswith('AI chips ship')
+    assert len(enriched[0].content) <= 80
+    assert enriched[1] == stories[1] and enriched[2] == stories[2]
+
+    fetcher.enrich([Story(title='A again', url=f'{site_url}/a')])
+    assert ArticleSite.requests.count('/a') == 1
+
+
+def test_page_encoding_ignores_requests_latin1_default():
+    body = '<html><head><meta charset="utf-8"></head><p>Café</p>'.encode('utf-8')
+    assert body.decode(page_encoding('text/html', body)).endswith('Café</p>')
+    assert page_encoding('text/html', b'<p>no declaration</p>') == 'utf-8'
+    assert page_encoding('text/html; charset=windows-1252', body) == 'cp1252'
@@ -0,0 +1,143 @@
+import sys
+import asyncio
+import json
+from pathlib import Path
+
+from aiohttp import web
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agent.story_selector import StorySelector
+from src.utils.async_ollama import AsyncOllamaClient
+from src.utils.config import AppConfig
+from src.utils.records import Story
+from src.utils.retry import Deadline, DeadlineExceeded, RetryPolicy, SalvageStore
+
+
+class StubOllama:
+    """Streams canned replies; `slow` keeps a generation going until the client disconnects."""
+
+    def __init__(self, reply='Hello world', slow=False):
+        self.reply = reply
+        self.slow = slow
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.disconnected = asyncio.Event()
+
+    async def generate(self, request):
+        await request.json()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        response = web.StreamResponse()
+        await response.prepare(request)
+        try:
+            if self.slow:
+                while True:
+                    await response.write(json.dumps({'response': 'tick ', 'done': False}).encode() + b'\n')
+                    await asyncio.sleep(0.02)
+            words = self.reply.split(' ')
+            for i, word in enumerate(words):
+                last = i == len(words) - 1
+                piece = word if last else word + ' '
+                key = 'message' if request.path == '/api/chat' else 'response'
+                value = {'role': 'assistant', 'content': piece} if key == 'message' else piece
+                if last:
+                    # The client may start its next request as soon as it reads `done`
+                    self.in_flight -= 1
+                await response.write(json.dumps({key: value, 'done': last}).encode() + b'\n')
+                await asyncio.sleep(0.01)
+        except (ConnectionResetError, asyncio.CancelledError):
+            self.in_flight -= 1
+            self.disconnected.set()
+            raise
+        return response
+
+    async def embed(self, request):
+        body = await request.json()
+        return web.json_response({'embeddings': [[float(len(t)), 1.0] for t in body['input']]})
+
+
+async def serve(stub):
+    app = web.Application()
+    app.router.add_post('/api/generate', stub.generate)
+    app.router.add_post('/api/chat', stub.generate)
+    app.router.add_post('/api/embed', stub.embed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_generate_chat_embed_and_concurrency_limit():
+    async def scenario():
+        stub = StubOllama('one two three')
+        runner, url = await serve(stub)
+        try:
+            async with AsyncOllamaClient(url, 'test', max_concurrency=1) as client:
+                tokens = []
+                assert await client.generate('hi', on_token=tokens.append) == 'one two three'
+                assert tokens == ['one ', 'two ', 'three']
+                assert await client.chat([{'role': 'user', 'content': 'hi'}]) == 'one two three'
+                assert await client.embed(['ab', 'abc']) == [[2.0, 1.0], [3.0, 1.0]]
+
+                await asyncio.gather(*(client.generate(f'p{i}') for i in range(3)))
+                assert stub.max_in_flight == 1
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_cancellation_stops_generation_and_salvages_partial_text(tmp_path):
+    async def scenario():
+        stub = StubOllama(slow=True)
+        runner, url = await serve(stub)
+        selector = StorySelector(ollama_host=url, ollama_model='test', config=AppConfig(),
+                                 salvage_store=SalvageStore(tmp_path))
+        try:
+            task = asyncio.create_task(selector.aselect_story([Story(title='A')]))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            try:
+                await task
+                assert False, 'task should have been cancelled'
+            except asyncio.CancelledError:
+                pass
+            await asyncio.wait_for(stub.disconnected.wait(), 2)
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+    salvaged, = tmp_path.iterdir()
+    assert salvaged.read_text().startswith('tick tick')
+
+
+def test_deadline_ends_call_and_select_story_parses_reply(tmp_path):
+    async def scenario():
+        slow = StubOllama(slow=True)
+        runner, url = await serve(slow)
+        try:
+            async with AsyncOllamaClient(url, 'test') as client:
+                try:
+                    await client.generate('hi', deadline=Deadline(0.2))
+                    assert False, 'deadline should have ended the call'
+                except DeadlineExceeded:
+                    pass
+        finally:
+            await runner.cleanup()
+
+        reply = '{"selected_index": 1, "reason": "More technical"}'
+        runner, url = await serve(StubOllama(reply))
+        selector = StorySelector(ollama_host=url, ollama_model='test', config=AppConfig(),
+                                 retry_policy=RetryPolicy(base_delay=0), salvage_store=SalvageStore(tmp_path))
+        try:
+            async with AsyncOllamaClient(url, 'test') as client:
+                return await selector.aselect_story([Story(title='A'), Story(title='B')], client=client)
+        finally:
+            await runner.cleanup()
+
+    selection = asyncio.run(scenario())
+    assert selection.story.title == 'B' and selection.reason == 'More technical'
@@ -0,0 +1,95 @@
+import sys
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.cassette import Cassette
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Streams three JSON lines 0.1s apart; serves a gzip-encoded feed on GET."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i, word in enumerate([body['prompt'], ' world', '']):
+            line = json.dumps({'response': word, 'done': i == 2}).encode() + b'\n'
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+            time.sleep(0.1)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        body = gzip.compress(b'<rss><channel><item><title>A</title></item></channel></rss>')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def exchange(url):
+    with requests.post(f"{url}/api/generate", json={'prompt': 'Hello'}, stream=True, timeout=5) as response:
+        tokens = [json.loads(line)['response'] for line in response.iter_lines() if line]
+    feed = requests.get(f"{url}/feed.xml", timeout=5)
+    return tokens, feed.text
+
+
+def test_record_then_replay_without_network(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    path = tmp_path / 'run.jsonl.gz'
+    with Cassette(path, mode='record').active():
+        recorded = exchange(url)
+    server.shutdown()
+    server.server_close()
+    assert recorded == (['Hello', ' world', ''], '<rss><channel><item><title>A</title></item></channel></rss>')
+
+    # The server is gone; the gzip body was stored decoded and speed 0 skips the delays
+    with Cassette(path, mode='replay', speed=0).active():
+        started = time.monotonic()
+        assert exchange(url) == recorded
+        assert time.monotonic() - started < 0.15
+
+
+def test_replay_keeps_timing_and_rejects_unknown_requests(tmp_path, server_url):
+    path = tmp_path / 'run.jsonl.gz'
+    with Cassette(path, mode='record').active():
+        exchange(server_url)
+
+    with Cassette(path, mode='replay').active():
+        started = time.monotonic()
+        assert exchange(server_url)[0] == ['Hello', ' world', '']
+        assert time.monotonic() - started >= 0.2
+        # Each recorded exchange is served once
+        with pytest.raises(requests.exceptions.ConnectionError):
+            requests.get(f"{server_url}/feed.xml", timeout=5)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            requests.post(f"{server_url}/api/generate", json={'prompt': 'Other'}, timeout=5)
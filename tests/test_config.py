@@ -0,0 +1,59 @@
+import sys
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils import config as config_module
+from src.utils.config import ConfigError, ConfigWatcher, load_config
+
+
+def test_sources_are_layered(tmp_path):
+    yaml_file = tmp_path / 'config.yml'
+    yaml_file.write_text("ollama:\n  model: from-yaml\n  num_ctx: 8192\nblog:\n  categories: [AI, Security]\n")
+    env_file = tmp_path / '.env'
+    env_file.write_text("OLLAMA_MODEL=from-dotenv\n")
+
+    config = load_config(env_file=env_file, yaml_file=yaml_file,
+                         environ={'OLLAMA_MODEL': 'from-env', 'NEWS_NUM_STORIES': '25'})
+
+    assert config.ollama.model == 'from-dotenv'
+    assert config.ollama.num_ctx == 8192
+    assert config.news.num_stories == 25
+    assert config.blog.categories == ('AI', 'Security')
+
+
+def test_config_is_immutable_and_slotted(tmp_path):
+    config = load_config(env_file=tmp_path / 'none', yaml_file=tmp_path / 'none', environ={})
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.ollama.model = 'other'
+    assert not hasattr(config.ollama, '__dict__')
+
+
+def test_invalid_values_are_reported_together(tmp_path):
+    with pytest.raises(ConfigError) as error:
+        load_config(env_file=tmp_path / 'none', yaml_file=tmp_path / 'none',
+                    environ={'BLOG_MIN_PARAGRAPHS': '12', 'BLOG_OUTPUT_FORMATS': 'md,pdf'})
+    assert 'min_paragraphs' in str(error.value) and 'pdf' in str(error.value)
+
+    with pytest.raises(ConfigError):
+        load_config(env_file=tmp_path / 'none', yaml_file=tmp_path / 'none',
+                    environ={'OLLAMA_TIMEOUT': 'soon'})
+
+
+def test_watcher_reloads_changed_files(tmp_path, monkeypatch):
+    env_file = tmp_path / '.env'
+    env_file.write_text("OLLAMA_MODEL=first\n")
+    monkeypatch.setattr(config_module, 'ENV_FILE', env_file)
+    monkeypatch.setattr(config_module, 'YAML_FILE', tmp_path / 'config.yml')
+    monkeypatch.setattr(config_module, '_config', None)
+
+    watcher = ConfigWatcher(interval=0, files=[env_file])
+    assert watcher.current().ollama.model == 'first'
+
+    env_file.write_text("OLLAMA_MODEL=second\n")
+    watcher.mtimes = (0,)  # Force a change even on coarse mtime filesystems
+    assert watcher.current().ollama.model == 'second'
@@ -0,0 +1,108 @@
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pytest
+import requests
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.embeddings import EmbeddingCache, OllamaEmbedder
+
+
+def fake_vector(text):
+    return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Serves /api/embed (batched) unless `legacy` is set, and always /api/embeddings."""
+    legacy = False
+    calls = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.calls.append((self.path, body))
+        if body['model'] == 'missing':
+            self.send_response(404)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{"error": "model \\"missing\\" not found, try pulling it first"}')
+            return
+        if self.path == '/api/embed' and not self.legacy:
+            payload = {'embeddings': [fake_vector(t) for t in body['input']]}
+        elif self.path == '/api/embeddings':
+            payload = {'embedding': fake_vector(body['prompt'])}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_url():
+    StubOllama.calls = []
+    StubOllama.legacy = False
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_batches_misses_and_reuses_disk_cache_across_instances(tmp_path, ollama_url):
+    texts = [f"headline {i}" for i in range(5)] + ['headline 0']
+    embedder = OllamaEmbedder(ollama_url, 'test-model', batch_size=2,
+                              cache=EmbeddingCache('test-model', tmp_path))
+
+    vectors = embedder.embed(texts)
+    assert vectors.dtype == np.float32 and vectors.shape == (6, 3)
+    np.testing.assert_array_equal(vectors[5], vectors[0])
+    # Five unique texts in batches of two
+    assert [len(body['input']) for _, body in StubOllama.calls] == [2, 2, 1]
+
+    StubOllama.calls = []
+    fresh = OllamaEmbedder(ollama_url, 'test-model', cache=EmbeddingCache('test-model', tmp_path))
+    np.testing.assert_array_equal(fresh.embed(texts + ['new headline']),
+                                  np.vstack([vectors, [fake_vector('new headline')]]))
+    assert [body['input'] for _, body in StubOllama.calls] == [['new headline']]
+
+
+def test_falls_back_to_single_requests_without_batch_endpoint(tmp_path, ollama_url):
+    StubOllama.legacy = True
+    embedder = OllamaEmbedder(ollama_url, 'old', cache=EmbeddingCache('old', tmp_path))
+
+    vectors = embedder.embed(['a', 'bb'])
+    np.testing.assert_array_equal(vectors, [fake_vector('a'), fake_vector('bb')])
+    assert [path for path, _ in StubOllama.calls] == ['/api/embed', '/api/embeddings', '/api/embeddings']
+
+
+def test_missing_model_does_not_disable_batching(tmp_path, ollama_url):
+    embedder = OllamaEmbedder(ollama_url, 'missing', cache=EmbeddingCache('missing', tmp_path))
+    with pytest.raises(requests.exceptions.HTTPError):
+        embedder.embed(['a'])
+    assert embedder.batch_supported
+    assert [path for path, _ in StubOllama.calls] == ['/api/embed']
+
+
+def test_cache_ignores_partial_trailing_record(tmp_path):
+    cache = EmbeddingCache('m', tmp_path)
+    cache.put_many([(b'k' * 16, np.array([1, 2], dtype=np.float32))])
+    with open(cache.path, 'ab') as f:
+        f.write(b'partial')
+
+    reloaded = EmbeddingCache('m', tmp_path)
+    assert len(reloaded) == 1
+    np.testing.assert_array_equal(reloaded.get(b'k' * 16), [1, 2])
+    reloaded.put_many([(b'j' * 16, np.array([3, 4], dtype=np.float32))])
+    assert len(EmbeddingCache('m', tmp_path)) == 2
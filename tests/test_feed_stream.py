@@ -0,0 +1,63 @@
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.feed_stream import iter_feed_entries
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>News</title>
+<item><title>AI chips ship</title><link>https://example.com/1</link>
+<description>New accelerators</description><pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>
+<source url="https://example.com">Example</source></item>
+<item><title>Rust 2.0</title><link>https://example.com/2</link><description>Language news</description></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Blog</title>
+<entry><title>Atom post</title><link rel="self" href="https://example.com/self"/>
+<link href="https://example.com/atom"/><summary>Short</summary><updated>2024-01-02T00:00:00Z</updated></entry>
+</feed>"""
+
+
+def chunked(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_rss_entries_match_feedparser_keys():
+    entries = list(iter_feed_entries(chunked(RSS)))
+    assert [e['title'] for e in entries] == ['AI chips ship', 'Rust 2.0']
+    assert entries[0]['link'] == 'https://example.com/1'
+    assert entries[0]['summary'] == 'New accelerators'
+    assert entries[0]['published'].startswith('Mon, 01 Jan 2024')
+    assert entries[0]['source'] == {'title': 'Example', 'href': 'https://example.com'}
+
+
+def test_atom_entry_prefers_alternate_link():
+    entry, = iter_feed_entries(chunked(ATOM))
+    assert entry['link'] == 'https://example.com/atom'
+    assert entry['summary'] == 'Short'
+    assert entry['published'] == '2024-01-02T00:00:00Z'
+
+
+def test_entries_are_yielded_before_document_ends():
+    consumed = []
+
+    def source():
+        for chunk in chunked(RSS):
+            consumed.append(chunk)
+            yield chunk
+
+    first = next(iter_feed_entries(source()))
+    assert first['title'] == 'AI chips ship'
+    assert sum(map(len, consumed)) < len(RSS)
+
+
+def test_malformed_feed_raises_parse_error():
+    with pytest.raises(ET.ParseError):
+        list(iter_feed_entries([b"<rss><channel><item><title>x</item>"]))
@@ -0,0 +1,154 @@
+import sys
+import json
+import logging
+import threading
+from pathlib import Path
+
+import requests
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agent.blog_writer import BlogWriter
+from src.agent.metadata_writer import MetadataCache, MetadataWriter
+from src.utils.config import AppConfig, BlogConfig
+from src.utils.output_writer import OutputWriter
+from src.utils.posts_index import PostsIndex
+from src.utils.records import Post, PostMetadata, Story
+from src.utils.retry import Deadline, RetryPolicy, SalvageStore
+
+CONFIG = AppConfig(blog=BlogConfig(categories=('Technology', 'Security'), title_length=30, keywords_per_post=2))
+STORY = Story(title='Patch released for router flaw', url='https://example.com/router',
+              description='A remote code execution bug', keywords=('security',))
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.text = text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        yield json.dumps({'response': self.text, 'done': True}).encode()
+
+
+def make_writer(tmp_path):
+    return MetadataWriter(cache=MetadataCache(tmp_path / 'cache'), config=CONFIG,
+                          retry_policy=RetryPolicy(max_attempts=1), salvage_store=SalvageStore(tmp_path / 'salvage'))
+
+
+def test_metadata_comes_from_one_schema_call_and_is_cached(tmp_path, monkeypatch):
+    payloads = []
+    answer = {'title': 'Routers get an urgent fix for a remote bug', 'description': 'Patch now.',
+              'keywords': ['routers', 'Routers', 'RCE', 'firmware'], 'category': 'security'}
+
+    def fake_post(url, **kwargs):
+        payloads.append(kwargs['json'])
+        return FakeStream(json.dumps(answer))
+
+    monkeypatch.setattr(requests, 'post', fake_post)
+    writer = make_writer(tmp_path)
+
+    metadata = writer.generate(STORY)
+    assert metadata == PostMetadata(title='Routers get an urgent fix...', description='Patch now.',
+                                    keywords=('routers', 'RCE'), category='Security')
+    assert payloads[0]['format']['properties']['category']['enum'] == ['Technology', 'Security']
+    assert payloads[0]['format']['required'] == ['title', 'description', 'keywords', 'category']
+
+    # A second writer (a resumed run) reads the cache instead of asking again
+    assert make_writer(tmp_path).generate(STORY) == metadata
+    assert len(payloads) == 1
+
+
+def test_structured_output_is_not_rewritten(tmp_path, monkeypatch):
+    answer = {'title': 'Here is C++ "+ modules"', 'description': 'What C++ " + " means',
+              'keywords': [], 'category': 'Technology'}
+    monkeypatch.setattr(requests, 'post', lambda *a, **k: FakeStream(json.dumps(answer)))
+    metadata = make_writer(tmp_path).generate(STORY)
+    assert (metadata.title, metadata.description) == (answer['title'], answer['description'])
+
+
+def test_invalid_metadata_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(requests, 'post', lambda *a, **k: FakeStream('{"description": "no title"}'))
+    writer = make_writer(tmp_path)
+    assert writer.generate(STORY) is None
+    assert writer.cache.get(STORY.url) is None
+
+
+def test_write_draft_generates_metadata_alongside_the_body():
+    writer = BlogWriter.__new__(BlogWriter)
+    writer.logger = logging.getLogger(__name__)
+    writer.config = CONFIG
+    writer.system_prompt = 'sys'
+    started = threading.Event()
+
+    class Metadata:
+        def generate(self, story, deadline=None):
+            started.set()
+
+    writer.metadata_writer = Metadata()
+    # The body call only returns once the metadata call is running
+    writer._call_llm = lambda *a, **k: 'Body' if started.wait(5) else None
+    assert writer.write_draft(STORY) is not None
+
+
+def test_metadata_failure_during_draft_is_logged(caplog):
+    writer = BlogWriter.__new__(BlogWriter)
+    writer.logger = logging.getLogger(__name__)
+    writer.config = CONFIG
+    writer.system_prompt = 'sys'
+
+    class Metadata:
+        def generate(self, story, deadline=None):
+            raise OSError('disk full')
+
+    writer.metadata_writer = Metadata()
+    writer._call_llm = lambda *a, **k: 'Body'
+    with caplog.at_level(logging.WARNING):
+        assert writer.write_draft(STORY) is not None
+    assert 'Metadata generation failed' in caplog.text and 'disk full' in caplog.text
+
+
+def test_save_post_bounds_metadata_by_the_run_deadline(tmp_path):
+    writer = BlogWriter.__new__(BlogWriter)
+    writer.logger = writer.llm_logger = logging.getLogger(__name__)
+    writer.config = CONFIG
+    writer.posts_index = PostsIndex(tmp_path / 'posts.db')
+    writer.output_writer = OutputWriter(fsync=False)
+    writer.output_dir = tmp_path
+    writer.output_formats = ['md']
+    writer.local_blog = False
+    deadlines = []
+
+    class Metadata:
+        def generate(self, story, deadline=None):
+            deadlines.append(deadline)
+
+    writer.metadata_writer = Metadata()
+    deadline = Deadline(60)
+    post = writer.save_post(STORY, '# Post\n\nBody text.', deadline)
+    assert post is not None and deadlines == [deadline]
+
+
+def test_post_frontmatter_uses_generated_metadata():
+    writer = BlogWriter.__new__(BlogWriter)
+    writer.config = CONFIG
+    metadata = PostMetadata(title='Routers get an urgent fix', description='Patch now.',
+                            keywords=('routers',), category='Security')
+
+    post = writer._build_post(1, STORY, '# Post\n\nBody text.', metadata)
+    assert (post.title, post.slug, post.excerpt, post.category, post.keywords) == \
+        ('Routers get an urgent fix', 'Routers-get-an-urgent-fix', 'Patch now.', 'Security', ('routers',))
+    assert Post.from_json(post.to_json()) == post
+
+    # Without metadata: story title, first paragraph, and the category the post talks about
+    post = writer._build_post(1, STORY, '# Post\n\nA security fix. More security news.')
+    assert (post.title, post.excerpt, post.category, post.keywords) == \
+        (STORY.title, 'A security fix. More security news.', 'Security', ('security',))
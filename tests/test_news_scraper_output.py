@@ -25,7 +25,7 @@ def test_news_scraper_output():
     print(f"Retrieved {len(custom_articles)} articles using custom keywords")
     print("\nSample of the data structure (custom keywords):")
     if custom_articles:
-        print(json.dumps(custom_articles[0], indent=2))
+        print(json.dumps(custom_articles[0].to_dict(), indent=2))
     
     print("\n" + "=" * 50 + "\n")
     
@@ -36,7 +36,7 @@ def test_news_scraper_output():
     print(f"Retrieved {len(predefined_articles)} articles using predefined terms")
     print("\nSample of the data structure (predefined terms):")
     if predefined_articles:
-        print(json.dumps(predefined_articles[0], indent=2))
+        print(json.dumps(predefined_articles[0].to_dict(), indent=2))
 
 if __name__ == "__main__":
     test_news_scraper_output()
\ No newline at end of file
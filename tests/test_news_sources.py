@@ -0,0 +1,181 @@
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agent.news_scraper import NewsScraper
+from src.sources.news_sources import DirectorySource, FeedSource, FileSource, GoogleNewsSource, source_from_spec
+from src.utils.config import NewsConfig
+
+RSS = """<?xml version="1.0"?><rss><channel>
+<item><title>AI in the browser</title><link>https://example.com/rss</link><description>WebGPU</description>
+<source url="https://example.com">Example</source></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def dump_dir(tmp_path):
+    (tmp_path / 'a.json').write_text(json.dumps({'articles': [
+        {'title': 'AI chips ship', 'description': 'Accelerators', 'url': 'https://example.com/1',
+         'publishedAt': '2024-01-01', 'source': {'name': 'NewsAPI'}},
+        {'title': 'Gardening tips', 'description': 'Tomatoes'},
+    ]}))
+    (tmp_path / 'b.jsonl').write_text(
+        json.dumps({'title': 'AI chips ship', 'url': 'https://example.com/dup'}) + '\n' +
+        json.dumps({'title': 'Cloud AI pricing', 'link': 'https://example.com/2', 'summary': 'Costs'}) + '\n')
+    (tmp_path / 'c.xml').write_text(RSS)
+    (tmp_path / 'notes.txt').write_text('ignored')
+    return tmp_path
+
+
+def test_spec_parsing_and_per_source_limits(tmp_path):
+    config = NewsConfig(source_concurrency=3, source_rate_limit=2.0)
+    google = source_from_spec('google', config)
+    assert isinstance(google, GoogleNewsSource) and google.concurrency == 3
+
+    feed = source_from_spec('rss:https://example.com/feed.xml|rate=0.5|concurrency=1', config)
+    assert isinstance(feed, FeedSource) and feed.url == 'https://example.com/feed.xml'
+    assert feed.concurrency == 1 and feed.rate_limiter.rate == 0.5
+
+    assert isinstance(source_from_spec('https://example.com/atom', config), FeedSource)
+    assert isinstance(source_from_spec(f'file:{tmp_path}/x.json', config), FileSource)
+    assert isinstance(source_from_spec(f'dir:{tmp_path}', config), DirectorySource)
+    with pytest.raises(ValueError):
+        source_from_spec('newsapi', config)
+
+
+def test_offline_directory_run_is_normalised_and_deduplicated(dump_dir):
+    scraper = NewsScraper(NewsConfig(sources=(f'dir:{dump_dir}',), num_stories=10))
+    scraper.keywords = ['AI']
+
+    stories = scraper.get_news()
+    assert [s.title for s in stories] == ['AI chips ship', 'Cloud AI pricing', 'AI in the browser']
+    first = stories[0]
+    assert (first.url, first.published_at, first.source, first.keywords) == \
+        ('https://example.com/1', '2024-01-01', 'NewsAPI', ('AI',))
+    assert stories[2].source == 'Example'
+
+
+def test_sources_are_merged_in_configured_order(dump_dir):
+    config = NewsConfig(sources=(f'file:{dump_dir}/c.xml', f'file:{dump_dir}/b.jsonl', 'bogus:x'),
+                        num_stories=2)
+    scraper = NewsScraper(config)
+    scraper.keywords = ['AI']
+
+    assert len(scraper.sources) == 2
+    assert [s.title for s in scraper.get_news()] == ['AI in the browser', 'AI chips ship']
+
+
+def test_malformed_feed_falls_back_without_repeating_entries(monkeypatch):
+    import src.sources.news_sources as news_sources
+    body = b"<rss><channel><item><title>A</title></item><item><title>B</title></item>&bad;" \
+           b"<item><title>C</title></item></channel></rss>"
+    calls = []
+
+    class FakeResponse:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            for i in range(0, len(body), 16):
+                yield body[i:i + 16]
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return FakeResponse()
+
+    monkeypatch.setattr(news_sources.requests, 'get', fake_get)
+    titles = [entry['title'] for entry in news_sources.iter_feed_url('https://example.com/feed')]
+    assert titles == ['A', 'B', 'C'] and len(calls) == 1
+
+
+def test_batch_is_spread_across_keywords(tmp_path):
+    stories = [{'title': f'AI story {i}', 'url': f'https://example.com/ai{i}'} for i in range(5)]
+    stories += [{'title': 'Cloud outage', 'url': 'https://example.com/cloud'},
+                {'title': 'Quantum error correction', 'url': 'https://example.com/q'},
+                {'title': 'Cloud quantum service', 'url': 'https://example.com/cq'}]
+    dump = tmp_path / 'dump.jsonl'
+    dump.write_text(''.join(json.dumps(s) + '\n' for s in stories))
+    scraper = NewsScraper(NewsConfig(sources=(f'file:{dump}',), num_stories=4))
+    scraper.keywords = ['AI', 'Cloud', 'Quantum']
+    scraper.keyword_weights = {'AI': 2}
+
+    # AI gets two of the four slots; the later keywords are still covered
+    assert [s.title for s in scraper.get_news()] == \
+        ['AI story 0', 'Cloud outage', 'Quantum error correction', 'AI story 1']
+
+
+def test_keyword_fetches_stop_once_their_quota_is_filled():
+    from src.sources.news_sources import NewsSource
+    from src.utils.records import Story
+
+    class SearchSource(NewsSource):
+        name = 'search'
+
+        def __init__(self):
+            super().__init__()
+            self.read = {}
+
+        def queries(self, terms):
+            return list(terms)
+
+        def fetch(self, query=None):
+            for i in range(20):
+                self.read[query] = i + 1
+                yield Story(title=f'{query} news {i}')
+
+    scraper = NewsScraper(NewsConfig(num_stories=4))
+    source = SearchSource()
+    scraper.sources = [source]
+    scraper.keywords = ['AI', 'Cloud']
+    scraper.keyword_weights = {}
+
+    stories = scraper.get_news()
+    assert [s.title for s in stories] == ['AI news 0', 'Cloud news 0', 'AI news 1', 'Cloud news 1']
+    assert source.read == {'AI': 2, 'Cloud': 2}
+
+
+def test_keyword_weights_are_parsed():
+    from src.utils.coverage_planner import parse_keyword
+    assert parse_keyword('secure LLM | weight=2.5\n') == ('secure LLM', 2.5)
+    assert parse_keyword('AI') == ('AI', 1.0)
+    with pytest.raises(ValueError):
+        parse_keyword('AI|boost=2')
+
+
+def test_keyword_without_matches_does_not_force_reading_the_whole_source(tmp_path):
+    dump = tmp_path / 'large.jsonl'
+    dump.write_text(''.join(json.dumps({'title': f'AI story {i}'}) + '\n' for i in range(5000)))
+    read = []
+
+    class CountingFileSource(FileSource):
+        def fetch(self, query=None):
+            for story in super().fetch(query):
+                read.append(story)
+                yield story
+
+    scraper = NewsScraper(NewsConfig(num_stories=4))
+    scraper.sources = [CountingFileSource(str(dump))]
+    scraper.keywords = ['AI', 'Nomatch']
+    scraper.keyword_weights = {}
+
+    assert len(scraper.get_news()) == 4
+    # Four stories for the batch plus a look-ahead of four for the keyword that never matches
+    assert len(read) == 8
+
+
+def test_quotas_add_up_to_the_batch_size():
+    from src.utils.coverage_planner import allocate
+    assert sum(allocate({f'k{i}': 1.0 for i in range(9)}, 10).values()) == 10
+    assert allocate({'a': 1, 'b': 3, 'c': 2}, 2) == {'a': 0, 'b': 1, 'c': 1}
+    assert allocate({'a': 10, 'b': 1}, 3) == {'a': 2, 'b': 1}
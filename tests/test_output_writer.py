@@ -0,0 +1,77 @@
+import sys
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.output_writer import OutputWriter
+from src.utils.records import Post
+
+POST = Post(
+    id=4,
+    title='Private LLMs "in" the enterprise',
+    slug='Private-LLMs-in-the-enterprise',
+    date='2025-01-01',
+    excerpt='Short summary.',
+    category='Technology',
+    read_time=3,
+    source='Example News',
+    source_link='https://example.com/story',
+    content='# Heading\n\nBody with `code` and ${template}.\n'
+)
+
+
+def test_all_formats_rendered_from_one_post(tmp_path):
+    written = OutputWriter().write_post(POST, {
+        'md': tmp_path / 'post.md',
+        'json': tmp_path / 'post.json',
+        'ts': tmp_path / 'ts' / 'post4.ts',
+    })
+
+    assert Path(written['md']).read_text() == POST.content
+    meta = json.loads(Path(written['json']).read_text())
+    assert meta['title'] == POST.title and meta['readTime'] == 3
+    ts = Path(written['ts']).read_text()
+    assert json.dumps(POST.content) in ts
+    assert ts.rstrip().endswith('export default post;')
+    assert not list(tmp_path.glob('**/*.tmp'))
+
+
+def test_failed_batch_leaves_no_files(tmp_path):
+    writer = OutputWriter()
+    with pytest.raises(RuntimeError):
+        with writer.batch():
+            writer.write(tmp_path / 'a.md', 'first')
+            raise RuntimeError('crash mid-run')
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_threads_sharing_a_writer_keep_their_batches_apart(tmp_path):
+    writer = OutputWriter(fsync=False)
+    a_written, b_may_fail = threading.Event(), threading.Event()
+
+    def thread_a():
+        with writer.batch():
+            writer.write(tmp_path / 'a.md', 'A')
+        a_written.set()
+
+    def thread_b():
+        with pytest.raises(RuntimeError):
+            with writer.batch():
+                writer.write(tmp_path / 'b.md', 'B')
+                b_may_fail.wait(5)
+                raise RuntimeError('crash')
+
+    b = threading.Thread(target=thread_b)
+    b.start()
+    thread_a()
+    # A's batch closed while B's was still open: A's file is committed on its own
+    assert a_written.is_set() and (tmp_path / 'a.md').read_text() == 'A'
+    b_may_fail.set()
+    b.join()
+    assert (tmp_path / 'a.md').exists() and not (tmp_path / 'b.md').exists()
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,93 @@
+import sys
+import logging
+from types import SimpleNamespace
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agent.blog_writer import BlogWriter
+from src.utils.config import AppConfig, BlogConfig
+from src.utils.post_validator import find_issues, repair_post, split_sections
+from src.utils.records import Story
+
+STORY = Story(title='New Chip Ships', url='https://example.com/chip', description='A new chip.')
+CONFIG = BlogConfig(content_length=200, min_paragraphs=2, max_paragraphs=3)
+
+
+def section(heading, words=50):
+    return f"## {heading}\n\n" + ' '.join(['word'] * words)
+
+
+def test_repair_strips_chatter_and_adds_references():
+    content = ("Sure! Here is the blog post you asked for.\n\n```markdown\n# New Chip Ships\n\n"
+               + section('Design') + "\n```")
+    repaired, fixes = repair_post(content, STORY, CONFIG)
+    assert repaired.startswith('# New Chip Ships')
+    assert '```' not in repaired and 'Sure' not in repaired
+    assert repaired.rstrip().endswith('## References\n\n- [New Chip Ships](https://example.com/chip)')
+    assert len(fixes) == 3
+    # Repairing again changes nothing
+    assert repair_post(repaired, STORY, CONFIG) == (repaired, [])
+
+
+def test_repair_adds_missing_link_and_moves_references_last():
+    content = '\n\n'.join([section('Design'), '## References\n\n- [Other](https://other.org)',
+                           section('Outlook'), 'Let me know if you want changes!'])
+    repaired, fixes = repair_post(content, STORY, CONFIG)
+    sections = split_sections(repaired)
+    assert [s.heading for s in sections] == ['Design', 'Outlook', 'References']
+    assert 'https://example.com/chip' in sections[-1].body and 'https://other.org' in sections[-1].body
+    assert 'Let me know' not in repaired
+
+
+def test_repair_merges_sections_beyond_the_maximum():
+    content = '\n\n'.join([section('A'), section('B', 10), section('C'), section('D'), section('E', 5)])
+    repaired, fixes = repair_post(content, STORY, CONFIG)
+    headings = [s.heading for s in split_sections(repaired)]
+    assert headings == ['A', 'C', 'D', 'References']
+    # No text is lost, only headings
+    assert sum(s.words() for s in split_sections(repaired)[:-1]) == 165
+
+
+def test_find_issues_targets_thin_sections_and_section_count():
+    content = repair_post(section('Design', 100) + '\n\n' + section('Outlook', 5), STORY, CONFIG)[0]
+    assert [(i.code, i.section) for i in find_issues(content, CONFIG)] == [('thin_section', 1)]
+
+    content = repair_post(section('Design'), STORY, CONFIG)[0]
+    codes = [i.code for i in find_issues(content, CONFIG)]
+    assert codes[0] == 'too_few_sections'
+    # 50 words against a 200 word target: the only section gets expanded too
+    assert 'short_post' in codes
+
+    good = repair_post(section('Design', 60) + '\n\n' + section('Outlook', 60), STORY, CONFIG)[0]
+    assert find_issues(good, CONFIG) == []
+
+
+def test_write_draft_regenerates_only_failing_sections(monkeypatch):
+    writer = BlogWriter.__new__(BlogWriter)
+    writer.logger = logging.getLogger(__name__)
+    writer.config = AppConfig(blog=CONFIG)
+    writer.system_prompt = 'sys'
+    writer.metadata_writer = SimpleNamespace(generate=lambda story, deadline=None: None)
+    prompts = []
+    callbacks = []
+
+    def call_llm(prompt, system_prompt=None, deadline=None, on_token=None):
+        prompts.append(prompt)
+        callbacks.append(on_token)
+        if len(prompts) == 1:
+            return "Here is your post:\n\n" + section('Design', 100) + '\n\n' + section('Outlook', 3)
+        return "## Outlook\n\n" + ' '.join(['better'] * 60)
+
+    monkeypatch.setattr(writer, '_call_llm', call_llm)
+    draft_tokens, repair_tokens = (lambda piece: None), (lambda piece: None)
+    draft = writer.write_draft(STORY, on_token=draft_tokens, on_repair_token=repair_tokens)
+    assert len(prompts) == 2
+    # Regenerated sections stream to their own counter, not the draft's
+    assert callbacks == [draft_tokens, repair_tokens]
+    assert 'Rewrite the section "Outlook"' in prompts[1]
+    sections = split_sections(draft)
+    assert [s.heading for s in sections] == ['Design', 'Outlook', 'References']
+    assert sections[1].body == ' '.join(['better'] * 60)
+    assert find_issues(draft, CONFIG) == []
@@ -0,0 +1,70 @@
+import sys
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.posts_index import PostsIndex
+from src.utils.records import Post
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    import web.app as app_module
+    index = PostsIndex(tmp_path / 'index.db')
+    for n in range(3):
+        post_id = index.reserve(f'https://example.com/{n}', f'Post {n}')
+        path = tmp_path / f'post-{n}.md'
+        path.write_text(f'# Post {n}\n')
+        index.complete(post_id, path, Post(id=post_id, title=f'Post {n}', slug=f'post-{n}', date='2025-01-01',
+                                           content='', category='AI', read_time=2))
+    monkeypatch.setattr(app_module, '_posts_index', index)
+    return index
+
+
+@pytest.fixture
+def client():
+    import web.app as app_module
+    return app_module.app.test_client()
+
+
+def test_post_listing_paginates_and_revalidates(index, client):
+    page = client.get('/api/posts?limit=2')
+    assert page.status_code == 200
+    body = page.get_json()
+    assert [p['title'] for p in body['posts']] == ['Post 2', 'Post 1']
+    assert body['posts'][0]['read_time'] == 2
+
+    assert client.get('/api/posts?limit=2', headers={'If-None-Match': page.headers['ETag']}).status_code == 304
+
+    rest = client.get(f"/api/posts?limit=2&cursor={body['next_cursor']}").get_json()
+    assert [p['title'] for p in rest['posts']] == ['Post 0'] and rest['next_cursor'] is None
+    assert client.get('/api/posts?cursor=%%%').status_code == 400
+
+
+def test_single_post_includes_content_and_etag(index, client):
+    response = client.get('/api/posts/1')
+    assert response.get_json()['content'] == '# Post 0\n'
+    etag = response.headers['ETag']
+    assert client.get('/api/posts/1', headers={'If-None-Match': etag}).status_code == 304
+
+    index.complete(1, index.get_post(1)['path'])
+    assert client.get('/api/posts/1', headers={'If-None-Match': etag}).status_code == 200
+    assert client.get('/api/posts/99').status_code == 404
+
+
+def test_existing_index_gains_metadata_columns(tmp_path):
+    db = tmp_path / 'old.db'
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE posts (id INTEGER PRIMARY KEY AUTOINCREMENT, source_url TEXT UNIQUE, "
+                     "title TEXT, title_hash TEXT, path TEXT, status TEXT NOT NULL DEFAULT 'reserved', "
+                     "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)")
+        conn.execute("INSERT INTO posts (source_url, title, path, status, created_at, updated_at) "
+                     "VALUES ('u', 'Old post', 'old.md', 'written', 'x', 'x')")
+    conn.close()
+
+    posts, _ = PostsIndex(db).list_posts()
+    assert posts[0]['title'] == 'Old post' and posts[0]['category'] is None
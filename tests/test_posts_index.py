@@ -0,0 +1,73 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.posts_index import PostsIndex
+from src.utils.records import Post, Story
+
+
+def test_ids_are_unique_under_concurrent_writers(tmp_path):
+    index = PostsIndex(tmp_path / 'index.db')
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(lambda n: index.reserve(f'https://example.com/{n}', f'Story {n}'), range(40)))
+    assert sorted(ids) == list(range(1, 41))
+
+
+def test_numbering_continues_after_legacy_posts(tmp_path):
+    (tmp_path / 'post7.ts').write_text('')
+    (tmp_path / 'post12.ts').write_text('')
+    index = PostsIndex(tmp_path / 'index.db', legacy_posts_dir=tmp_path)
+    assert index.reserve('https://example.com/a', 'A') == 13
+
+
+def test_written_stories_are_filtered(tmp_path):
+    index = PostsIndex(tmp_path / 'index.db')
+    post_id = index.reserve('https://example.com/a', 'OpenAI ships a model!')
+    assert index.reserve('https://example.com/a', 'OpenAI ships a model!') == post_id
+    index.complete(post_id, tmp_path / 'a.md')
+
+    stories = [
+        Story(url='https://example.com/a', title='Anything'),
+        Story(url='https://other.com/b', title='openai ships a model'),
+        Story(url='https://example.com/c', title='Something new'),
+    ]
+    assert [s.url for s in index.filter_new(stories)] == ['https://example.com/c']
+
+
+def test_story_without_url_keeps_its_slot(tmp_path):
+    index = PostsIndex(tmp_path / 'index.db')
+    post_id = index.reserve('', 'Local model release')
+    # A resumed run gets the same ID; other URL-less stories get their own
+    assert index.reserve('', 'Local model release') == post_id
+    assert index.reserve('', 'Another story') != post_id
+
+
+def make_post(post_id, title):
+    return Post(id=post_id, title=title, slug=title.lower(), date='2025-01-01', content=f'# {title}\n',
+                excerpt=f'About {title}', category='AI', read_time=3, source='Example')
+
+
+def test_listing_pages_with_cursor_and_stored_metadata(tmp_path):
+    index = PostsIndex(tmp_path / 'index.db')
+    for n in range(5):
+        post_id = index.reserve(f'https://example.com/{n}', f'Post{n}')
+        index.complete(post_id, tmp_path / f'{n}.md', make_post(post_id, f'Post{n}'))
+    index.reserve('https://example.com/pending', 'Pending')
+
+    first, cursor = index.list_posts(limit=2)
+    assert [p['title'] for p in first] == ['Post4', 'Post3']
+    assert (first[0]['category'], first[0]['read_time'], first[0]['excerpt']) == ('AI', 3, 'About Post4')
+
+    second, cursor = index.list_posts(limit=2, cursor=cursor)
+    last, end = index.list_posts(limit=2, cursor=cursor)
+    assert [p['id'] for p in second + last] == [3, 2, 1]
+    assert end is None
+    assert index.get_post(6) is None
+
+    with pytest.raises(ValueError):
+        index.list_posts(cursor='not-a-cursor')
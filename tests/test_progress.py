@@ -0,0 +1,106 @@
+import sys
+import io
+import json
+import textwrap
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.progress import ProgressReporter
+import web.run_manager as run_manager
+
+
+def test_token_counter_reports_count_and_rate():
+    stream = io.StringIO()
+    reporter = ProgressReporter(stream, token_interval=0)
+    on_token = reporter.token_counter('draft')
+    for piece in ['Hello', ' world', '!']:
+        on_token(piece)
+    on_token.finish()
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [e['count'] for e in events] == [1, 2, 3, 3]
+    assert events[-1]['done'] and events[-1]['stage'] == 'draft' and events[-1]['tokens_per_sec'] > 0
+
+    silent = io.StringIO()
+    ProgressReporter(silent, enabled=False).token_counter('draft')('x')
+    assert silent.getvalue() == ''
+
+
+@pytest.fixture
+def fake_main(tmp_path, monkeypatch):
+    """Point the run manager at a script that emits progress like main.py --progress."""
+    def install(events, returncode=0):
+        script = tmp_path / 'fake_main.py'
+        script.write_text(textwrap.dedent(f"""
+            import json, sys
+            for event in {events!r}:
+                print(json.dumps(event), flush=True)
+            print('traceback details', file=sys.stderr)
+            sys.exit({returncode})
+        """))
+        monkeypatch.setattr(run_manager, 'MAIN_SCRIPT', str(script))
+    return install
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import web.app as app_module
+    monkeypatch.setattr(app_module, 'run_manager', run_manager.RunManager(str(tmp_path / 'runs')))
+    return app_module.app.test_client()
+
+
+def test_run_now_reports_failure_and_streams_events(fake_main, client):
+    fake_main([{'event': 'stage', 'name': 'scraped', 'status': 'started'},
+               {'event': 'error', 'message': 'No stories found'}], returncode=1)
+
+    response = client.post('/api/run-now?wait=true')
+    assert response.status_code == 500
+    body = response.get_json()
+    assert body['status'] == 'error' and body['error'] == 'No stories found'
+
+    stream = client.get(body['events'])
+    assert stream.mimetype == 'text/event-stream'
+    text = stream.get_data(as_text=True)
+    assert 'id: 0\nevent: stage\n' in text
+    assert 'event: exit\n' in text and '"returncode": 1' in text
+
+    resumed = client.get(body['events'], headers={'Last-Event-ID': '1'}).get_data(as_text=True)
+    assert resumed.startswith('id: 2\nevent: exit\n')
+
+
+def test_run_now_returns_immediately_with_stream_url(fake_main, client):
+    fake_main([{'event': 'done', 'file_path': 'output/posts/x.md', 'title': 'X'}])
+
+    response = client.post('/api/run-now')
+    assert response.status_code == 202
+    run_id = response.get_json()['run_id']
+    text = client.get(f'/api/runs/{run_id}/events').get_data(as_text=True)
+    assert 'event: done\n' in text and '"returncode": 0' in text
+    assert client.get('/api/runs/unknown/events').status_code == 404
+
+
+def test_other_workers_follow_runs_and_see_the_run_lock(fake_main, tmp_path):
+    fake_main([{'event': 'stage', 'name': 'scraped', 'status': 'started'}])
+    directory = str(tmp_path / 'runs')
+    worker_a, worker_b = run_manager.RunManager(directory), run_manager.RunManager(directory)
+
+    run, started = worker_a.start()
+    assert started
+    busy, started = worker_b.start()
+    assert not started and busy.id == run.id
+    run.wait()
+
+    log = worker_b.get(run.id)
+    assert isinstance(log, run_manager.RunLog) and log.finished
+    events = [event for _, event in log.follow(poll=0.01)]
+    assert [e['event'] for e in events] == ['stage', 'exit']
+    assert worker_b.get('latest').id == run.id
+
+    # The lock is released once the run exits
+    again, started = worker_b.start()
+    assert started
+    again.wait()
@@ -0,0 +1,36 @@
+import sys
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.records import Post, Selection, Story, dump_jsonl, load_jsonl
+
+
+def test_records_are_immutable_and_slotted():
+    story = Story(title='A', url='https://example.com/a', keywords=('AI',))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        story.title = 'B'
+    assert not hasattr(story, '__dict__')
+
+
+def test_selection_round_trip_keeps_story_untouched():
+    story = Story(title='A', description='desc', keywords=('AI', 'LLM'))
+    selection = Selection(story=story, reason='Most relevant', index=0)
+
+    restored = Selection.from_json(selection.to_json())
+    assert restored == selection
+    assert restored.story.keywords == ('AI', 'LLM')
+
+
+def test_jsonl_round_trip_ignores_unknown_fields(tmp_path):
+    posts = [Post(id=n, title=f'Post {n}', slug=f'post-{n}', date='2025-01-01', content='Body')
+             for n in range(3)]
+    path = tmp_path / 'posts.jsonl'
+    dump_jsonl(posts, path)
+    assert load_jsonl(Post, path) == posts
+
+    assert Story.from_dict({'title': 'A', 'selection_reason': 'legacy field'}).title == 'A'
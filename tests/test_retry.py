@@ -0,0 +1,95 @@
+import sys
+import json
+from pathlib import Path
+
+import requests
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agent.base_agent import BaseAgent
+from src.utils.retry import Deadline, OllamaError, RetryPolicy, SalvageStore, idempotency_key, is_transient
+
+
+class FakeStream:
+    """Mimics a streamed Ollama response that may break part way through."""
+
+    def __init__(self, pieces, fail_after=None):
+        self.pieces = pieces
+        self.fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        for i, piece in enumerate(self.pieces):
+            if self.fail_after is not None and i == self.fail_after:
+                raise requests.exceptions.ChunkedEncodingError("connection reset")
+            yield json.dumps({'response': piece, 'done': i == len(self.pieces) - 1}).encode()
+
+
+def make_agent(tmp_path, attempts=3):
+    return BaseAgent(retry_policy=RetryPolicy(max_attempts=attempts, base_delay=0),
+                     salvage_store=SalvageStore(tmp_path))
+
+
+def test_backoff_grows_and_respects_cap():
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+    assert [policy.backoff(n) for n in (1, 2, 3, 4)] == [1, 2, 4, 5]
+
+
+def test_deadline_caps_timeout():
+    assert Deadline().cap(300) == 300
+    assert Deadline(10).cap(300) <= 10
+
+
+def test_retry_continues_from_partial_text(tmp_path, monkeypatch):
+    prompts = []
+    responses = [FakeStream(['Hello ', 'wor', 'ld'], fail_after=2),
+                 FakeStream(['ld, again.'])]
+
+    def fake_post(url, json=None, **kwargs):
+        prompts.append(json['prompt'])
+        return responses.pop(0)
+
+    monkeypatch.setattr(requests, 'post', fake_post)
+    agent = make_agent(tmp_path)
+
+    assert agent._call_llm('Say hello') == 'Hello world, again.'
+    assert prompts[0] == 'Say hello'
+    assert prompts[1].startswith('Say hello') and prompts[1].endswith('Hello wor')
+    assert not list(tmp_path.iterdir())
+
+
+def test_failed_call_salvages_partial_for_next_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(requests, 'post',
+                        lambda *a, **k: FakeStream(['Partial draft', ' more'], fail_after=1))
+    agent = make_agent(tmp_path, attempts=1)
+
+    assert agent._call_llm('Write a post', system_prompt='sys') is None
+    key = idempotency_key(agent.ollama_model, 'sys', 'Write a post')
+    assert agent.salvage_store.load(key) == 'Partial draft'
+
+
+def test_error_reported_by_ollama_is_not_retried(tmp_path, monkeypatch):
+    calls = []
+
+    class ErrorStream(FakeStream):
+        def iter_lines(self):
+            yield json.dumps({'error': 'model "missing" not found, try pulling it first'}).encode()
+
+    def fake_post(*args, **kwargs):
+        calls.append(1)
+        return ErrorStream([])
+
+    monkeypatch.setattr(requests, 'post', fake_post)
+    assert make_agent(tmp_path)._call_llm('Write a post') is None
+    assert len(calls) == 1
+    assert not is_transient(OllamaError('context too long'))
+    assert is_transient(requests.exceptions.ChunkedEncodingError('Stream ended before generation finished'))
@@ -0,0 +1,84 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import src.utils.run_history as run_history
+from src.utils.run_history import CacheStats, RunHistory
+
+
+def test_runs_are_recorded_with_stages_and_metrics(tmp_path):
+    history = RunHistory(tmp_path / 'history.db')
+    history.start('run-1')
+    history.record_stage('run-1', 'scraped', 'completed', 1.25)
+    history.record_stage('run-1', 'draft', 'completed', 30.5)
+    history.finish('run-1', 'completed', model='llama3', tokens=900, tokens_per_sec=30.0,
+                   cache_hits=2, cache_misses=1, post_id=7, unknown='ignored')
+    history.start('run-2')
+    history.finish('run-2', 'failed', model='mistral', error='No stories found')
+
+    runs = history.list_runs()
+    assert [run['run_id'] for run in runs] == ['run-2', 'run-1']
+    first = runs[1]
+    assert first['status'] == 'completed' and first['model'] == 'llama3' and first['post_id'] == 7
+    assert first['duration'] >= 0 and first['tokens_per_sec'] == 30.0
+    assert first['stages'] == {'scraped': {'status': 'completed', 'duration': 1.25},
+                               'draft': {'status': 'completed', 'duration': 30.5}}
+    assert [run['run_id'] for run in history.list_runs(model='mistral')] == ['run-2']
+    assert runs[0]['error'] == 'No stories found'
+
+
+def test_resumed_run_duration_counts_only_its_attempts(tmp_path, monkeypatch):
+    clock = {'now': datetime(2024, 1, 1, 9, 0, 0)}
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock['now']
+
+    monkeypatch.setattr(run_history, 'datetime', Clock)
+    history = RunHistory(tmp_path / 'history.db')
+    history.start('run-1')
+    clock['now'] += timedelta(seconds=40)
+    history.finish('run-1', 'failed')
+    # Resumed three hours later, then takes another 20 seconds
+    clock['now'] += timedelta(hours=3)
+    history.start('run-1')
+    clock['now'] += timedelta(seconds=20)
+    history.finish('run-1', 'completed')
+
+    run = history.list_runs()[0]
+    assert run['status'] == 'completed' and run['duration'] == 60
+    assert run['started_at'] == '2024-01-01T09:00:00'
+
+
+def test_cache_stats_totals():
+    stats = CacheStats()
+    stats.record('articles', True)
+    stats.record('embeddings', False)
+    stats.record('embeddings', True)
+    assert stats.totals() == {'cache_hits': 2, 'cache_misses': 1}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import web.app as app_module
+    history = RunHistory(tmp_path / 'history.db')
+    monkeypatch.setattr(app_module, '_run_history', history)
+    return app_module.app.test_client(), history
+
+
+def test_history_api(client):
+    client, history = client
+    history.start('run-1')
+    history.finish('run-1', 'completed', model='llama3')
+
+    response = client.get('/api/history?limit=10')
+    assert response.status_code == 200
+    assert [run['run_id'] for run in response.get_json()['runs']] == ['run-1']
+    assert client.get('/api/history', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    assert client.get('/api/history?limit=x').status_code == 400
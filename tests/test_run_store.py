@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.run_store import RunStore
+
+
+def test_resumed_run_sees_completed_stages(tmp_path):
+    store = RunStore(base_dir=tmp_path)
+    store.save('scraped', [{'title': 'A story'}])
+
+    resumed = RunStore.resume(store.run_id, base_dir=tmp_path)
+    assert resumed.has('scraped')
+    assert not resumed.has('selection')
+    assert resumed.load('scraped') == [{'title': 'A story'}]
+    assert RunStore.list_runs(tmp_path) == [store.run_id]
+
+
+def test_resume_unknown_run_fails(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        RunStore.resume('missing', base_dir=tmp_path)
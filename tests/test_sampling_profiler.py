@@ -0,0 +1,37 @@
+import sys
+import json
+import time
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.main import run_stage
+from src.utils.run_store import RunStore
+from src.utils.sampling_profiler import SamplingProfiler
+
+
+def busy_parse(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        sum(range(1000))
+    return ['parsed']
+
+
+def test_stages_get_samples_and_wall_cpu_split(tmp_path):
+    store = RunStore(base_dir=tmp_path)
+    profiler = SamplingProfiler(interval=0.002)
+    profiler.start()
+    run_stage(store, 'scraped', lambda: busy_parse(0.2), profiler=profiler)
+    run_stage(store, 'draft', lambda: time.sleep(0.2) or 'draft', profiler=profiler)
+    profiler.stop()
+
+    folded = profiler.write(store.run_dir).read_text().splitlines()
+    assert any(line.startswith('scraped;MainThread;') and 'busy_parse (test_sampling_profiler.py' in line
+               for line in folded)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in folded)
+
+    summary = json.loads((store.run_dir / 'profile.json').read_text())
+    assert summary['samples'] > 0
+    assert summary['stages']['scraped']['cpu'] >= 0.15
+    assert summary['stages']['draft']['waiting'] >= 0.15 and summary['stages']['draft']['cpu'] < 0.1
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.summarizer import Summarizer, rank_sentences, split_sentences, summarize
+
+ARTICLE = """The company released a new open-source language model for local inference today.
+The language model runs on consumer GPUs and uses quantized weights to reduce memory.
+Our reporter enjoyed a sandwich during the press event.
+Benchmarks show the quantized language model matches larger models on coding tasks.
+Parking at the venue was limited.
+Developers can download the model weights and run local inference with a single command."""
+
+
+def test_split_sentences_handles_paragraphs_and_punctuation():
+    assert split_sentences("First one. Second one!\n\nThird para") == ['First one.', 'Second one!', 'Third para']
+
+
+def test_central_sentences_outrank_filler():
+    sentences = split_sentences(ARTICLE)
+    scores = rank_sentences(sentences)
+    filler = {sentences.index(s) for s in sentences if 'sandwich' in s or 'Parking' in s}
+    topical = set(range(len(sentences))) - filler
+    assert min(scores[i] for i in topical) > max(scores[i] for i in filler)
+
+
+def test_summary_fits_budget_and_keeps_original_order():
+    summary = summarize(ARTICLE, max_tokens=60)
+    assert len(summary) <= 240
+    assert 'sandwich' not in summary and 'Parking' not in summary
+    kept = split_sentences(summary)
+    positions = [ARTICLE.index(s) for s in kept]
+    assert positions == sorted(positions)
+    assert summarize('Short text.', max_tokens=60) == 'Short text.'
+
+
+def test_summaries_are_cached_by_content_hash(tmp_path):
+    summarizer = Summarizer(tmp_path)
+    first = summarizer.summarize(ARTICLE, max_tokens=60)
+    cached, = tmp_path.iterdir()
+    cached.write_text('from cache', encoding='utf-8')
+
+    assert summarizer.summarize(ARTICLE, max_tokens=60) == 'from cache'
+    assert summarizer.summarize(ARTICLE, max_tokens=50) != 'from cache'
+    assert first != 'from cache'
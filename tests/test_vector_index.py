@@ -0,0 +1,82 @@
+import sys
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.records import Post, Story
+from src.utils.vector_index import SemanticDedup, VectorIndex
+
+
+class BagOfWordsEmbedder:
+    """Deterministic stand-in for Ollama: hashed word counts, so shared words mean similar vectors."""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1
+        return vectors
+
+
+class BrokenEmbedder:
+    def embed(self, texts):
+        raise ConnectionError('ollama is down')
+
+
+def make_post(n, title, excerpt=''):
+    return Post(id=n, title=title, slug=f'post-{n}', date='2025-01-01', content='', excerpt=excerpt)
+
+
+def test_index_persists_and_trims_interrupted_append(tmp_path):
+    index = VectorIndex(tmp_path)
+    assert index.add('1', [3.0, 4.0], title='first')
+    assert not index.add('1', [1.0, 0.0])
+    index.add('2', [0.0, 2.0], title='second')
+
+    # Simulate a crash after the vector was written but before its metadata line
+    with open(tmp_path / 'vectors.f32', 'ab') as f:
+        f.write(np.ones(2, dtype=np.float32).tobytes())
+
+    reopened = VectorIndex(tmp_path)
+    assert len(reopened) == 2
+    np.testing.assert_allclose(reopened.matrix(), [[0.6, 0.8], [0.0, 1.0]], rtol=1e-6)
+    (score, meta), = reopened.best_matches([[0.0, 5.0]])
+    assert meta['title'] == 'second' and score == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        reopened.add('3', [1.0, 2.0, 3.0])
+
+
+def test_semantic_dedup_filters_or_downranks_covered_topics(tmp_path):
+    embedder = BagOfWordsEmbedder()
+    dedup = SemanticDedup(embedder, VectorIndex(tmp_path), threshold=0.8)
+    repeat = Story(title='OpenAI releases new reasoning model', description='A new reasoning model')
+    fresh = Story(title='Rust compiler gets faster builds', description='Incremental compilation')
+
+    assert dedup.filter_new([repeat, fresh]) == [repeat, fresh]
+    assert embedder.calls == 0  # nothing indexed yet, nothing to compare against
+
+    dedup.record(make_post(1, 'OpenAI releases new reasoning model', 'A new reasoning model'))
+    dedup.record(make_post(1, 'OpenAI releases new reasoning model'))
+    assert len(dedup.index) == 1
+
+    assert dedup.filter_new([repeat, fresh]) == [fresh]
+    dedup.mode = 'downrank'
+    assert dedup.filter_new([repeat, fresh]) == [fresh, repeat]
+
+
+def test_semantic_dedup_keeps_stories_when_embeddings_fail(tmp_path):
+    index = VectorIndex(tmp_path)
+    index.add('1', [1.0, 0.0])
+    stories = [Story(title='A')]
+    assert SemanticDedup(BrokenEmbedder(), index).filter_new(stories) == stories
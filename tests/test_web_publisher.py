@@ -0,0 +1,81 @@
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.publish.ledger import PublishLedger
+from src.publish.targets import HttpTarget, StaticSiteTarget
+from src.publish.web_publisher import WebPublisher
+from src.utils.records import Post
+from src.utils.retry import RetryPolicy
+
+
+class StubCMS(BaseHTTPRequestHandler):
+    """Accepts posts, failing the first request for each title with 503. State lives on the server."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if body['title'] not in self.server.failed_once:
+            self.server.failed_once.add(body['title'])
+            self.send_response(503)
+            self.end_headers()
+            return
+        self.server.received.append(body)
+        self.send_response(201)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps({'url': f"/posts/{body['id']}"}).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def cms():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubCMS)
+    server.received, server.failed_once = [], set()
+    server.url = f"http://127.0.0.1:{server.server_port}/api/posts"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+def make_post(n):
+    return Post(id=n, title=f'Post {n}', slug=f'post-{n}', date='2025-01-01',
+                content=f'# Post {n}\n', source_link=f'https://example.com/{n}')
+
+
+def test_batch_publishes_to_all_targets_once(tmp_path, cms):
+    publisher = WebPublisher(
+        targets=[HttpTarget(cms.url), StaticSiteTarget(tmp_path / 'site')],
+        ledger=PublishLedger(tmp_path / 'ledger.db'),
+        retry_policy=RetryPolicy(base_delay=0)
+    )
+    posts = [make_post(n) for n in range(1, 4)]
+
+    assert publisher.publish_batch(posts) == {'1': True, '2': True, '3': True}
+    assert sorted(p['id'] for p in cms.received) == [1, 2, 3]
+    assert len(list((tmp_path / 'site').glob('*.md'))) == 3
+
+    # The ledger makes a second run a no-op
+    assert all(publisher.publish_batch(posts).values())
+    assert len(cms.received) == 3
+
+
+def test_static_posts_share_one_batch(tmp_path, monkeypatch):
+    target = StaticSiteTarget(tmp_path / 'site')
+    commits = []
+    original = target.writer._commit
+    monkeypatch.setattr(target.writer, '_commit', lambda: commits.append(1) or original())
+    publisher = WebPublisher(targets=[target], ledger=PublishLedger(tmp_path / 'ledger.db'))
+
+    assert all(publisher.publish_batch([make_post(n) for n in range(1, 4)]).values())
+    assert len(commits) == 1
+    assert len(list((tmp_path / 'site').glob('*.md'))) == 3
@@ -0,0 +1,49 @@
+import sys
+import json
+import time
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from web.scheduler import JOB_ID, LeaderScheduler
+
+
+def test_only_one_process_leads_and_follows_schedule_changes(tmp_path):
+    lock_path = str(tmp_path / 'scheduler.lock')
+    schedule_file = tmp_path / 'schedule.json'
+    schedule_file.write_text(json.dumps({'enabled': True, 'schedule': {'type': 'interval', 'hours': 6}}))
+
+    leader = LeaderScheduler(lock_path, str(schedule_file), lambda: None, retry_interval=0.05)
+    standby = LeaderScheduler(lock_path, str(schedule_file), lambda: None, retry_interval=0.05)
+    try:
+        leader.start()
+        standby.start()
+        assert leader.is_leader and not standby.is_leader
+        assert leader.scheduler.get_job(JOB_ID).trigger.interval.total_seconds() == 6 * 3600
+
+        schedule_file.write_text(json.dumps({'enabled': False, 'schedule': {}}))
+        standby.sync()  # Not the leader: ignored
+        leader.sync()
+        assert leader.scheduler.get_job(JOB_ID) is None
+
+        # The standby takes over once the leader goes away
+        leader.stop()
+        deadline = time.time() + 5
+        while not standby.is_leader and time.time() < deadline:
+            time.sleep(0.02)
+        assert standby.is_leader
+    finally:
+        leader.stop()
+        standby.stop()
+
+
+def test_index_page_is_cached_with_etag():
+    import web.app as app_module
+    client = app_module.app.test_client()
+
+    first = client.get('/')
+    assert first.status_code == 200 and first.headers['ETag']
+    assert 'max-age' in first.headers['Cache-Control']
+    second = client.get('/', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 304
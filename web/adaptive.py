@@ -0,0 +1,237 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from src.utils.posts_index import title_hash
+
+# Settings of the `adaptive` schedule type, with their defaults
+DEFAULTS = {
+    'check_minutes': 30,      # How often to look for new stories and Ollama load
+    'batch_threshold': 10,    # New stories per extra run in a batch
+    'max_batch': 3,           # Most runs started by one check
+    'max_hours': 24,          # Run anyway (if anything is new) after this long without a run
+    'max_defer_minutes': 120  # Stop deferring for Ollama load after this long
+}
+# Story hashes remembered between checks; older ones are dropped first
+MAX_SEEN = 5000
+# Ollama's default keep-alive, and how recently another model must have been used to count as load
+KEEP_ALIVE_SECONDS = 300
+ACTIVE_WINDOW_SECONDS = 60
+# Feeds without ETag/Last-Modified are compared on this much of their start
+PROBE_BYTES = 16384
+# Per-response timestamps that change on every request without new items
+VOLATILE = re.compile(rb'<(lastBuildDate|updated)>[^<]*</\1>')
+
+
+def adaptive_settings(schedule: Dict) -> Dict:
+    """The adaptive settings of a schedule.json `schedule`, with defaults filled in."""
+    return {key: int(schedule.get(key, default)) for key, default in DEFAULTS.items()}
+
+
+def _parse_expiry(value: str) -> Optional[datetime]:
+    # Ollama reports nanoseconds; fromisoformat takes at most microseconds
+    value = re.sub(r'(\.\d{6})\d+', r'\1', value or '').replace('Z', '+00:00')
+    try:
+        expires = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return expires if expires.tzinfo else expires.replace(tzinfo=timezone.utc)
+
+
+def ollama_busy(host: str, model: str, timeout: float = 5, ignore: Iterable[str] = (),
+                now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Why Ollama should not take a run right now, or None if it can. Ollama does not
+    expose its request queue, so /api/ps is read for signs of someone else's work: a
+    model other than `model` and the `ignore`d ones (the pipeline's embedding model)
+    that was used within the last minute. Every finished request pushes a model's
+    `expires_at` to a full keep-alive away, so an expiry close to that means recent
+    use; models merely kept resident, or pinned with an unlimited keep-alive, are not
+    load. The server being slow or unreachable also counts.
+    """
+    try:
+        response = requests.get(f"{host}/api/ps", timeout=timeout)
+        response.raise_for_status()
+        loaded = response.json().get('models', [])
+    except Exception as e:
+        return f"Ollama load check failed: {e}"
+    now = now or datetime.now(timezone.utc)
+    ours = {name.split(':')[0] for name in (model, *ignore) if name}
+    active = []
+    for entry in loaded:
+        name = entry.get('name') or entry.get('model')
+        if not name or name.split(':')[0] in ours:
+            continue
+        expires = _parse_expiry(entry.get('expires_at', ''))
+        if expires is None:
+            continue
+        remaining = (expires - now).total_seconds()
+        if KEEP_ALIVE_SECONDS - ACTIVE_WINDOW_SECONDS <= remaining <= KEEP_ALIVE_SECONDS + ACTIVE_WINDOW_SECONDS:
+            active.append(name)
+    if active:
+        return f"Ollama is serving other models: {', '.join(active)}"
+    return None
+
+
+class SourceProbe:
+    """
+    Cheap check for whether any news source changed since the last look, so the adaptive
+    schedule only scrapes when there can be new stories. URLs get a conditional GET
+    (ETag / Last-Modified); servers that send neither are compared on a hash of the
+    first PROBE_BYTES. Files are compared on size and modification time. `validators`
+    is updated in place and kept by the caller between checks.
+    """
+
+    def __init__(self, validators: Dict, timeout: float = 10):
+        self.logger = logging.getLogger(__name__)
+        self.validators = validators
+        self.timeout = timeout
+
+    def _url_token(self, url: str, previous: Dict) -> Dict:
+        headers = {}
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+        with requests.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304:
+                return previous
+            response.raise_for_status()
+            etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+            if etag or last_modified:
+                return {'etag': etag, 'last_modified': last_modified, 'token': etag or last_modified}
+            head = b''
+            for chunk in response.iter_content(4096):
+                head += chunk
+                if len(head) >= PROBE_BYTES:
+                    break
+            return {'token': hashlib.sha256(VOLATILE.sub(b'', head[:PROBE_BYTES])).hexdigest()}
+
+    def changed(self, locations: List[str]) -> bool:
+        changed = set(self.validators) != set(locations)
+        for key in set(self.validators) - set(locations):
+            del self.validators[key]
+        for location in locations:
+            previous = self.validators.get(location, {})
+            try:
+                if location.startswith(('http://', 'https://')):
+                    current = self._url_token(location, previous)
+                else:
+                    stat = os.stat(location)
+                    current = {'token': f"{stat.st_size}:{stat.st_mtime_ns}"}
+            except Exception as e:
+                # Let the scrape itself deal with (and report) the failure
+                self.logger.warning(f"Change check failed for {location}: {e}")
+                self.validators.pop(location, None)
+                changed = True
+                continue
+            if current.get('token') != previous.get('token'):
+                changed = True
+            self.validators[location] = current
+        return changed
+
+
+class AdaptivePlanner:
+    """
+    Decides, at each check of the adaptive schedule, whether to run the generator and
+    how many times. Skips when no new keyword-matching stories appeared since the last
+    run, defers while Ollama is busy, and batches several runs when many stories
+    arrived at once. Stories seen at the last run are kept in `state_path`. When a
+    `probe` is given (called with the saved validators, returning whether any source
+    changed), an unchanged check reuses the stories of the last scrape.
+    """
+
+    def __init__(self, state_path: str, settings: Dict, fetch_stories: Callable[[], List],
+                 busy: Callable[[], Optional[str]], probe: Optional[Callable[[Dict], bool]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.state_path = state_path
+        self.settings = {**DEFAULTS, **settings}
+        self.fetch_stories = fetch_stories
+        self.busy = busy
+        self.probe = probe
+        # New story hashes of the last 'run' decision, recorded by `record_run`
+        self.pending: Optional[Tuple[List[str], float]] = None
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'seen': [], 'last_run': None, 'deferred_since': None}
+        except Exception as e:
+            self.logger.error(f"Error loading adaptive schedule state: {e}")
+            return {'seen': [], 'last_run': None, 'deferred_since': None}
+
+    def _save_state(self, state: Dict):
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            self.logger.error(f"Error saving adaptive schedule state: {e}")
+
+    def _current(self, state: Dict) -> List[str]:
+        """Hashes of the current stories, scraping only if a source changed."""
+        validators = state.setdefault('validators', {})
+        changed = self.probe(validators) if self.probe else True
+        if changed or 'candidates' not in state:
+            state['candidates'] = [title_hash(story.title) for story in self.fetch_stories()]
+        else:
+            self.logger.info("News sources unchanged since the last check, reusing its stories")
+        self._save_state(state)
+        return state['candidates']
+
+    def check(self, now: Optional[float] = None) -> Tuple[str, int, str]:
+        """
+        Returns (action, runs, reason), where action is 'run', 'skip' or 'defer'. After
+        acting on a 'run', call `record_run` once the runs succeeded; until then the
+        stories stay new, so a failed run is retried at the next check.
+        """
+        now = now or time.time()
+        self.pending = None
+        state = self._load_state()
+        seen = set(state.get('seen', []))
+        current = self._current(state)
+        new = [h for h in dict.fromkeys(current) if h not in seen]
+        if not new:
+            return 'skip', 0, 'No new stories since the last run'
+
+        busy = self.busy()
+        if busy:
+            deferred_since = state.get('deferred_since') or now
+            if now - deferred_since < self.settings['max_defer_minutes'] * 60:
+                state['deferred_since'] = deferred_since
+                self._save_state(state)
+                return 'defer', 0, busy
+            self.logger.warning(f"Running despite load after deferring too long: {busy}")
+
+        last_run = state.get('last_run')
+        overdue = last_run is None or now - last_run >= self.settings['max_hours'] * 3600
+        threshold = max(1, self.settings['batch_threshold'])
+        if len(new) < threshold and not overdue:
+            return 'skip', 0, f"Only {len(new)} new stories (waiting for {threshold})"
+
+        runs = min(max(1, len(new) // threshold), max(1, self.settings['max_batch']))
+        self.pending = (new, now)
+        return 'run', runs, f"{len(new)} new stories"
+
+    def record_run(self):
+        """Mark the stories of the last 'run' decision as covered."""
+        if self.pending is None:
+            return
+        new, now = self.pending
+        self.pending = None
+        state = self._load_state()
+        state['seen'] = (state.get('seen', []) + new)[-MAX_SEEN:]
+        state['last_run'] = now
+        state['deferred_since'] = None
+        self._save_state(state)
@@ -1,10 +1,21 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import os
-from apscheduler.schedulers.background import BackgroundScheduler
 import datetime
-import subprocess
 import json
 import logging
+import sys
+
+# Make the src package importable when run as `python web/app.py`
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.utils.config import ConfigWatcher
+from src.utils.posts_index import PostsIndex
+from src.utils.run_history import RunHistory
+from web.adaptive import DEFAULTS as ADAPTIVE_DEFAULTS, AdaptivePlanner, SourceProbe, ollama_busy
+from web.run_manager import RunManager
+from web.scheduler import LeaderScheduler
 
 app = Flask(__name__)
 
@@ -12,9 +23,36 @@ app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create scheduler
-scheduler = BackgroundScheduler()
-scheduler.start()
+# Shared configuration, reloaded when .env or config/config.yml change
+config_watcher = ConfigWatcher()
+
+# Generator runs started from the UI or the scheduler, with their progress events
+run_manager = RunManager()
+
+# Index of generated posts, opened on first use
+_posts_index = None
+
+def posts_index():
+    global _posts_index
+    if _posts_index is None:
+        _posts_index = PostsIndex()
+    return _posts_index
+
+# History of generator runs, opened on first use
+_run_history = None
+
+def run_history():
+    global _run_history
+    if _run_history is None:
+        _run_history = RunHistory()
+    return _run_history
+
+def conditional_json(data):
+    """JSON response with an ETag; answers 304 when the client already has this version."""
+    response = jsonify(data)
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 # Path to store schedule information
 SCHEDULE_FILE = os.path.join(os.path.dirname(__file__), 'schedule.json')
@@ -32,55 +70,143 @@ def load_schedule():
 def save_schedule(schedule_data):
     """Save schedule to file"""
     try:
-        with open(SCHEDULE_FILE, 'w') as f:
+        # Write-then-rename so the scheduler leader never reads a half-written file
+        tmp_path = f"{SCHEDULE_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(schedule_data, f)
+        os.replace(tmp_path, SCHEDULE_FILE)
     except Exception as e:
         logger.error(f"Error saving schedule: {e}")
 
 def run_blog_generator():
-    """Run the main.py script"""
+    """Run the main.py script and wait for it. Returns its exit code (1 if it could not start)."""
     try:
         logger.info("Starting blog generation...")
-        script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src', 'main.py')
-        result = subprocess.run(['python', script_path], capture_output=True, text=True)
-        logger.info(f"Blog generation completed with return code {result.returncode}")
-        if result.returncode != 0:
-            logger.error(f"Error: {result.stderr}")
+        run, started = run_manager.start()
+        if not started:
+            logger.warning(f"Run {run.id} is still in progress, skipping this one")
+            return 1
+        returncode = run.wait()
+        logger.info(f"Blog generation completed with return code {returncode}")
+        if returncode != 0:
+            logger.error(f"Error: {run.last_error()}")
+        return returncode
     except Exception as e:
         logger.error(f"Error running blog generator: {e}")
+        return 1
 
-# Initialize scheduler from saved state
-def init_scheduler():
-    schedule_data = load_schedule()
-    if schedule_data['enabled']:
-        schedule = schedule_data['schedule']
-        if schedule.get('type') == 'interval':
-            hours = int(schedule.get('hours', 24))
-            scheduler.add_job(
-                run_blog_generator, 
-                'interval', 
-                hours=hours, 
-                id='blog_generator',
-                replace_existing=True
-            )
-        elif schedule.get('type') == 'cron':
-            scheduler.add_job(
-                run_blog_generator, 
-                'cron', 
-                day_of_week=schedule.get('day_of_week', '*'),
-                hour=schedule.get('hour', 0),
-                minute=schedule.get('minute', 0),
-                id='blog_generator',
-                replace_existing=True
-            )
-
-# Initialize the scheduler
-init_scheduler()
+# Stories seen at the last adaptive run, so later checks can tell what is new
+ADAPTIVE_STATE_FILE = os.path.join(project_root, 'output', 'adaptive_schedule.json')
+
+def run_adaptive_check(settings):
+    """Adaptive schedule check: run the generator if new stories and Ollama's load allow it"""
+    try:
+        from src.agent.news_scraper import NewsScraper
+        config = config_watcher.current()
+        scraper = NewsScraper(config.news)
+
+        def fetch_stories():
+            return posts_index().filter_new(scraper.get_news())
+
+        def probe(validators):
+            # Conditional GETs / file stats instead of a full scrape on every check
+            return SourceProbe(validators).changed(scraper.locations())
+
+        planner = AdaptivePlanner(ADAPTIVE_STATE_FILE, settings, fetch_stories,
+                                  lambda: ollama_busy(config.ollama.host, config.ollama.model,
+                                                      ignore=(config.ollama.embed_model,)),
+                                  probe=probe)
+        action, runs, reason = planner.check()
+        logger.info(f"Adaptive schedule: {action} ({reason})")
+        if runs and all(run_blog_generator() == 0 for _ in range(runs)):
+            planner.record_run()
+    except Exception as e:
+        logger.error(f"Error in adaptive schedule check: {e}")
+
+# The schedule runs in one process only, however many workers serve requests
+scheduler_leader = LeaderScheduler(
+    os.path.join(project_root, 'output', '.scheduler.lock'), SCHEDULE_FILE, run_blog_generator,
+    adaptive_job=run_adaptive_check
+)
+
+def start_scheduler():
+    """
+    Start (or stand by for) the scheduler in this process. Called once per process after
+    it is ready to serve: by gunicorn's post_worker_init hook, or by __main__ below.
+    """
+    scheduler_leader.start()
+
+@app.before_request
+def refresh_config():
+    """Pick up .env / config.yml edits without restarting the process"""
+    config_watcher.current()
+
+# Rendered once per process; the page is static and fetches everything else over the API
+_index_page = None
 
 @app.route('/')
 def index():
     """Render the main page"""
-    return render_template('index.html')
+    global _index_page
+    if _index_page is None:
+        _index_page = render_template('index.html')
+    response = app.response_class(_index_page, mimetype='text/html')
+    response.add_etag()
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response.make_conditional(request)
+
+@app.route('/api/config', methods=['GET'])
+def get_config():
+    """Get the active configuration (secrets masked)"""
+    return jsonify(config_watcher.current().to_dict())
+
+@app.route('/api/posts', methods=['GET'])
+def list_posts():
+    """
+    List generated posts, newest first, from the posts index. Pass `cursor` from the
+    previous page's `next_cursor` to get the next one; `limit` is 1-100 (default 20).
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        posts, next_cursor = posts_index().list_posts(limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+    return conditional_json({'posts': posts, 'next_cursor': next_cursor})
+
+@app.route('/api/posts/<int:post_id>', methods=['GET'])
+def get_post(post_id):
+    """Metadata and content of one post"""
+    post = posts_index().get_post(post_id)
+    if post is None:
+        return jsonify({'status': 'error', 'error': f'Post {post_id} not found'}), 404
+    # The index row changes whenever the post is rewritten, so revalidation needs no file read
+    etag = f"{post_id}-{post['updated_at']}"
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    try:
+        with open(post['path'], 'r', encoding='utf-8') as f:
+            post['content'] = f.read()
+    except OSError as e:
+        logger.error(f"Error reading post {post_id}: {e}")
+        return jsonify({'status': 'error', 'error': f'Post {post_id} file is missing'}), 404
+    response = jsonify(post)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/history', methods=['GET'])
+def get_history():
+    """
+    Recent runs, newest first, with outcome, model, duration, per-stage durations,
+    token throughput and cache hits. `limit` is 1-500 (default 50); `model` filters.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except ValueError:
+        return jsonify({'status': 'error', 'error': 'limit must be an integer'}), 400
+    return conditional_json({'runs': run_history().list_runs(limit, request.args.get('model'))})
 
 @app.route('/api/schedule', methods=['GET'])
 def get_schedule():
@@ -92,10 +218,6 @@ def set_schedule():
     """Set a new schedule"""
     data = request.json
     
-    # Clear existing job if it exists
-    if scheduler.get_job('blog_generator'):
-        scheduler.remove_job('blog_generator')
-    
     schedule_data = {'enabled': data.get('enabled', False), 'schedule': {}}
     
     if schedule_data['enabled']:
@@ -103,42 +225,72 @@ def set_schedule():
         schedule_data['schedule']['type'] = schedule_type
         
         if schedule_type == 'interval':
-            hours = int(data.get('hours', 24))
-            schedule_data['schedule']['hours'] = hours
-            
-            scheduler.add_job(
-                run_blog_generator, 
-                'interval', 
-                hours=hours, 
-                id='blog_generator'
-            )
+            schedule_data['schedule']['hours'] = int(data.get('hours', 24))
             
         elif schedule_type == 'cron':
-            day_of_week = data.get('day_of_week', '*')
-            hour = int(data.get('hour', 0))
-            minute = int(data.get('minute', 0))
-            
-            schedule_data['schedule']['day_of_week'] = day_of_week
-            schedule_data['schedule']['hour'] = hour
-            schedule_data['schedule']['minute'] = minute
+            schedule_data['schedule']['day_of_week'] = data.get('day_of_week', '*')
+            schedule_data['schedule']['hour'] = int(data.get('hour', 0))
+            schedule_data['schedule']['minute'] = int(data.get('minute', 0))
             
-            scheduler.add_job(
-                run_blog_generator, 
-                'cron', 
-                day_of_week=day_of_week,
-                hour=hour,
-                minute=minute,
-                id='blog_generator'
-            )
+        elif schedule_type == 'adaptive':
+            for key, default in ADAPTIVE_DEFAULTS.items():
+                schedule_data['schedule'][key] = int(data.get(key, default))
     
     save_schedule(schedule_data)
+    # The leader picks the file up within a few seconds; apply it now if that is us
+    scheduler_leader.sync()
     return jsonify({'status': 'success', 'schedule': schedule_data})
 
 @app.route('/api/run-now', methods=['POST'])
 def run_now():
-    """Run the blog generator immediately"""
-    run_blog_generator()
-    return jsonify({'status': 'success'})
+    """
+    Start the blog generator and return at once with the URL of its progress stream.
+    With `?wait=true` block until it finishes and report whether it succeeded.
+    """
+    try:
+        run, started = run_manager.start()
+    except Exception as e:
+        logger.error(f"Error starting blog generator: {e}")
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+    body = {'run_id': run.id, 'events': f'/api/runs/{run.id}/events'}
+    if not started:
+        return jsonify({'status': 'busy', **body}), 409
+    if request.args.get('wait', '').lower() != 'true':
+        return jsonify({'status': 'started', **body}), 202
+
+    returncode = run.wait()
+    if returncode != 0:
+        return jsonify({'status': 'error', 'returncode': returncode, 'error': run.last_error(), **body}), 500
+    return jsonify({'status': 'success', 'returncode': 0, **body})
+
+@app.route('/api/runs/<run_id>/events', methods=['GET'])
+def run_events(run_id):
+    """
+    Server-Sent Events stream of a run's progress: stage changes, scraped count, selected
+    story, token counts and rate, then `done` or `error`, and finally `exit`. Reconnecting
+    clients resume after the Last-Event-ID they saw. `latest` follows the newest run.
+    """
+    run = run_manager.get(run_id)
+    if run is None:
+        return jsonify({'status': 'error', 'error': f'Unknown run: {run_id}'}), 404
+    try:
+        start = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        start = 0
+
+    def stream():
+        for index, event in run.follow(start):
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            yield f"id: {index}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    debug = os.environ.get('FLASK_DEBUG', 'false').lower() == 'true'
+    # The debug reloader imports the app twice; only the serving child should schedule
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_scheduler()
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=debug)
@@ -0,0 +1,240 @@
+import fcntl
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(PROJECT_ROOT, 'src', 'main.py')
+# Event logs shared by all web workers, so any worker can stream any run
+RUNS_DIR = os.path.join(PROJECT_ROOT, 'output', 'web_runs')
+
+
+def _last_error(events: List[Dict]) -> Optional[str]:
+    for event in reversed(events):
+        if event.get('event') == 'error':
+            return event.get('message')
+    return events[-1].get('stderr') if events else None
+
+
+class RunLog:
+    """
+    Read-only view of a run's event log on disk, for runs started by another worker
+    process. Follows the file by polling until the exit event is written.
+    """
+
+    def __init__(self, run_id: str, directory: str = RUNS_DIR):
+        self.id = run_id
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _read(self) -> List[Dict]:
+        events = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    # A line without its newline is still being written
+                    if line.endswith('\n'):
+                        events.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        return events
+
+    @property
+    def events(self) -> List[Dict]:
+        return self._read()
+
+    @property
+    def finished(self) -> bool:
+        events = self._read()
+        return bool(events) and events[-1].get('event') == 'exit'
+
+    def follow(self, start: int = 0, heartbeat: float = 15.0, poll: float = 0.5) -> Iterator[Tuple[int, Optional[Dict]]]:
+        index = start
+        idle = 0.0
+        while True:
+            events = self._read()
+            for event in events[index:]:
+                yield index, event
+                index += 1
+                idle = 0.0
+                if event.get('event') == 'exit':
+                    return
+            if events and events[-1].get('event') == 'exit':
+                return
+            time.sleep(poll)
+            idle += poll
+            if idle >= heartbeat:
+                idle = 0.0
+                yield index, None
+
+    def last_error(self) -> Optional[str]:
+        return _last_error(self._read())
+
+
+class RunHandle:
+    """
+    One `main.py --progress` subprocess and the events it has produced so far. Events
+    are kept in memory for this process's subscribers and appended to the run's log
+    file for the other workers. Holds `lock_file` (the cross-process run lock) until
+    the subprocess exits.
+    """
+
+    def __init__(self, args: Optional[List[str]] = None, directory: str = RUNS_DIR, lock_file=None):
+        self.logger = logging.getLogger(__name__)
+        self.id = uuid.uuid4().hex[:12]
+        self.events: List[Dict] = []
+        self.stderr_tail = deque(maxlen=20)
+        self.returncode: Optional[int] = None
+        self.condition = threading.Condition()
+        self.lock_file = lock_file
+        self.log = open(os.path.join(directory, f"{self.id}.jsonl"), 'a', encoding='utf-8')
+        self.process = subprocess.Popen(
+            [sys.executable, MAIN_SCRIPT, '--progress', *(args or [])],
+            cwd=PROJECT_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, bufsize=1
+        )
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+        threading.Thread(target=self._read_events, daemon=True).start()
+
+    @property
+    def finished(self) -> bool:
+        return self.returncode is not None
+
+    def _append(self, event: Dict, returncode: Optional[int] = None):
+        with self.condition:
+            self.log.write(json.dumps(event) + '\n')
+            self.log.flush()
+            self.events.append(event)
+            if returncode is not None:
+                self.returncode = returncode
+            self.condition.notify_all()
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            self.stderr_tail.append(line.rstrip())
+
+    def _read_events(self):
+        for line in self.process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                self._append(json.loads(line))
+            except ValueError:
+                self._append({'event': 'output', 'message': line, 'time': round(time.time(), 3)})
+        returncode = self.process.wait()
+        exit_event = {'event': 'exit', 'returncode': returncode, 'time': round(time.time(), 3)}
+        if returncode != 0:
+            exit_event['stderr'] = '\n'.join(self.stderr_tail)
+        if self.lock_file is not None:
+            # Release the run lock for every worker before waking anyone waiting on this run
+            self.lock_file.close()
+        self._append(exit_event, returncode)
+        self.log.close()
+        self.logger.info(f"Run {self.id} finished with return code {returncode}")
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        with self.condition:
+            self.condition.wait_for(lambda: self.finished, timeout)
+            return self.returncode
+
+    def follow(self, start: int = 0, heartbeat: float = 15.0) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """
+        Yield (index, event) from `start` onwards as they arrive, and (index, None)
+        after `heartbeat` seconds without events. Ends after the exit event.
+        """
+        index = start
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: len(self.events) > index or self.finished, heartbeat)
+                pending = self.events[index:]
+                done = self.finished
+            if not pending:
+                if done:
+                    return
+                yield index, None
+                continue
+            for event in pending:
+                yield index, event
+                index += 1
+            if done and index >= len(self.events):
+                return
+
+    def last_error(self) -> Optional[str]:
+        return _last_error(self.events)
+
+
+class RunManager:
+    """
+    Starts generator runs, one at a time across all worker processes (guarded by a
+    file lock), and finds runs by ID for their event streams.
+    """
+
+    def __init__(self, directory: str = RUNS_DIR, keep: int = 50):
+        self.directory = directory
+        self.keep = keep
+        self.runs: Dict[str, RunHandle] = {}
+        self.lock = threading.Lock()
+
+    def start(self, args: Optional[List[str]] = None) -> Tuple[object, bool]:
+        """Start a run unless one is in progress anywhere. Returns the run and whether it is new."""
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, 'active.lock'), 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            # get() takes self.lock, so this must run without holding it
+            return self._active(), False
+        with self.lock:
+            try:
+                run = RunHandle(args, self.directory, lock_file)
+            except Exception:
+                lock_file.close()
+                raise
+            with open(os.path.join(self.directory, 'active'), 'w') as f:
+                f.write(run.id)
+            self.runs = {run_id: r for run_id, r in self.runs.items() if not r.finished}
+            self.runs[run.id] = run
+            self._prune()
+            return run, True
+
+    def _active(self):
+        try:
+            with open(os.path.join(self.directory, 'active'), 'r') as f:
+                return self.get(f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def _logs(self) -> List[str]:
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.endswith('.jsonl')]
+        return sorted(paths, key=os.path.getmtime)
+
+    def _prune(self):
+        for path in self._logs()[:-self.keep]:
+            os.remove(path)
+
+    def get(self, run_id: str):
+        """The run with this ID (or the newest for `latest`), or None."""
+        if run_id == 'latest':
+            logs = self._logs() if os.path.isdir(self.directory) else []
+            if not logs:
+                return None
+            run_id = os.path.basename(logs[-1])[:-len('.jsonl')]
+        with self.lock:
+            if run_id in self.runs:
+                return self.runs[run_id]
+        if not run_id.isalnum():
+            return None
+        log = RunLog(run_id, self.directory)
+        return log if log.exists() else None
@@ -0,0 +1,122 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from web.adaptive import adaptive_settings
+
+JOB_ID = 'blog_generator'
+
+
+def apply_schedule(scheduler: BackgroundScheduler, schedule_data: Dict, job: Callable,
+                   adaptive_job: Optional[Callable] = None):
+    """
+    Replace the generator job with the one described by a schedule.json payload. The
+    `adaptive` type calls `adaptive_job(settings)` every `check_minutes` to decide.
+    """
+    if scheduler.get_job(JOB_ID):
+        scheduler.remove_job(JOB_ID)
+    if not schedule_data.get('enabled'):
+        return
+    schedule = schedule_data.get('schedule', {})
+    if schedule.get('type') == 'interval':
+        scheduler.add_job(job, 'interval', hours=int(schedule.get('hours', 24)), id=JOB_ID,
+                          replace_existing=True)
+    elif schedule.get('type') == 'cron':
+        scheduler.add_job(job, 'cron', day_of_week=schedule.get('day_of_week', '*'),
+                          hour=schedule.get('hour', 0), minute=schedule.get('minute', 0),
+                          id=JOB_ID, replace_existing=True)
+    elif schedule.get('type') == 'adaptive' and adaptive_job is not None:
+        settings = adaptive_settings(schedule)
+        scheduler.add_job(adaptive_job, 'interval', minutes=settings['check_minutes'],
+                          kwargs={'settings': settings}, id=JOB_ID, replace_existing=True)
+
+
+class LeaderScheduler:
+    """
+    Runs the generator schedule in exactly one process. Every web worker calls `start`;
+    whichever takes the exclusive lock on `lock_path` runs the APScheduler and follows
+    `schedule_file` for changes saved by any worker. The others retry the lock
+    periodically, so a new leader takes over if the current one exits.
+    """
+
+    def __init__(self, lock_path: str, schedule_file: str, job: Callable,
+                 retry_interval: float = 30, watch_interval: float = 5,
+                 adaptive_job: Optional[Callable] = None):
+        self.logger = logging.getLogger(__name__)
+        self.lock_path = lock_path
+        self.schedule_file = schedule_file
+        self.job = job
+        self.adaptive_job = adaptive_job
+        self.retry_interval = retry_interval
+        self.watch_interval = watch_interval
+        self.scheduler: Optional[BackgroundScheduler] = None
+        self.lock_file = None
+        self.schedule_mtime = None
+        self.stopped = threading.Event()
+
+    @property
+    def is_leader(self) -> bool:
+        return self.scheduler is not None
+
+    def start(self):
+        """Try to become the leader now, and keep trying in the background if not."""
+        if not self._try_lead():
+            threading.Thread(target=self._retry_loop, daemon=True).start()
+
+    def _retry_loop(self):
+        while not self.stopped.wait(self.retry_interval):
+            if self._try_lead():
+                return
+
+    def _try_lead(self) -> bool:
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        lock_file = open(self.lock_path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Held (and never closed) for the life of the process; the OS releases it on exit
+        self.lock_file = lock_file
+        self.scheduler = BackgroundScheduler()
+        self.scheduler.start()
+        self.scheduler.add_job(self.sync, 'interval', seconds=self.watch_interval, id='schedule_watch')
+        self.sync()
+        self.logger.info(f"Process {os.getpid()} is the scheduler leader")
+        return True
+
+    def sync(self):
+        """Apply schedule.json if it changed since it was last applied (leader only)."""
+        if not self.is_leader:
+            return
+        try:
+            mtime = os.stat(self.schedule_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.schedule_mtime:
+            return
+        schedule_data = {'enabled': False, 'schedule': {}}
+        if mtime is not None:
+            try:
+                with open(self.schedule_file, 'r') as f:
+                    schedule_data = json.load(f)
+            except Exception as e:
+                self.logger.error(f"Error loading schedule: {e}")
+                return
+        self.schedule_mtime = mtime
+        apply_schedule(self.scheduler, schedule_data, self.job, self.adaptive_job)
+        self.logger.info(f"Applied schedule: {schedule_data}")
+
+    def stop(self):
+        self.stopped.set()
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None